@@ -0,0 +1,140 @@
+# cogs/calendar.py - serves each guild's events as an ICS calendar feed
+
+import io
+import os
+import time
+import discord
+import logging
+from aiohttp import web
+from discord.ext import commands
+from modules.data import Data
+from modules.ics import CalendarCache, render_vevent
+from modules.recurrence import series_criteria
+from modules.snowflake import Snowflake
+
+# How far back past events stay in the feed
+CALENDAR_HISTORY = 180 * 86400
+
+
+class Calendar(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.logger = logging.getLogger(
+            f"discord.cog.{self.__class__.__name__.lower()}"
+        )
+        self.cache = CalendarCache()
+        self.runner = None
+
+    async def cog_load(self):
+        # The HTTP feed is optional and only served when a port is configured
+        port = os.getenv("CALENDAR_PORT")
+        if not port:
+            return
+
+        app = web.Application()
+        app.router.add_get("/calendar/{guild_id}.ics", self.handle_feed)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        host = os.getenv("CALENDAR_HOST") or "127.0.0.1"
+        await web.TCPSite(self.runner, host, int(port)).start()
+        self.logger.info(f"Serving calendar feeds on http://{host}:{port}/calendar/")
+
+    async def cog_unload(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+    # * * * * * Rendering * * * * * #
+    @staticmethod
+    def render_event(event: Data) -> bytes:
+        """Renders one event, or a whole recurring series, as a VEVENT."""
+        event_id = event.get_value("id")
+        fields = event.to_dict()
+        return render_vevent(
+            uid=f"{event_id}@capy",
+            name=event.get_value("name"),
+            description=event.get_value("description"),
+            location=event.get_value("location"),
+            start_time=event.get_value("start_time"),
+            end_time=fields.get("end_time"),
+            stamp=Snowflake.timestamp_of(event_id),
+            tz_name=event.get_value("timezone"),
+            recurrence=fields.get("recurrence") or "",
+            exceptions=fields.get("exceptions") or (),
+        )
+
+    async def get_calendar(self, guild_id: int):
+        """Returns a guild's calendar and ETag, loading its events when not cached."""
+        calendar = self.cache.get(guild_id)
+        if calendar is None:
+            cutoff = time.time() - CALENDAR_HISTORY
+            events = await self.bot.db.search_range(
+                "event", "start_time", cutoff, criteria={"guild_id": guild_id}
+            )
+            # Series that began earlier still belong in the feed while they run
+            events += await self.bot.db.search_range(
+                "event",
+                "start_time",
+                upper=cutoff,
+                criteria=series_criteria({"guild_id": guild_id}, cutoff),
+            )
+            calendar = self.cache.load(
+                guild_id,
+                {event.get_value("id"): self.render_event(event) for event in events},
+            )
+            self.logger.info(f"Rendered {len(events)} events for guild {guild_id}.")
+        return calendar
+
+    # * * * * * Commands * * * * * #
+    @commands.command(
+        name="calendar", help="Get the server's events as a calendar file."
+    )
+    async def calendar(self, ctx):
+        document, _ = await self.get_calendar(ctx.guild.id)
+        embed = discord.Embed(
+            title="Calendar",
+            description="Import this file into your calendar app to see all server events.",
+            color=discord.Color.green(),
+        )
+        await ctx.send(
+            embed=embed,
+            file=discord.File(io.BytesIO(document), filename=f"{ctx.guild.id}.ics"),
+        )
+
+    # * * * * * HTTP Feed * * * * * #
+    async def handle_feed(self, request: web.Request) -> web.Response:
+        """Serves a guild's calendar, answering 304 when the client's copy is current."""
+        try:
+            guild_id = int(request.match_info["guild_id"])
+        except ValueError:
+            raise web.HTTPNotFound()
+        if self.bot.get_guild(guild_id) is None:
+            raise web.HTTPNotFound()
+
+        document, etag = await self.get_calendar(guild_id)
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            body=document,
+            content_type="text/calendar",
+            charset="utf-8",
+            headers={"ETag": etag},
+        )
+
+    # * * * * * Event Listeners * * * * * #
+    @commands.Cog.listener()
+    async def on_event_create(self, event: Data):
+        guild_id = event.get_value("guild_id")
+        if self.cache.is_loaded(guild_id):
+            self.cache.upsert(guild_id, event.get_value("id"), self.render_event(event))
+
+    @commands.Cog.listener()
+    async def on_event_delete(self, event_id: int):
+        self.cache.remove(event_id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.cache.forget(guild.id)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Calendar(bot))
@@ -1,45 +1,150 @@
 import re
+import copy
+import json
+import asyncio
+import heapq
+import time
 import discord
-from datetime import datetime, timezone
-from discord.ext import commands
-from modules.timestamp import now, format_time, get_timezone, localize_datetime
+from datetime import datetime, timedelta
+from itertools import islice
+from discord.ext import commands, tasks
+from modules.attendance import AttendanceBuffer
+from modules.cache import LRUCache
+from modules.conversation import Conversation, Step
+from modules.data import Data, templates
+from modules.ics import DEFAULT_DURATION
+from modules.interval_tree import IntervalTree
+from modules.search import SearchIndex
+from modules.importer import chunked, iter_event_rows
+from modules.recurrence import (
+    ONE_OFF,
+    RULE_SHORTCUTS,
+    describe_rule,
+    expand_event,
+    occurrences,
+    parse_rule,
+    series_criteria,
+    series_end,
+)
+from modules.timestamp import (
+    DATETIME_FORMAT,
+    DATETIME_TZ_FORMAT,
+    DEFAULT_TIMEZONE,
+    format_epochs,
+    format_time,
+    get_timezone,
+    localize_datetime,
+    to_epochs,
+)
+
+# Number of events shown per listing page
+EVENTS_PAGE_SIZE = 10
+# Seconds of inactivity before a listing's page buttons stop working
+PAGINATOR_TIMEOUT = 180
+
+# Rendered embed cache budget in serialized bytes, and how long a listing page stays fresh
+EMBED_CACHE_BYTES = 4 * 1024 * 1024
+LISTING_CACHE_TTL = 60
+
+# Bulk import limits: rows per database write, upload size and errors echoed back
+IMPORT_CHUNK_SIZE = 100
+MAX_IMPORT_SIZE = 1_000_000
+MAX_IMPORT_ERRORS_SHOWN = 10
+
+# How far either side of now recurring events are expanded for conflict checks
+CONFLICT_HORIZON = 365 * 86400
+MAX_CONFLICTS_SHOWN = 20
+
+# Check-in buttons carry the event ID after this prefix in their custom_id
+CHECKIN_PREFIX = "checkin:"
+# Seconds between batched attendance writes
+ATTENDANCE_FLUSH_INTERVAL = 5
+
+# Answers accepted by the !events add wizard: mm/dd/yy, and "HH:MM AM/PM" with an optional timezone
+EVENT_DATE_PATTERN = re.compile(r"^(0[1-9]|1[0-2])\/(0[1-9]|[12][0-9]|3[01])\/\d{2}$")
+EVENT_TIME_PATTERN = re.compile(r"^(0[1-9]|1[0-2]):[0-5][0-9] (AM|PM)( [A-Z]{2,4})?$")
 
 
 class Events(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.attendance = AttendanceBuffer()
+        # Per event, the task reopening its check-ins from the stored attendees
+        self.attendance_loads = {}
+        self.embeds = LRUCache(EMBED_CACHE_BYTES)
+        # Per guild, an interval tree of event times for each location
+        self.schedules = {}
+        # Per event, what was put in the schedules: (guild, location, name, timezone, intervals)
+        self.scheduled = {}
+        # Per guild, a keyword index of events and the task that loads it
+        self.search_indexes = {}
+        self.search_builds = {}
+        self.bot.conversations.register(self.add_event_conversation())
         self.bot.logger.info("Event cog initialized.")
 
+    async def cog_load(self):
+        self.flush_attendance.start()
+
+    async def cog_unload(self):
+        # Let an in-flight flush finish, then write whatever is still buffered
+        self.flush_attendance.stop()
+        await self.write_attendance()
+
     @commands.group(name="events", help="Access/Modify Event data.")
     async def events(self, ctx):
         """
-        Lists all guild events
+        Lists upcoming guild events
         """
 
         if ctx.invoked_subcommand is None:
-            self.bot.logger.info(f"User {ctx.author} requested the list of events.")
-            guild_events = self.bot.db.get_paginated_linked_data(
-                "event", self.bot.db.get_data("guild", ctx.guild.id), 1, 10
-            )
+            await self.upcoming_events(ctx)
 
-            if not guild_events:
-                self.bot.logger.info(f"No events found for guild {ctx.guild.id}.")
-                await self.send_no_events_embed(ctx)
-                return
+    @events.command(name="upcoming", help="List upcoming events.")
+    async def upcoming_events(self, ctx):
+        """Lists the next guild events, soonest first."""
+        self.bot.logger.info(f"User {ctx.author} requested the list of events.")
+        await self.send_listing(
+            ctx, ("upcoming",), "Upcoming Events", lower=time.time()
+        )
 
-            self.bot.logger.info(
-                f"Found {len(guild_events)} events for guild {ctx.guild.id}."
-            )
-            embed = self.create_events_embed(guild_events)
-            await ctx.send(embed=embed)
+    @events.command(name="past", help="List past events.")
+    async def past_events(self, ctx):
+        """Lists the most recent past guild events, latest first."""
+        self.bot.logger.info(f"User {ctx.author} requested the list of past events.")
+        await self.send_listing(
+            ctx, ("past",), "Past Events", upper=time.time(), descending=True
+        )
+
+    @events.command(
+        name="between",
+        help="List events between two dates. Usage: !events between [mm/dd/yy] [mm/dd/yy]",
+    )
+    async def events_between(self, ctx, start_date: str, end_date: str):
+        """Lists guild events from the start of one date to the end of another."""
+        self.bot.logger.info(
+            f"User {ctx.author} requested events between {start_date} and {end_date}."
+        )
+        try:
+            lower, upper = self.date_range_to_epochs(start_date, end_date)
+        except ValueError:
+            await ctx.send("Invalid date format. Please use mm/dd/yy for both dates.")
+            return
+
+        await self.send_listing(
+            ctx,
+            ("between", lower, upper),
+            f"Events Between {start_date} and {end_date}",
+            lower=lower,
+            upper=upper,
+        )
 
     @events.command(name="myevents", help="Get events you are registered for.")
     async def my_events(self, ctx):
         """Handles output for the command to get events the user is registered for."""
         self.bot.logger.info(f"User {ctx.author.id} requested their registered events.")
 
-        user_events = self.bot.db.get_paginated_linked_data(
-            "event", self.bot.db.get_data("user", ctx.author.id), 1, 10
+        user_events = await self.query_events(
+            {"user": ctx.author.id}, lower=time.time()
         )
 
         if not user_events:
@@ -50,6 +155,202 @@ class Events(commands.Cog):
         await ctx.author.send(embed=self.create_events_embed(user_events))
         self.bot.logger.info(f"Sent registered events to user {ctx.author.id}.")
 
+    async def query_events(
+        self,
+        criteria: dict,
+        lower: float = None,
+        upper: float = None,
+        descending: bool = False,
+        after: tuple = None,
+        limit: int = EVENTS_PAGE_SIZE,
+    ):
+        """
+        Fetches one page of events by start time, resuming after the (start_time, id)
+        cursor of the previous page if given.
+
+        One-off events come straight from the (criteria, start_time) indexes. Recurring
+        series running in the window are expanded lazily and merged in, so only the
+        occurrences on the page are ever computed.
+        """
+        one_offs = await self.bot.db.search_range(
+            "event",
+            "start_time",
+            lower,
+            upper,
+            {**criteria, "recurrence": ONE_OFF},
+            descending=descending,
+            limit=limit,
+            after=after,
+        )
+        series = await self.bot.db.search_range(
+            "event",
+            "start_time",
+            upper=upper,
+            criteria=series_criteria(criteria, lower),
+        )
+        if not series:
+            return one_offs
+
+        def key(event):
+            return (event.get_value("start_time"), event.get_value("id"))
+
+        # Occurrences before the cursor are never expanded; the +1 keeps ties on start time
+        if after is not None and descending:
+            upper = after[0] + 1 if upper is None else min(upper, after[0] + 1)
+        elif after is not None:
+            lower = after[0] if lower is None else max(lower, after[0])
+
+        merged = heapq.merge(
+            one_offs,
+            *(expand_event(event, lower, upper, descending) for event in series),
+            key=key,
+            reverse=descending,
+        )
+        if after is not None:
+            merged = (
+                event
+                for event in merged
+                if (key(event) < after if descending else key(event) > after)
+            )
+        return list(islice(merged, limit))
+
+    @staticmethod
+    def date_range_to_epochs(
+        start_date: str, end_date: str, tz_name: str = DEFAULT_TIMEZONE
+    ):
+        """
+        Converts an inclusive mm/dd/yy date range into [start, end) epochs in a timezone.
+        """
+        start = datetime.strptime(start_date, "%m/%d/%y")
+        end = datetime.strptime(end_date, "%m/%d/%y") + timedelta(days=1)
+        return tuple(
+            to_epochs(
+                [start.strftime(DATETIME_FORMAT), end.strftime(DATETIME_FORMAT)],
+                tz_name,
+            )
+        )
+
+    async def send_listing(
+        self,
+        ctx,
+        listing: tuple,
+        title: str,
+        lower: float = None,
+        upper: float = None,
+        descending: bool = False,
+    ):
+        """
+        Sends one page of guild events, or the no-events embed if there are none.
+
+        The rendered page is cached per guild and listing until an event in the
+        guild changes, an event on the page starts or LISTING_CACHE_TTL passes.
+        """
+
+        async def fetch_page(after):
+            # One extra row tells whether there is a page after this one
+            events = await self.query_events(
+                {"guild_id": ctx.guild.id},
+                lower,
+                upper,
+                descending,
+                after=after,
+                limit=EVENTS_PAGE_SIZE + 1,
+            )
+            page = events[:EVENTS_PAGE_SIZE]
+            if len(events) <= EVENTS_PAGE_SIZE:
+                return page, None
+            last = page[-1]
+            return page, (last.get_value("start_time"), last.get_value("id"))
+
+        key = ("listing", ctx.guild.id, *listing)
+        entry = self.embeds.get(key)
+        if entry:
+            self.bot.logger.info(f"Serving cached {title} for guild {ctx.guild.id}.")
+            payload, _, cursor = entry
+            await self.send_pages(
+                ctx, discord.Embed.from_dict(payload), cursor, title, fetch_page
+            )
+            return
+
+        events, cursor = await fetch_page(None)
+        now = time.time()
+        starts = [event.get_value("start_time") or 0 for event in events]
+        expires_at = min([now + LISTING_CACHE_TTL] + [s for s in starts if s > now])
+
+        if events:
+            self.bot.logger.info(
+                f"Found {len(events)} events for guild {ctx.guild.id}."
+            )
+            embed = self.create_events_embed(events, title)
+        else:
+            self.bot.logger.info(f"No events found for guild {ctx.guild.id}.")
+            embed = self.create_no_events_embed()
+
+        self.cache_embed(
+            key, embed, [event.get_value("id") for event in events], expires_at, cursor
+        )
+        await self.send_pages(ctx, embed, cursor, title, fetch_page)
+
+    async def send_pages(self, ctx, embed, cursor, title: str, fetch_page):
+        """Sends the first page of a listing, with page buttons if there are more."""
+        if cursor is None:
+            await ctx.send(embed=embed)
+            return
+
+        view = EventPaginator(
+            ctx.author.id,
+            embed,
+            cursor,
+            fetch_page,
+            lambda events: self.create_events_embed(events, title),
+        )
+        view.message = await ctx.send(embed=embed, view=view)
+
+    # * * * * * Embed Cache * * * * * #
+    def get_cached_embed(self, key: tuple):
+        """Rebuilds a cached embed from its payload, or returns None on a miss."""
+        entry = self.embeds.get(key)
+        return discord.Embed.from_dict(entry[0]) if entry else None
+
+    def cache_embed(
+        self,
+        key: tuple,
+        embed: discord.Embed,
+        event_ids=(),
+        expires_at=None,
+        cursor=None,
+    ):
+        """
+        Stores an embed's payload along with the IDs of the events it shows and,
+        for listings, the cursor of the next page.
+        """
+        payload = embed.to_dict()
+        self.embeds.set(
+            key,
+            (payload, frozenset(event_ids), cursor),
+            size=len(json.dumps(payload)),
+            expires_at=expires_at,
+        )
+
+    @commands.Cog.listener()
+    async def on_event_create(self, event):
+        event_id, guild_id = event.get_value("id"), event.get_value("guild_id")
+        self.embeds.pop(("event", event_id))
+        self.embeds.pop_where(lambda key, _: key[0] == "listing" and key[1] == guild_id)
+        self.index_event(event)
+        if guild_id in self.search_indexes:
+            self.search_indexes[guild_id].add(event_id, event.to_dict())
+
+    @commands.Cog.listener()
+    async def on_event_delete(self, event_id: int):
+        # Removing an event only changes the pages it was on
+        self.embeds.pop(("event", event_id))
+        self.embeds.pop_where(lambda _, value: event_id in value[1])
+        self.unindex_event(event_id)
+        for index in self.search_indexes.values():
+            index.remove(event_id)
+        self.attendance.close(event_id)
+
     @events.command(
         name="show",
         help="Show details of a specific event. Usage: !event show [event_id]",
@@ -60,19 +361,24 @@ class Events(commands.Cog):
             f"User {ctx.author} requested details for event ID: {event_id}."
         )
 
-        event_data = self.bot.db.get_data("event", event_id)
+        embed = self.get_cached_embed(("event", event_id))
+        if not embed:
+            event_data = await self.bot.db.get_data("event", event_id)
 
-        if not event_data:
-            await ctx.send(f"No event found with ID: {event_id}.")
-            return
+            if not event_data:
+                await ctx.send(f"No event found with ID: {event_id}.")
+                return
 
-        embed = self.create_event_embed(
-            name=event_data.get_value("name"),
-            event_description=event_data.get_value("description"),
-            time_str=event_data.get_value("datetime"),
-            location=event_data.get_value("location"),
-            event_id=event_data.get_value("id"),
-        )
+            embed = self.create_event_embed(
+                name=event_data.get_value("name"),
+                event_description=event_data.get_value("description"),
+                time_str=localize_datetime(
+                    event_data.get_value("datetime"), event_data.get_value("timezone")
+                ),
+                location=event_data.get_value("location"),
+                event_id=event_data.get_value("id"),
+            )
+            self.cache_embed(("event", event_id), embed, [event_id])
         await ctx.send(embed=embed)
 
     async def send_no_events_embed(self, ctx):
@@ -80,24 +386,30 @@ class Events(commands.Cog):
         Sends an embed message when there are no upcoming events.
         """
         self.bot.logger.info(f"No upcoming events for guild {ctx.guild.id}.")
-        embed = discord.Embed(
+        await ctx.send(embed=self.create_no_events_embed())
+
+    def create_no_events_embed(self):
+        """Creates an embed saying there are no events to list."""
+        return discord.Embed(
             title="No Upcoming Events",
             description="There are no events scheduled at the moment.",
             color=discord.Color.red(),
         )
-        await ctx.send(embed=embed)
 
-    def create_events_embed(self, guild_events):
+    def create_events_embed(self, guild_events, title: str = "Upcoming Events"):
         """
-        Creates an embed with the list of upcoming events.
+        Creates an embed with the list of events.
         """
         embed = discord.Embed(
-            title="Upcoming Events",
+            title=title,
             color=discord.Color.green(),
         )
 
         for event in guild_events:
             event_details = f"{localize_datetime(event.get_value('datetime'), event.get_value('timezone'))} \nEvent ID: {event.get_value('id')}"
+            rule = event.to_dict().get("recurrence")
+            if rule:
+                event_details += f"\nRepeats: {describe_rule(rule)}"
             embed.add_field(
                 name=event.get_value("name"), value=event_details, inline=False
             )
@@ -107,44 +419,155 @@ class Events(commands.Cog):
 
     @events.command(name="add", help="Add a new event. Usage: !event add")
     async def add_event(self, ctx):
-        """Creates event, adds to guild events list, prints confirmation embed"""
+        """Starts the wizard collecting a new event's details in this channel"""
         self.bot.logger.info(f"User {ctx.author} is adding a new event.")
+        await self.bot.conversations.start(
+            "event_add",
+            ctx.author.id,
+            ctx.channel.id,
+            answers={"guild_id": ctx.guild.id},
+        )
 
-        name = await self.ask_for_event_name(ctx)
-        event_description = await self.ask_for_event_description(ctx)
-        date = await self.ask_for_event_date(ctx)
-        time = await self.ask_for_event_time(ctx)
-        location = await self.ask_for_event_location(ctx)
-        event_timezone = get_timezone(time)
+    def add_event_conversation(self):
+        """
+        Builds the wizard behind !events add.
+        """
+        return Conversation(
+            "event_add",
+            [
+                Step("name", "Please enter the event name:"),
+                Step("description", "Please enter the event description:"),
+                Step(
+                    "date",
+                    "Please enter the event date in mm/dd/yy format (e.g., 12/31/24):",
+                    parse=self.parse_event_date,
+                ),
+                Step(
+                    "time",
+                    "Please enter the event time in the format 'HH:MM AM/PM Timezone' (e.g., 12:00 PM PDT). Timezone is optional, defaults to EDT.",
+                    parse=self.parse_event_time,
+                ),
+                Step("location", "Please enter the event location:"),
+            ],
+            self.finish_add_event,
+        )
 
-        time_str = format_time(f"{date} {time}")
+    async def finish_add_event(self, session):
+        """Creates event, adds to guild events list, prints confirmation embed"""
+        answers = session.answers
+        name = answers["name"]
+        event_timezone = get_timezone(answers["time"])
+        time_str = format_time(f"{answers['date']} {answers['time']}")
 
-        guild_data = self.bot.db.get_data("guild", ctx.guild.id)
-        new_event_id = int(datetime.now(timezone.utc).timestamp() * 1000)
+        new_event_id = self.bot.id_generator.next_id()
         new_event_data = self.create_event_data(
             new_event_id,
             name,
-            event_description,
+            answers["description"],
             time_str,
-            location,
+            answers["location"],
             event_timezone,
-            ctx.guild.id,
+            answers["guild_id"],
         )
 
-        self.bot.db.upsert_data(new_event_data)
-        guild_data.append_value("event", new_event_id)
-        self.bot.db.upsert_data(guild_data)
+        conflicts = await self.find_conflicts(new_event_data)
+        if conflicts:
+            await self.bot.send_conversation_message(
+                session, self.create_conflict_warning_embed(name, conflicts)
+            )
+
+        await self.bot.db.upsert_data(new_event_data)
+        await self.bot.db.add_to_set(
+            "guild", answers["guild_id"], "event", [new_event_id]
+        )
+        self.bot.dispatch("event_create", new_event_data)
 
         embed = self.create_confirmation_embed(
             name,
-            event_description,
+            answers["description"],
             localize_datetime(time_str, new_event_data.get_value("timezone")),
-            location,
+            answers["location"],
             new_event_id,
         )
-        await ctx.send(embed=embed)
+        await self.bot.send_conversation_message(session, embed)
         self.bot.logger.info(f"Event '{name}' added with ID {new_event_id}.")
 
+    @events.command(
+        name="import",
+        help="Import events from an attached .ics or .csv file. Usage: !events import",
+    )
+    @commands.has_permissions(administrator=True)
+    async def import_events(self, ctx):
+        """
+        Bulk imports events from an attached calendar file in chunked upserts
+        """
+        self.bot.logger.info(f"User {ctx.author} is importing events.")
+        if not ctx.message.attachments:
+            await ctx.send("Please attach a .ics or .csv file to import.")
+            return
+
+        attachment = ctx.message.attachments[0]
+        if attachment.size > MAX_IMPORT_SIZE:
+            await ctx.send(
+                f"Files larger than {MAX_IMPORT_SIZE // 1000} KB cannot be imported."
+            )
+            return
+
+        data = await attachment.read()
+        imported_ids, errors = [], []
+        try:
+            rows = iter_event_rows(data, attachment.filename)
+            for chunk in chunked(rows, IMPORT_CHUNK_SIZE):
+                new_events = []
+                for line, fields, error in chunk:
+                    if error:
+                        errors.append(f"Line {line}: {error}")
+                        continue
+                    event = self.create_event_data(
+                        self.bot.id_generator.next_id(),
+                        fields["name"],
+                        fields["description"],
+                        fields["datetime"],
+                        fields["location"],
+                        fields["timezone"],
+                        ctx.guild.id,
+                    )
+                    # ICS events may also set their end time and recurrence
+                    new_events.append(Data.from_dict({**event.to_dict(), **fields}))
+
+                await self.bot.db.upsert_bulk_data("event", new_events)
+                imported_ids += [event.get_value("id") for event in new_events]
+                for event in new_events:
+                    self.bot.dispatch("event_create", event)
+        except ValueError as e:
+            await ctx.send(str(e))
+            return
+        finally:
+            # Link whatever was written, even if a later chunk failed
+            await self.bot.db.add_to_set("guild", ctx.guild.id, "event", imported_ids)
+
+        await ctx.send(embed=self.create_import_embed(len(imported_ids), errors))
+        self.bot.logger.info(
+            f"Imported {len(imported_ids)} events for guild {ctx.guild.id} "
+            f"with {len(errors)} errors."
+        )
+
+    def create_import_embed(self, imported: int, errors: list):
+        """Creates an embed summarizing an event import."""
+        embed = discord.Embed(
+            title="Events Imported",
+            description=f"{imported} events have been added to the calendar.",
+            color=discord.Color.green() if not errors else discord.Color.orange(),
+        )
+        if errors:
+            shown = "\n".join(errors[:MAX_IMPORT_ERRORS_SHOWN])
+            if len(errors) > MAX_IMPORT_ERRORS_SHOWN:
+                shown += f"\n...and {len(errors) - MAX_IMPORT_ERRORS_SHOWN} more"
+            embed.add_field(
+                name=f"Skipped {len(errors)} rows", value=shown, inline=False
+            )
+        return embed
+
     def create_confirmation_embed(
         self, name, event_description, datetime_str, location, event_id
     ):
@@ -156,77 +579,30 @@ class Events(commands.Cog):
         embed.description = f"The event '{name}' has been added to the calendar."
         return embed
 
-    async def ask_for_event_name(self, ctx):
-        """Asks for the event name and returns it."""
-        await ctx.send("Please enter the event name:")
-        name_message = await self.bot.wait_for(
-            "message", check=lambda m: m.author == ctx.author
-        )
-        self.bot.logger.info(f"Event name received: {name_message.content}")
-        return name_message.content
-
-    async def ask_for_event_description(self, ctx):
-        """Asks for the event description and returns it."""
-        await ctx.send("Please enter the event description:")
-        description_message = await self.bot.wait_for(
-            "message", check=lambda m: m.author == ctx.author
-        )
-        self.bot.logger.info(
-            f"Event description received: {description_message.content}"
-        )
-        return description_message.content
-
-    async def ask_for_event_date(self, ctx):
-        """Asks for the event date in mm/dd/yy format and returns it."""
-        date_pattern = re.compile(r"^(0[1-9]|1[0-2])\/(0[1-9]|[12][0-9]|3[01])\/\d{2}$")
-
-        while True:
-            await ctx.send(
-                "Please enter the event date in mm/dd/yy format (e.g., 12/31/24):"
-            )
-            date_message = await self.bot.wait_for(
-                "message", check=lambda m: m.author == ctx.author
+    def parse_event_date(self, text, answers):
+        """Checks that a date is in mm/dd/yy format and returns it."""
+        date_input = text.strip()
+        if not EVENT_DATE_PATTERN.match(date_input):
+            raise ValueError(
+                "Invalid date format. Please enter the date in mm/dd/yy format."
             )
-            date_input = date_message.content.strip()
+        self.bot.logger.info(f"Event date received: {date_input}")
+        return date_input
 
-            # Check if the input matches the mm/dd/yy format
-            if date_pattern.match(date_input):
-                self.bot.logger.info(f"Event date received: {date_input}")
-                return date_input
-            else:
-                await ctx.send(
-                    "Invalid date format. Please enter the date in mm/dd/yy format."
-                )
+    def parse_event_time(self, text, answers):
+        """Checks that a time is in 'HH:MM AM/PM Timezone' format and returns it."""
+        time_input = text.strip()
+        if not EVENT_TIME_PATTERN.match(time_input):
+            raise ValueError("Invalid time format.")
 
-    async def ask_for_event_location(self, ctx):
-        """Asks for the event location and returns it."""
-        await ctx.send("Please enter the event location:")
-        location_message = await self.bot.wait_for(
-            "message", check=lambda m: m.author == ctx.author
-        )
-        self.bot.logger.info(f"Event location received: {location_message.content}")
-        return location_message.content
+        # Check that the timezone abbreviation is one we can resolve
+        try:
+            get_timezone(time_input)
+        except ValueError:
+            raise ValueError("Unknown timezone. Try one of ET, CT, MT, PT or UTC.")
 
-    async def ask_for_event_time(self, ctx):
-        """Asks for the event time in 'HH:MM AM/PM Timezone' format and returns it."""
-        # Regular expression to match "HH:MM AM/PM" with an optional timezone
-        time_pattern = re.compile(r"^(0[1-9]|1[0-2]):[0-5][0-9] (AM|PM)( [A-Z]{2,4})?$")
-
-        while True:
-            await ctx.send(
-                "Please enter the event time in the format 'HH:MM AM/PM Timezone' (e.g., 12:00 PM PDT). Timezone is optional, defaults to EDT."
-            )
-            time_message = await self.bot.wait_for(
-                "message", check=lambda m: m.author == ctx.author
-            )
-            time_input = time_message.content.strip()
-
-            # Check if the input matches the required time format
-            if time_pattern.match(time_input):
-                self.bot.logger.info(f"Event time received: {time_input}")
-                return time_input
-            else:
-                await ctx.send("Invalid time format.")
+        self.bot.logger.info(f"Event time received: {time_input}")
+        return time_input
 
     def create_event_data(
         self,
@@ -239,13 +615,18 @@ class Events(commands.Cog):
         guild_id: int,
     ):
         """Creates a new event data object."""
-        new_event_data = self.bot.db.create_data("event", event_id)
+        new_event_data = Data.from_template("event", event_id)
 
         new_event_data.set_value("name", name)  # Should be a string
         new_event_data.set_value("description", description)
         new_event_data.set_value("datetime", time_str)  # string
         new_event_data.set_value("location", location)  # string
         new_event_data.set_value("timezone", event_timezone)  # string
+        start_time = to_epochs([time_str], event_timezone)[0]
+        new_event_data.set_value(
+            "start_time", start_time
+        )  # UTC epoch, used for range queries
+        new_event_data.set_value("end_time", start_time + DEFAULT_DURATION)  # UTC epoch
         new_event_data.set_value("guild_id", guild_id)  # int
 
         self.bot.logger.info(f"Event data created for event ID {event_id}.")
@@ -270,6 +651,468 @@ class Events(commands.Cog):
         embed.add_field(name="Event ID", value=str(event_id), inline=False)
         return embed
 
+    # * * * * * Recurrence * * * * * #
+    async def get_guild_event(self, ctx, event_id: int):
+        """Fetches an event of this guild, telling the user if there is none."""
+        event_data = await self.bot.db.get_data("event", event_id)
+        if not event_data or event_data.get_value("guild_id") != ctx.guild.id:
+            await ctx.send(f"No event found with ID: {event_id}.")
+            return None
+        return event_data
+
+    @events.command(
+        name="repeat",
+        help="Make an event repeat. Usage: !events repeat [event_id] [daily/weekly/biweekly/monthly] [times]",
+    )
+    async def repeat_event(self, ctx, event_id: int, frequency: str, times: int = None):
+        """Turns an event into a series repeating from its date, optionally a set number of times."""
+        self.bot.logger.info(
+            f"User {ctx.author} is making event {event_id} repeat {frequency}."
+        )
+        event_data = await self.get_guild_event(ctx, event_id)
+        if not event_data:
+            return
+
+        rule = RULE_SHORTCUTS.get(frequency.lower())
+        if rule and times is not None:
+            rule += f";COUNT={times}"
+        try:
+            parse_rule(rule or "")
+        except ValueError:
+            await ctx.send(
+                "Invalid repeat. Please use daily, weekly, biweekly or monthly, "
+                "optionally followed by a positive number of times."
+            )
+            return
+
+        # Events saved before recurrence existed lack its fields, so start from the template
+        event_data = Data.from_dict(
+            {
+                **copy.deepcopy(templates["event"]),
+                **event_data.to_dict(),
+                "recurrence": rule,
+                "recurrence_end": series_end(
+                    event_data.get_value("datetime"),
+                    event_data.get_value("timezone"),
+                    rule,
+                ),
+                "exceptions": [],
+            }
+        )
+        await self.bot.db.upsert_data(event_data)
+        self.bot.dispatch("event_create", event_data)
+
+        embed = self.create_event_embed(
+            event_data.get_value("name"),
+            event_data.get_value("description"),
+            localize_datetime(
+                event_data.get_value("datetime"), event_data.get_value("timezone")
+            ),
+            event_data.get_value("location"),
+            event_id,
+        )
+        embed.title = "Event Repeats"
+        embed.description = f"The event '{event_data.get_value('name')}' now repeats."
+        embed.add_field(name="Repeats", value=describe_rule(rule), inline=False)
+        await ctx.send(embed=embed)
+
+    @events.command(
+        name="skip",
+        help="Cancel one occurrence of a repeating event. Usage: !events skip [event_id] [mm/dd/yy]",
+    )
+    async def skip_occurrence(self, ctx, event_id: int, date: str):
+        """Adds the occurrence on a date to a series' exceptions."""
+        event_data = await self.get_guild_event(ctx, event_id)
+        if not event_data:
+            return
+
+        rule = event_data.to_dict().get("recurrence")
+        if not rule:
+            await ctx.send(f"Event {event_id} does not repeat.")
+            return
+
+        tz_name = event_data.get_value("timezone")
+        try:
+            lower, upper = self.date_range_to_epochs(date, date, tz_name)
+        except ValueError:
+            await ctx.send("Invalid date format. Please use mm/dd/yy.")
+            return
+
+        exceptions = event_data.get_list("exceptions")
+        occurrence = next(
+            occurrences(
+                event_data.get_value("datetime"),
+                tz_name,
+                rule,
+                lower,
+                upper,
+                exceptions,
+            ),
+            None,
+        )
+        if occurrence is None:
+            await ctx.send(f"Event {event_id} does not occur on {date}.")
+            return
+
+        await self.bot.db.add_to_set("event", event_id, "exceptions", [occurrence])
+        event_data.append_to_list("exceptions", occurrence)
+        self.bot.dispatch("event_create", event_data)
+        await ctx.send(
+            embed=discord.Embed(
+                title="Occurrence Skipped",
+                description=f"'{event_data.get_value('name')}' will not take place on {date}.",
+                color=discord.Color.orange(),
+            )
+        )
+        self.bot.logger.info(f"Skipped event {event_id} on {date}.")
+
+    # * * * * * Search * * * * * #
+    async def build_search_index(self, guild_id: int):
+        """Indexes every event of a guild for keyword search."""
+        # Registered before loading so that events written meanwhile are indexed too
+        index = self.search_indexes[guild_id] = SearchIndex()
+        events = await self.bot.db.search_range(
+            "event", "start_time", criteria={"guild_id": guild_id}
+        )
+        for event in events:
+            index.add(event.get_value("id"), event.to_dict())
+        self.bot.logger.info(
+            f"Indexed {len(index)} events for search in guild {guild_id}."
+        )
+        return index
+
+    async def search_events(self, guild_id: int, query: str):
+        """
+        Finds a guild's events matching a query, best match first.
+
+        The in-memory index is built on the first search. While it loads, the
+        database text index answers instead, if the deployment has one.
+        """
+        build = self.search_builds.get(guild_id)
+        if build is None or (build.done() and (build.cancelled() or build.exception())):
+            build = self.search_builds[guild_id] = asyncio.create_task(
+                self.build_search_index(guild_id)
+            )
+
+        if not build.done():
+            try:
+                return await self.bot.db.text_search(
+                    "event", query, {"guild_id": guild_id}, limit=EVENTS_PAGE_SIZE
+                )
+            except Exception as e:
+                self.bot.logger.warning(
+                    f"Text index unavailable, waiting for search index: {e}"
+                )
+
+        index = await build
+        ids = [event_id for event_id, _ in index.search(query, EVENTS_PAGE_SIZE)]
+        if not ids:
+            return []
+        events = await self.bot.db.search_data("event", {"id": {"$in": ids}})
+        rank = {event_id: position for position, event_id in enumerate(ids)}
+        return sorted(events, key=lambda event: rank[event.get_value("id")])
+
+    @events.command(
+        name="search",
+        help="Search events by keyword. Usage: !events search [terms]",
+    )
+    async def search(self, ctx, *, terms: str):
+        """Lists the guild events best matching the search terms."""
+        self.bot.logger.info(f"User {ctx.author} searched events for '{terms}'.")
+        results = await self.search_events(ctx.guild.id, terms)
+        if not results:
+            await ctx.send(
+                embed=discord.Embed(
+                    title="No Results",
+                    description=f"No events match '{terms}'.",
+                    color=discord.Color.red(),
+                )
+            )
+            return
+        await ctx.send(
+            embed=self.create_events_embed(results, f"Results for '{terms}'")
+        )
+
+    # * * * * * Conflicts * * * * * #
+    @staticmethod
+    def location_key(location: str) -> str:
+        """Normalizes a location so that differently typed names of a room match."""
+        return " ".join((location or "").lower().split())
+
+    @staticmethod
+    def event_intervals(event: Data, now: float):
+        """Returns the [start, end) times an event occupies, expanding series around now."""
+        fields = event.to_dict()
+        start_time = fields["start_time"]
+        duration = (
+            fields.get("end_time") or start_time + DEFAULT_DURATION
+        ) - start_time
+        if not fields.get("recurrence"):
+            return [(start_time, start_time + duration)]
+
+        return [
+            (start, start + duration)
+            for start in occurrences(
+                fields["datetime"],
+                fields["timezone"],
+                fields["recurrence"],
+                now - CONFLICT_HORIZON,
+                now + CONFLICT_HORIZON,
+                fields["exceptions"],
+            )
+        ]
+
+    async def load_schedule(self, guild_id: int):
+        """Builds a guild's location trees from the event collection on first use."""
+        if guild_id not in self.schedules:
+            self.schedules[guild_id] = {}
+            events = await self.bot.db.search_range(
+                "event", "start_time", criteria={"guild_id": guild_id}
+            )
+            for event in events:
+                self.index_event(event)
+            self.bot.logger.info(
+                f"Indexed {len(events)} events for conflicts in guild {guild_id}."
+            )
+        return self.schedules[guild_id]
+
+    def index_event(self, event: Data):
+        """Adds or replaces an event in its guild's schedule, if that schedule is loaded."""
+        event_id, guild_id = event.get_value("id"), event.get_value("guild_id")
+        self.unindex_event(event_id)
+        location = self.location_key(event.get_value("location"))
+        if guild_id not in self.schedules or not location:
+            return
+
+        tree = self.schedules[guild_id].setdefault(location, IntervalTree())
+        intervals = self.event_intervals(event, time.time())
+        for start, end in intervals:
+            tree.insert(start, end, event_id)
+        self.scheduled[event_id] = (
+            guild_id,
+            location,
+            event.get_value("name"),
+            event.get_value("timezone") or DEFAULT_TIMEZONE,
+            intervals,
+        )
+
+    def unindex_event(self, event_id: int):
+        """Removes an event from its guild's schedule."""
+        entry = self.scheduled.pop(event_id, None)
+        if entry:
+            guild_id, location, _, _, intervals = entry
+            tree = self.schedules[guild_id][location]
+            for start, end in intervals:
+                tree.remove(start, end, event_id)
+
+    async def find_conflicts(self, event: Data):
+        """
+        Finds other events at the same location overlapping an event.
+
+        Returns:
+            list: (start_time, event_id) of each overlapping occurrence, by start time.
+        """
+        schedule = await self.load_schedule(event.get_value("guild_id"))
+        tree = schedule.get(self.location_key(event.get_value("location")))
+        if not tree:
+            return []
+
+        conflicts = set()
+        for start, end in self.event_intervals(event, time.time()):
+            for other_start, _, other_id in tree.overlapping(start, end):
+                if other_id != event.get_value("id"):
+                    conflicts.add((other_start, other_id))
+        return sorted(conflicts)
+
+    def describe_occurrence(self, start_time: float, event_id: int) -> str:
+        """Describes an indexed event occurrence as its name and local time."""
+        _, _, name, tz_name, _ = self.scheduled[event_id]
+        when = format_epochs([start_time], tz_name, DATETIME_TZ_FORMAT)[0]
+        return f"{name} ({when}, ID {event_id})"
+
+    def create_conflict_warning_embed(self, name: str, conflicts: list):
+        """Creates an embed warning that a new event overlaps existing ones."""
+        embed = discord.Embed(
+            title="Scheduling Conflict",
+            description=f"'{name}' overlaps with these events at the same location:",
+            color=discord.Color.orange(),
+        )
+        lines = [
+            self.describe_occurrence(start, event_id)
+            for start, event_id in conflicts[:MAX_CONFLICTS_SHOWN]
+        ]
+        if len(conflicts) > MAX_CONFLICTS_SHOWN:
+            lines.append(f"...and {len(conflicts) - MAX_CONFLICTS_SHOWN} more")
+        embed.add_field(name="Conflicts", value="\n".join(lines), inline=False)
+        return embed
+
+    @events.command(
+        name="conflicts",
+        help="List overlapping events at the same location. Usage: !events conflicts [mm/dd/yy] [mm/dd/yy]",
+    )
+    @commands.has_permissions(administrator=True)
+    async def list_conflicts(self, ctx, start_date: str, end_date: str):
+        """Lists every pair of same-location events that overlap within a date range."""
+        try:
+            lower, upper = self.date_range_to_epochs(start_date, end_date)
+        except ValueError:
+            await ctx.send("Invalid date format. Please use mm/dd/yy for both dates.")
+            return
+
+        schedule = await self.load_schedule(ctx.guild.id)
+        pairs = []
+        for tree in schedule.values():
+            for interval in tree.overlapping(lower, upper):
+                start, end, event_id = interval
+                # Each pair is reported once, from its earlier interval
+                pairs += [
+                    (start, event_id, other[0], other[2])
+                    for other in tree.overlapping(start, end)
+                    if other > interval
+                ]
+        pairs.sort()
+
+        embed = discord.Embed(
+            title=f"Conflicts Between {start_date} and {end_date}",
+            description=(
+                f"Found {len(pairs)} overlapping pairs of events."
+                if pairs
+                else "No events overlap at the same location."
+            ),
+            color=discord.Color.orange() if pairs else discord.Color.green(),
+        )
+        for start, event_id, other_start, other_id in pairs[:MAX_CONFLICTS_SHOWN]:
+            embed.add_field(
+                name=self.scheduled[event_id][1].title() or "Unknown location",
+                value=f"{self.describe_occurrence(start, event_id)}\n"
+                f"{self.describe_occurrence(other_start, other_id)}",
+                inline=False,
+            )
+        await ctx.send(embed=embed)
+        self.bot.logger.info(
+            f"Listed {len(pairs)} conflicts for guild {ctx.guild.id} on request of {ctx.author}."
+        )
+
+    # * * * * * Attendance * * * * * #
+    @events.command(
+        name="checkin",
+        help="Post a check-in button for an event. Usage: !events checkin [event_id]",
+    )
+    async def open_checkin(self, ctx, event_id: int):
+        """Posts a button members click to record their attendance."""
+        event_data = await self.bot.db.get_data("event", event_id)
+        if not event_data or event_data.get_value("guild_id") != ctx.guild.id:
+            await ctx.send(f"No event found with ID: {event_id}.")
+            return
+
+        self.attendance.open(event_id, event_data.get_list("user"))
+
+        embed = discord.Embed(
+            title=f"Check In: {event_data.get_value('name')}",
+            description="Click the button below to record your attendance.",
+            color=discord.Color.blue(),
+        )
+        embed.add_field(
+            name="Date/Time", value=event_data.get_value("datetime"), inline=True
+        )
+        embed.add_field(
+            name="Location", value=event_data.get_value("location"), inline=True
+        )
+
+        # The button has no callback; on_interaction handles it by custom_id,
+        # so buttons posted before a restart keep working
+        view = discord.ui.View(timeout=None)
+        view.add_item(
+            discord.ui.Button(
+                label="Check In",
+                style=discord.ButtonStyle.green,
+                custom_id=f"{CHECKIN_PREFIX}{event_id}",
+            )
+        )
+        await ctx.send(embed=embed, view=view)
+        self.bot.logger.info(f"User {ctx.author} opened check-in for event {event_id}.")
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        """
+        Records check-in button clicks in memory and confirms immediately.
+        Clicks on an event whose attendees are not in memory, e.g. after a
+        restart, are deferred while one shared read reopens it.
+        """
+        if interaction.type != discord.InteractionType.component:
+            return
+        custom_id = (interaction.data or {}).get("custom_id", "")
+        if not custom_id.startswith(CHECKIN_PREFIX):
+            return
+
+        try:
+            event_id = int(custom_id[len(CHECKIN_PREFIX) :])
+        except ValueError:
+            return
+
+        send = interaction.response.send_message
+        if not self.attendance.is_open(event_id):
+            # Answer within the interaction deadline before reading the database
+            await interaction.response.defer(ephemeral=True)
+            send = interaction.followup.send
+            if not await self.load_attendance(event_id):
+                await send("This event no longer exists.", ephemeral=True)
+                return
+
+        if self.attendance.check_in(event_id, interaction.user.id):
+            message = "You're checked in!"
+        else:
+            message = "You're already checked in."
+        await send(message, ephemeral=True)
+
+    async def load_attendance(self, event_id: int) -> bool:
+        """
+        Reopens an event's check-ins from its stored attendees. Concurrent
+        calls for the same event share one database read.
+
+        Returns:
+            bool: False if the event does not exist.
+        """
+
+        async def load():
+            try:
+                event_data = await self.bot.db.get_data("event", event_id)
+                if not event_data:
+                    return False
+                self.attendance.open(event_id, event_data.get_list("user"))
+                return True
+            finally:
+                self.attendance_loads.pop(event_id, None)
+
+        task = self.attendance_loads.get(event_id)
+        if task is None:
+            task = self.attendance_loads[event_id] = asyncio.create_task(load())
+        # A cancelled caller must not cancel the read other clicks are waiting on
+        return await asyncio.shield(task)
+
+    @tasks.loop(seconds=ATTENDANCE_FLUSH_INTERVAL)
+    async def flush_attendance(self):
+        await self.write_attendance()
+
+    async def write_attendance(self):
+        """
+        Writes buffered check-ins with one $addToSet per event and per attendee list,
+        putting them back in the buffer if a write fails.
+        """
+        for event_id, user_ids in self.attendance.drain().items():
+            try:
+                await self.bot.db.add_to_set("event", event_id, "user", user_ids)
+                await self.bot.db.add_to_set_many("user", user_ids, "event", event_id)
+            except Exception as e:
+                self.attendance.requeue(event_id, user_ids)
+                self.bot.logger.error(
+                    f"Failed to record attendance for event {event_id}: {e}"
+                )
+            else:
+                self.bot.logger.info(
+                    f"Recorded {len(user_ids)} check-ins for event {event_id}."
+                )
+
     @events.command(
         name="delete",
         help="Deletes a specific event given id. Usage: !event delete [id]",
@@ -281,10 +1124,11 @@ class Events(commands.Cog):
         self.bot.logger.info(
             f"User {ctx.author} is attempting to delete event ID {id}."
         )
-        event_data = self.bot.db.get_data("event", id)
+        event_data = await self.bot.db.get_data("event", id)
 
         if event_data:
-            self.bot.db.soft_delete("event", id)
+            await self.bot.db.soft_delete("event", id)
+            self.bot.dispatch("event_delete", id)
             await ctx.send(embed=self.create_event_deletion_embed(id))
             self.bot.logger.info(f"Event ID {id} deleted successfully.")
         else:
@@ -323,8 +1167,21 @@ class Events(commands.Cog):
             f"User {ctx.author} is clearing all events for guild {ctx.guild.id}."
         )
 
-        # Soft delete all future events associated with this guild
-        self.bot.db.bulk_soft_delete_cutoff("event", now())
+        # Soft delete all future events and still-running series of this guild
+        now = time.time()
+        future_events = await self.bot.db.search_range(
+            "event", "start_time", now, criteria={"guild_id": ctx.guild.id}
+        )
+        future_events += await self.bot.db.search_range(
+            "event",
+            "start_time",
+            upper=now,
+            criteria=series_criteria({"guild_id": ctx.guild.id}, now),
+        )
+        event_ids = [event.get_value("id") for event in future_events]
+        await self.bot.db.soft_delete("event", event_ids)
+        for event_id in event_ids:
+            self.bot.dispatch("event_delete", event_id)
 
         # Create an embed to confirm the events have been cleared
         embed = self.create_clear_events_embed()
@@ -334,6 +1191,118 @@ class Events(commands.Cog):
         self.bot.logger.info("All events cleared successfully.")
 
 
+class EventPaginator(discord.ui.View):
+    def __init__(self, author_id: int, first_page, cursor, fetch_page, render):
+        """
+        Page buttons for an event listing.
+
+        Pages already seen are kept, so going back never queries. The next page
+        is fetched in the background as soon as the current one is shown, using
+        the (start_time, id) cursor of the current page's last event.
+
+        Args:
+            author_id (int): The user allowed to turn pages.
+            first_page (discord.Embed): The rendered first page.
+            cursor (tuple): The cursor after the first page.
+            fetch_page (Callable): Coroutine taking a cursor and returning (events, next cursor or None).
+            render (Callable): Renders a list of events as an embed.
+        """
+        super().__init__(timeout=PAGINATOR_TIMEOUT)
+        self.author_id = author_id
+        self.fetch_page = fetch_page
+        self.render = render
+        self.pages = []
+        self.add_page(first_page)
+        self.cursor = cursor
+        self.index = 0
+        self.prefetch = None
+        # Clicks are handled one at a time, so a page is never loaded twice
+        self.turning = asyncio.Lock()
+        self.message = None
+        self.update_buttons()
+        self.start_prefetch()
+
+    def start_prefetch(self):
+        """Starts fetching the page after the last one loaded, if needed."""
+        if (
+            self.prefetch is None
+            and self.cursor is not None
+            and self.index == len(self.pages) - 1
+        ):
+            self.prefetch = asyncio.create_task(self.fetch_page(self.cursor))
+
+    async def load_next(self):
+        """Waits for the prefetched page and appends it."""
+        task, self.prefetch = self.prefetch, None
+        if task is None:
+            return
+        events, self.cursor = await task
+        if events:
+            self.add_page(self.render(events))
+
+    def add_page(self, embed: discord.Embed):
+        embed.set_footer(text=f"Page {len(self.pages) + 1}")
+        self.pages.append(embed)
+
+    def update_buttons(self):
+        self.previous_page.disabled = self.index == 0
+        self.next_page.disabled = (
+            self.index == len(self.pages) - 1 and self.cursor is None
+        )
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message(
+                "Run the command yourself to browse events.", ephemeral=True
+            )
+            return False
+        return True
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.gray)
+    async def previous_page(self, interaction: discord.Interaction, button):
+        # Answer within Discord's deadline even while another click loads a page
+        await interaction.response.defer()
+        async with self.turning:
+            self.index = max(self.index - 1, 0)
+            self.update_buttons()
+            await interaction.edit_original_response(
+                embed=self.pages[self.index], view=self
+            )
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.blurple)
+    async def next_page(self, interaction: discord.Interaction, button):
+        # The next page may still be loading, so answer before waiting for it
+        await interaction.response.defer()
+        async with self.turning:
+            if self.index == len(self.pages) - 1:
+                self.start_prefetch()
+                try:
+                    await self.load_next()
+                except Exception:
+                    await interaction.followup.send(
+                        "Could not load the next page. Please try again.",
+                        ephemeral=True,
+                    )
+                    return
+            if self.index < len(self.pages) - 1:
+                self.index += 1
+            self.update_buttons()
+            await interaction.edit_original_response(
+                embed=self.pages[self.index], view=self
+            )
+        self.start_prefetch()
+
+    async def on_timeout(self):
+        if self.prefetch:
+            self.prefetch.cancel()
+        self.pages.clear()
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+
 # Setup function to load the cog
 async def setup(bot):
     await bot.add_cog(Events(bot))
@@ -1,8 +1,15 @@
 import discord
 from datetime import datetime, timezone
 from discord.ext import commands
+from modules.settings import SETTINGS
 from modules.timestamp import now, format_time
 
+def format_setting(name, value):
+    """Shows a setting as a channel or role mention."""
+    if value is None:
+        return "Not set"
+    return f"<#{value}>" if SETTINGS[name] == "channel" else f"<@&{value}>"
+
 class Guild(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -16,28 +23,25 @@ class Guild(commands.Cog):
 
     @settings.command(name="list", help="List server settings")
     async def list_settings(self, ctx):
-        guild = self.bot.db.get_data("guild", ctx.guild.id)
+        settings = await self.bot.settings.get(ctx.guild.id)
         embed = discord.Embed(
             title="Server Settings",
             color=discord.Color.green(),
         )
-        embed.add_field(name="announcements_channel", value=guild.get_value("announcements_channel"), inline=False)
-        embed.add_field(name="moderator_channel", value=guild.get_value("moderator_channel"), inline=False)
-        embed.add_field(name="eboard_role", value=guild.get_value("eboard_role"), inline=False)
+        for name, value in settings.to_dict().items():
+            embed.add_field(name=name, value=format_setting(name, value), inline=False)
 
         await ctx.send(embed=embed)
 
     @settings.command(name="set", help="Change a server setting")
     @commands.has_permissions(administrator=True)
     async def modify_setting(self, ctx, name : str, value):
-        guild = self.bot.db.get_data("guild", ctx.guild.id)
         try:
-            previous_value = str(guild.get_value(name))
-            guild.set_value(name, value)
-            self.bot.db.upsert_data(guild)
+            previous_value = await self.bot.settings.set(ctx.guild.id, name, value)
+            new_value = getattr(self.bot.settings.cached(ctx.guild.id), name)
             valid_embed = discord.Embed(
                 title="Success!",
-                description=f"'{name}' changed to '{value}' from '{previous_value}'.",
+                description=f"'{name}' changed to {format_setting(name, new_value)} from {format_setting(name, previous_value)}.",
                 color=discord.Color.green(),
             )
             await ctx.send(embed=valid_embed)
@@ -49,6 +53,13 @@ class Guild(commands.Cog):
                 color=discord.Color.red(),
             )
             await ctx.send(embed=fail_embed)
+        except ValueError as e:
+            fail_embed = discord.Embed(
+                title=f"Invalid value for {name}!",
+                description=f"{e} Mention the channel or role, or paste its ID.",
+                color=discord.Color.red(),
+            )
+            await ctx.send(embed=fail_embed)
 
 # Setup function to load the cog
 async def setup(bot):
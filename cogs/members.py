@@ -0,0 +1,320 @@
+# cogs/members.py - searches the server's member profiles
+
+import time
+import discord
+import logging
+import tempfile
+from discord.ext import commands
+from modules.cache import LRUCache
+from modules.importer import chunked
+from modules.majors import get_catalog
+from modules.roster import iter_roster_rows, write_roster
+
+# Seconds a server's facet counts are reused before they are recounted
+FACET_TTL = 60
+# Servers whose facet counts are kept at once
+FACET_CACHE_SIZE = 100
+
+# Members listed per search, and values listed per facet on the dashboard
+MAX_RESULTS = 25
+MAX_FACET_VALUES = 10
+
+# Roster import limits: rows per database write, upload size and errors echoed back
+ROSTER_CHUNK_SIZE = 500
+MAX_ROSTER_SIZE = 5_000_000
+MAX_ROSTER_ERRORS_SHOWN = 10
+# Exported rosters larger than this are buffered on disk rather than in memory
+ROSTER_SPOOL_SIZE = 1_000_000
+
+# Seconds between edits of a sync's progress message
+SYNC_PROGRESS_INTERVAL = 2
+
+
+class Members(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.logger = logging.getLogger(
+            f"discord.cog.{self.__class__.__name__.lower()}"
+        )
+        # Per guild, counts of members by major and graduation year
+        self.facets = LRUCache(FACET_CACHE_SIZE)
+
+    @commands.group(name="members", help="Search member profiles.")
+    @commands.guild_only()
+    async def members(self, ctx):
+        if ctx.invoked_subcommand is None:
+            embed = discord.Embed(
+                title="Member Commands",
+                description="!members search - Shows how many members have each major and graduation year.\n!members search [major] [year] - Lists members with a major and/or graduation year.\n!members import - Imports an attached .csv or .ndjson roster.\n!members export [csv/ndjson] - Exports the roster as a gzipped file.\n!members sync - Updates the stored member list from the server.",
+                color=discord.Color.purple(),
+            )
+            await ctx.send(embed=embed)
+
+    @members.command(
+        name="search",
+        help="Search members by major and graduation year. Usage: !members search [major] [year]",
+    )
+    @commands.has_permissions(administrator=True)
+    async def search(self, ctx, *, query: str = ""):
+        """
+        Lists the members matching a major and/or graduation year, or shows
+        the facet dashboard when no filter is given.
+        """
+        try:
+            criteria = self.parse_query(query)
+        except ValueError as e:
+            await ctx.send(str(e))
+            return
+
+        if not criteria:
+            await ctx.send(embed=await self.facet_embed(ctx.guild))
+            return
+
+        criteria["guild"] = ctx.guild.id
+        # search_data adds the deleted flag to the criteria it is given
+        users = await self.bot.db.search_data("user", dict(criteria), limit=MAX_RESULTS)
+        total = await self.bot.db.count_data("user", criteria)
+        self.logger.info(
+            f"User {ctx.author} searched members of {ctx.guild.id} with {criteria}"
+        )
+        await ctx.send(embed=self.results_embed(query, users, total))
+
+    @members.command(
+        name="import",
+        help="Import member profiles from an attached .csv or .ndjson roster, optionally gzipped. Usage: !members import",
+    )
+    @commands.has_permissions(administrator=True)
+    async def import_roster(self, ctx):
+        """
+        Bulk imports member profiles from an attached roster in chunked upserts,
+        adding every imported member to the server. Only the server's current
+        members are imported, and only fields their profiles leave empty are filled.
+        """
+        self.logger.info(f"User {ctx.author} is importing a roster.")
+        if not ctx.message.attachments:
+            await ctx.send("Please attach a .csv or .ndjson roster to import.")
+            return
+
+        attachment = ctx.message.attachments[0]
+        if attachment.size > MAX_ROSTER_SIZE:
+            await ctx.send(
+                f"Files larger than {MAX_ROSTER_SIZE // 1_000_000} MB cannot be imported."
+            )
+            return
+
+        data = await attachment.read()
+        imported, errors = 0, []
+        try:
+            rows = iter_roster_rows(data, attachment.filename)
+            for chunk in chunked(rows, ROSTER_CHUNK_SIZE):
+                updates = {}
+                for line, user, error in chunk:
+                    if error:
+                        errors.append(f"Line {line}: {error}")
+                        continue
+                    id, fields = user
+                    if ctx.guild.get_member(id) is None:
+                        errors.append(
+                            f"Line {line}: {id} is not a member of this server."
+                        )
+                        continue
+                    updates[id] = fields
+
+                # Link both sides together, as membership changes do
+                async with self.bot.members_lock:
+                    await self.bot.db.merge_bulk(
+                        "user",
+                        updates,
+                        add_to_set={"guild": ctx.guild.id},
+                        overwrite=False,
+                    )
+                    await self.bot.db.update_sets_bulk(
+                        "guild", "user", {ctx.guild.id: (list(updates), [])}
+                    )
+                imported += len(updates)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            # OSError covers uploads that claim to be gzipped but are not
+            await ctx.send(f"Could not read the roster: {e}")
+            return
+        finally:
+            # Rows already written change the counts, even if a later chunk failed
+            self.facets.pop(ctx.guild.id)
+
+        await ctx.send(embed=self.create_import_embed(imported, errors))
+        self.logger.info(
+            f"Imported {imported} members for guild {ctx.guild.id} "
+            f"with {len(errors)} errors."
+        )
+
+    def create_import_embed(self, imported, errors):
+        """Creates an embed summarizing a roster import."""
+        embed = discord.Embed(
+            title="Roster Imported",
+            description=f"{imported} member profiles have been imported.",
+            color=discord.Color.green() if not errors else discord.Color.orange(),
+        )
+        if errors:
+            shown = "\n".join(errors[:MAX_ROSTER_ERRORS_SHOWN])
+            if len(errors) > MAX_ROSTER_ERRORS_SHOWN:
+                shown += f"\n...and {len(errors) - MAX_ROSTER_ERRORS_SHOWN} more"
+            embed.add_field(
+                name=f"Skipped {len(errors)} rows", value=shown, inline=False
+            )
+        return embed
+
+    @members.command(
+        name="export",
+        help="Export the server's member profiles as a gzipped roster. Usage: !members export [csv/ndjson]",
+    )
+    @commands.has_permissions(administrator=True)
+    async def export_roster(self, ctx, format: str = "csv"):
+        """
+        Streams the server's member profiles from the database into a gzipped
+        attachment, a batch at a time.
+        """
+        format = format.lower()
+        if format not in ("csv", "ndjson"):
+            await ctx.send("Please choose csv or ndjson.")
+            return
+
+        with tempfile.SpooledTemporaryFile(max_size=ROSTER_SPOOL_SIZE) as stream:
+            count = await write_roster(
+                self.bot.db.iter_data("user", {"guild": ctx.guild.id}), format, stream
+            )
+            if stream.tell() > ctx.guild.filesize_limit:
+                await ctx.send("The roster is too large to upload to this server.")
+                return
+            stream.seek(0)
+            await ctx.send(
+                f"Exported {count} member profiles.",
+                file=discord.File(stream, filename=f"roster.{format}.gz"),
+            )
+        self.logger.info(
+            f"User {ctx.author} exported {count} members of {ctx.guild.id}"
+        )
+
+    @members.command(
+        name="sync",
+        help="Update the stored member list from the server's members. Usage: !members sync",
+    )
+    @commands.has_permissions(administrator=True)
+    async def sync(self, ctx):
+        """
+        Reconciles the stored member list with the server's real members,
+        editing a progress message as it goes.
+        """
+        message = await ctx.send("Syncing members...")
+        last_edit = time.monotonic()
+
+        async def on_progress(progress):
+            nonlocal last_edit
+            if (
+                not progress.done
+                and time.monotonic() - last_edit >= SYNC_PROGRESS_INTERVAL
+            ):
+                last_edit = time.monotonic()
+                try:
+                    await message.edit(content=f"Syncing members: {progress}")
+                except discord.HTTPException as e:
+                    self.logger.warning(f"Could not update sync progress: {e}")
+
+        # A sync already running, e.g. the one at startup, is waited on instead
+        progress = await self.bot.reconcile_guild(ctx.guild, on_progress)
+        self.facets.pop(ctx.guild.id)
+        await message.edit(content=f"Synced members: {progress}")
+        self.logger.info(
+            f"User {ctx.author} synced members of {ctx.guild.id}: {progress}"
+        )
+
+    def parse_query(self, query):
+        """
+        Splits a search into filters: a four-digit word is a graduation year
+        and the rest is a major name, number or abbreviation.
+        """
+        criteria = {}
+        words = []
+        for word in query.split():
+            if word.isdigit() and len(word) == 4:
+                criteria["graduation_year"] = word
+            else:
+                words.append(word)
+
+        if words:
+            major = get_catalog().lookup(" ".join(words))
+            if major is None:
+                raise ValueError(
+                    f"{' '.join(words)} is not a major. Use !profile majors to see the list."
+                )
+            criteria["major"] = major
+        return criteria
+
+    async def facet_counts(self, guild_id, now=None):
+        """
+        Returns a guild's member counts by major and graduation year,
+        counted in one aggregation and reused for FACET_TTL seconds.
+        """
+        now = time.time() if now is None else now
+        counts = self.facets.get(guild_id, now=now)
+        if counts is None:
+            counts = await self.bot.db.count_by(
+                "user", {"guild": guild_id}, ["major", "graduation_year"]
+            )
+            self.facets.set(guild_id, counts, expires_at=now + FACET_TTL)
+        return counts
+
+    async def facet_embed(self, guild):
+        """
+        Builds the dashboard of member counts by major and graduation year.
+        """
+        counts = await self.facet_counts(guild.id)
+        embed = discord.Embed(
+            title=f"{guild.name} Members",
+            description=f"{counts['total']} members have a profile.",
+            color=discord.Color.purple(),
+        )
+        for field, label in (
+            ("major", "Majors"),
+            ("graduation_year", "Graduation Years"),
+        ):
+            ranked = sorted(
+                counts[field].items(), key=lambda item: (-item[1], str(item[0]))
+            )[:MAX_FACET_VALUES]
+            embed.add_field(
+                name=label,
+                value="\n".join(f"{value}: {count}" for value, count in ranked)
+                or "None",
+                inline=True,
+            )
+        return embed
+
+    def results_embed(self, query, users, total):
+        """
+        Builds the list of members found by a search.
+        """
+        embed = discord.Embed(
+            title=f"Members: {query}",
+            description=(
+                f"Showing {len(users)} of {total} members."
+                if total > len(users)
+                else f"{total} members found."
+            ),
+            color=discord.Color.purple(),
+        )
+        users.sort(
+            key=lambda user: (
+                user.get_value("last_name").lower(),
+                user.get_value("first_name").lower(),
+            )
+        )
+        for user in users:
+            name = f"{user.get_value('first_name')} {user.get_value('last_name')}"
+            embed.add_field(
+                name=name.strip() or str(user.get_value("id")),
+                value=f"{', '.join(user.get_list('major')) or 'No major'} ({user.get_value('graduation_year') or 'n/a'})\n{user.get_value('school_email') or 'No email'}",
+                inline=False,
+            )
+        return embed
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Members(bot))
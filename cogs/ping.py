@@ -22,5 +22,32 @@ class Ping(commands.Cog):
         self.logger.info(message)
         await ctx.send(embed=embed)
 
+    @commands.command(name="outbox", help="Shows the email outbox's queue and latency.")
+    @commands.has_permissions(administrator=True)
+    async def outbox(self, ctx):
+        metrics = await self.bot.outbox.metrics()
+        embed = discord.Embed(title="Email Outbox", color=discord.Color.pink())
+        for name, value in metrics.items():
+            if value is None:
+                value = "n/a"
+            elif name.startswith("latency"):
+                value = f"{value:.1f} s"
+            embed.add_field(name=name.replace("_", " ").title(), value=value)
+        await ctx.send(embed=embed)
+
+    @commands.command(name="startup", help="Shows how long each cog took to load.")
+    @commands.has_permissions(administrator=True)
+    async def startup(self, ctx):
+        embed = discord.Embed(
+            title="Startup",
+            description=f"```{self.bot.extension_loader.report()}```",
+            color=discord.Color.pink(),
+        )
+        # Only recorded when the bot was started with STARTUP_PROFILE set
+        phases = self.bot.startup_profile.summary()
+        if phases:
+            embed.add_field(name="Phases", value=f"```{phases}```", inline=False)
+        await ctx.send(embed=embed)
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(Ping(bot))
@@ -1,6 +1,38 @@
+import math
 import discord
 import logging
 from discord.ext import commands
+from modules.conversation import Conversation, Step
+from modules.data import Data
+from modules.majors import MajorCatalog, get_catalog
+from modules.verification import CODE_LENGTH
+
+# Profile fields asked for by the wizards, as (key, label, question)
+PROFILE_FIELDS = [
+    (
+        "first_name",
+        "First Name",
+        "What is your (preferred) first name? (Example: John)",
+    ),
+    (
+        "last_name",
+        "Last Name",
+        'What is your last name? (Please make sure to capitalize appropriately, e.g "Smith")',
+    ),
+    (
+        "major",
+        "Major",
+        "Respond with the number(s) or name(s) of your current Major, separated by commas (e.g. 13, Math).",
+    ),
+    ("graduation_year", "Graduation Year", "What is your graduation year (YYYY)?"),
+    (
+        "school_email",
+        "RPI Email",
+        "What is your RPI email? Please type out your full email address! (Example: smithj23@rpi.edu)",
+    ),
+    ("student_id", "RIN", "What is your RIN? (Example: 123456789)"),
+]
+
 
 class Profile(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -8,15 +40,20 @@ class Profile(commands.Cog):
         self.logger = logging.getLogger(
             f"discord.cog.{self.__class__.__name__.lower()}"
         )
-        self.major_list = self.load_major_list()
+        self.majors = self.load_majors()
+        # The full list is the same on every prompt, so render it once
+        self.major_embed = discord.Embed(
+            title="Major List", description=self.majors.listing
+        )
+        self.bot.conversations.register(self.create_conversation())
+        self.bot.conversations.register(self.update_conversation())
 
-    def load_major_list(self):
+    def load_majors(self):
         try:
-            with open("resources/majors.txt", "r") as f:
-                return [line.strip() for line in f.readlines()]
+            return get_catalog()
         except FileNotFoundError:
             self.logger.error("majors.txt not found")
-            return []
+            return MajorCatalog([])
 
     @commands.group(
         name="profile", invoke_without_command=True, help="Profile commands."
@@ -39,236 +76,240 @@ class Profile(commands.Cog):
         # Send the welcome message to the user
         dm_embed = discord.Embed(
             title="Welcome to the RPI Discord!",
-            description="We're excited to have you here! Before we get started, we need some information from you to create your profile. Please answer the following questions with your information. (If you made any mistakes, you can update it after completing vertification using the !update command.)",
+            description="We're excited to have you here! Before we get started, we need some information from you to create your profile. Please answer the following questions with your information. (If you made any mistakes, you can update it after completing vertification using the !update command.) Reply cancel at any time to stop.",
             color=discord.Color.purple(),
         )
         await ctx.author.send(embed=dm_embed)
 
-        user = self.bot.db.get_data("user", ctx.author.id)
-        if not user:
-            user = self.bot.db.create_data("user", ctx.author.id)
-        else:
-            await ctx.send(
-                "You already have a profile. Are you sure want to override it? If you do not please use the update command.\n Type Y or N"
-            )
-            msg = await self.bot.wait_for(
-                "message",
-                check=lambda message: message.author == ctx.author
-                and isinstance(message.channel, discord.DMChannel),
-            )
-            if msg.content.lower() == "y":
-                await ctx.send(
-                    "Ok. The profile will be overwritten. If you want to update your profile please use the update command."
-                )
-                user = self.bot.db.create_data("user", ctx.author.id)
-            else:
-                await ctx.send(
-                    "Ok. The profile will not be overwritten. If you want to update your profile please use the update command."
-                )
-                return
-
-        # Ask for user's first name
-        first_name = await self.ask_question(
-            ctx.author, "What is your (preferred) first name? (Example: John)"
+        # Existing profiles are only overwritten once the user confirms
+        user = await self.bot.db.get_data("user", ctx.author.id)
+        channel = ctx.author.dm_channel or await ctx.author.create_dm()
+        await self.bot.conversations.start(
+            "profile_create",
+            ctx.author.id,
+            channel.id,
+            answers={"user_id": ctx.author.id, "guild_id": self.guild_id(ctx)},
+            step="overwrite" if user else "first_name",
         )
-        if first_name is None:
-            return  # Handle if user doesn't respond in time
-
-        # Ask for user's last name
-        last_name = await self.ask_question(
-            ctx.author,
-            'What is your last name? (Please make sure to capitalize appropriately, e.g "Smith")',
-        )
-        if last_name is None:
-            return
 
-        # Ask for user's major
-        major = await self.ask_major(ctx.author)
-        if major is None:
-            return
+    def guild_id(self, ctx):
+        """
+        Returns the ID of the server a command was used in, or None in DMs.
+        """
+        return ctx.guild.id if ctx.guild else None
 
-        # Ask for graduation year
-        grad_year = await self.ask_graduation_year(ctx.author)
-        if grad_year is None:
-            return
+    def linked_guilds(self, user, session):
+        """
+        Returns the user's guilds, including the one the wizard was started from
+        so the member directory can find them.
+        """
+        guilds = user.get_list("guild")
+        guild_id = session.answers.get("guild_id")
+        if guild_id is not None and guild_id not in guilds:
+            guilds.append(guild_id)
+        return guilds
 
-        # Ask for user's RPI email
-        rpi_email = await self.ask_email(ctx.author)
-        if rpi_email is None:
-            return
+    def create_conversation(self):
+        """
+        Builds the profile creation wizard: an optional overwrite confirmation
+        followed by every profile field in order.
+        """
+        overwrite = Step(
+            "overwrite",
+            "You already have a profile. Are you sure want to override it? If you do not please use the update command.\n Type Y or N",
+            parse=lambda text, answers: text.strip().lower() == "y",
+            next=lambda overwrite, answers: "first_name" if overwrite else None,
+            reply=lambda overwrite, answers: (
+                "Ok. The profile will be overwritten."
+                if overwrite
+                else "Ok. The profile will not be overwritten."
+            )
+            + " If you want to update your profile please use the update command.",
+        )
+        steps = [overwrite]
+        for key, label, question in PROFILE_FIELDS:
+            steps += self.field_steps(key, label, question)
+        return Conversation("profile_create", steps, self.finish_create)
 
-        rpi_rin = await self.ask_rin(ctx.author)
-        if rpi_rin is None:
+    async def finish_create(self, session):
+        """
+        Saves the answers of a completed profile creation wizard.
+        """
+        if session.answers.get("overwrite") is False:
             return
 
-        # Create an embed with the collected profile information
-        profile_embed = discord.Embed(
-            title=f"{ctx.author.display_name}'s Profile",
-            description="Here is the information you provided:",
-            color=discord.Color.purple(),
+        # Keep the user's guild and event links if they are overwriting a profile
+        user = await self.bot.db.get_data(
+            "user", session.user_id
+        ) or Data.from_template("user", session.user_id)
+        user = Data.from_dict(
+            {
+                **user.to_dict(),
+                **{key: session.answers[key] for key, _, _ in PROFILE_FIELDS},
+                "guild": self.linked_guilds(user, session),
+            }
         )
-
-        # Add the profile information to the embed
-        profile_embed.set_thumbnail(url=ctx.author.display_avatar.url)
-        profile_embed.add_field(name="First Name", value=first_name, inline=True)
-        profile_embed.add_field(name="Last Name", value=last_name, inline=True)
-        profile_embed.add_field(name="Major", value=", ".join(major), inline=True)
-        profile_embed.add_field(name="Graduation Year", value=grad_year, inline=True)
-        profile_embed.add_field(name="RPI Email", value=rpi_email, inline=True)
-        profile_embed.add_field(name="RPI RIN", value=rpi_rin, inline=True)
-
-        # Save the collected profile information to the database
-        user.set_value("first_name", first_name)
-        user.set_value("last_name", last_name)
-        user.set_value("major", major)
-        user.set_value("graduation_year", grad_year)
-        user.set_value("school_email", rpi_email)
-        user.set_value("student_id", rpi_rin)
-        self.bot.db.upsert_data(user)
+        await self.bot.db.upsert_data(user)
+        self.logger.info(f"User {session.user_id} created their profile")
 
         # Send the profile back to the user for confirmation
-        await ctx.author.send(embed=profile_embed)
+        author = self.bot.get_user(session.user_id) or await self.bot.fetch_user(
+            session.user_id
+        )
+        await self.bot.send_conversation_message(
+            session,
+            self.create_profile_embed(author, user, f"{author.display_name}'s Profile"),
+        )
 
-    async def ask_question(self, user, question):
+    def field_steps(self, key, label, question, updating=False):
         """
-        Sends a question to the user and waits for a response.
-        Returns the user's response or None if they don't respond in time.
+        Returns the steps asking for a profile field. An email is only accepted
+        once the user enters the code sent to it, so it takes two steps.
         """
-        try:
-            await user.send(question)
-
-            # Wait for the user's reply (timeout in seconds)
-            msg = await self.bot.wait_for(
-                "message",
-                check=lambda message: message.author == user
-                and isinstance(message.channel, discord.DMChannel),
-                timeout=60,
-            )
+        if updating:
+            back = lambda value, answers: "aspect"
+            reply = lambda value, answers: f"Your {label} has been updated."
+        else:
+            back = None
+            reply = self.field_reply(key)
+
+        prompt = self.field_prompt(key, question, updating)
+        if key != "school_email":
+            parse = self.field_parser(key)
+            return [Step(key, prompt, parse=parse, next=back, reply=reply)]
+        return [
+            Step("new_email", prompt, parse=self.parse_email),
+            Step(
+                key,
+                lambda answers: f"We emailed a {CODE_LENGTH}-digit code to {answers['new_email']}. Please enter it here, or reply resend for a new code.",
+                parse=self.parse_email_code,
+                next=back,
+                reply=reply,
+            ),
+        ]
 
-            await user.send(f"Your response: {msg.content}")
+    def field_prompt(self, key, question, updating=False):
+        """
+        Returns a prompt builder for a profile field, listing the majors for
+        the major field and the previous answer when updating.
+        """
 
-            return msg.content  # Return the response
-        except discord.TimeoutError:
-            await user.send(
-                "You took too long to respond! Please start the profile setup again."
-            )
-            return None
+        def prompt(answers):
+            previous = ""
+            if updating:
+                value = answers.get(key)
+                if isinstance(value, list):
+                    value = ", ".join(value)
+                previous = f"Your previous response was: {value}\n"
 
-    async def ask_graduation_year(self, user):
+            if key != "major":
+                return previous + question
+            major_embed = self.major_embed.copy()
+            major_embed.description = f"{previous}{question}\n{self.majors.listing}"
+            return major_embed
+
+        return prompt
+
+    def field_parser(self, key):
         """
-        Sends a question to the user regarding the graduation year and waits for a response.
-        Checks if the response is a valid year and returns it if it is.
-        Return None if the user doesn't respond in time or if the response is not a valid year.
+        Returns the parser validating answers for a profile field.
         """
-        while True:
-            grad_year = await self.ask_question(
-                user, "What is your graduation year (YYYY)?"
-            )
-            if grad_year is None:
-                return None
-
-            if grad_year.isdigit() and len(grad_year) == 4:
-                return grad_year
-            else:
-                await user.send(
-                    f"{grad_year} is not a valid year. Please enter a valid year (YYYY)."
-                )
+        return {
+            "major": self.parse_major,
+            "graduation_year": self.parse_graduation_year,
+            "student_id": self.parse_rin,
+        }.get(key, self.parse_name)
 
-    async def ask_major(self, user):
+    def field_reply(self, key):
         """
-        Sends a question to the user regarding the major and waits for a response.
-        Checks if the response is a valid major and returns it if it is.
-        Return None if the user doesn't respond in time or if the response is not a valid major.
+        Returns the acknowledgement sent after a valid answer for a profile field.
         """
-        while True:
-            # Create an embed with the list of majors
-            major_embed = discord.Embed(
-                title="Major List",
-                description="Respond with the number(s) that correspond to your current Major.",
-            )
+        if key == "major":
+            return lambda majors, answers: f"Your selected majors: {', '.join(majors)}"
+        if key == "school_email":
+            return lambda email, answers: f"Verified {email}."
+        return lambda value, answers: f"Your response: {value}"
 
-            for i, major in enumerate(self.major_list):
-                major_embed.description += f"\n{i+1}. {major}"
-            await user.send(embed=major_embed)
+    def parse_name(self, text, answers):
+        """
+        Checks that a name is not blank and returns it.
+        """
+        name = text.strip()
+        if not name:
+            raise ValueError("Please enter a name.")
+        return name
 
-            # Wait for the user's reply (timeout in seconds)
-            msg = await self.bot.wait_for(
-                "message",
-                check=lambda message: message.author == user
-                and isinstance(message.channel, discord.DMChannel),
-                timeout=60,
-            )
+    def parse_graduation_year(self, text, answers):
+        """
+        Checks if the response is a valid year and returns it if it is.
+        """
+        grad_year = text.strip()
+        if grad_year.isdigit() and len(grad_year) == 4:
+            return grad_year
+        raise ValueError(
+            f"{grad_year} is not a valid year. Please enter a valid year (YYYY)."
+        )
 
-            # Split the message via commas to determine the selected majors
-            major_choices = msg.content.split(",")
-            major_choices = [choice.strip() for choice in major_choices]
+    def parse_major(self, text, answers):
+        """
+        Resolves a comma-separated list of major numbers, names or abbreviations.
+        """
+        return self.majors.parse(text)
 
-            # Check if the user's reply contains duplicate majors
-            if len(major_choices) != len(set(major_choices)):
-                await user.send(
-                    f"{msg.content} contains duplicate majors. Please enter a valid major."
-                )
-                continue
-            selected_majors = []
-            valid = True
-
-            # Check if the user's reply is a valid major
-            for choice in major_choices:
-                if choice.isdigit() and 0 <= int(choice) - 1 < len(self.major_list):
-                    selected_majors.append(self.major_list[int(choice) - 1])
-                else:
-                    valid = False
-                    break
-
-            if valid:
-                await user.send(f"Your selected majors: {', '.join(selected_majors)}")
-                return selected_majors
-            else:
-                await user.send(
-                    f"{msg.content} is not a valid major. Please enter a valid major."
-                )
+    async def parse_email(self, text, answers):
+        """
+        Checks if the response is a valid RPI email, then sends it a verification code.
+        """
+        rpi_email = text.strip()
+        if rpi_email[-8:] != "@rpi.edu":
+            raise ValueError(
+                f"{rpi_email} is not a valid email. Please enter a valid email."
+            )
+        await self.send_verification_code(answers["user_id"], rpi_email)
+        return rpi_email
 
-    async def ask_email(self, user):
+    async def parse_email_code(self, text, answers):
         """
-        Sends a question to the user regarding the email and waits for a response.
-        Checks if the response is a valid email and returns it if it is.
-        Return None if the user doesn't respond in time or if the response is not a valid email.
+        Checks the verification code sent to the new email and returns the email once verified.
         """
-        while True:
+        user_id, rpi_email = answers["user_id"], answers["new_email"]
+        if text.strip().lower() == "resend":
+            await self.send_verification_code(user_id, rpi_email)
+            raise ValueError(f"A new code is on its way to {rpi_email}.")
+
+        # Throttled guesses are refused before they reach the database
+        wait = self.bot.verification.retry_after(user_id)
+        if wait:
+            raise ValueError(
+                f"Too many attempts. Please try again in {math.ceil(wait)} seconds."
+            )
+        if not await self.bot.verification.verify(user_id, rpi_email, text):
+            raise ValueError(
+                "That code is wrong or has expired. Reply resend for a new code."
+            )
+        return rpi_email
 
-            rpi_email = await self.ask_question(
-                user,
-                "What is your RPI email? Please type out your full email address! (Example: smithj23@rpi.edu)",
+    async def send_verification_code(self, user_id, rpi_email):
+        """
+        Emails a verification code, raising ValueError if the user has requested too many.
+        """
+        if not await self.bot.verification.send_code(user_id, rpi_email):
+            wait = self.bot.verification.resend_after(user_id)
+            raise ValueError(
+                f"Too many codes requested. Please try again in {math.ceil(wait)} seconds."
             )
-            if rpi_email is None:
-                return None
-
-            if rpi_email[-8:] == "@rpi.edu":
-                return rpi_email
-            else:
-                await user.send(
-                    f"{rpi_email} is not a valid email. Please enter a valid email."
-                )
+        self.logger.info(f"Sent a verification code to user {user_id}")
 
-    async def ask_rin(self, user):
+    def parse_rin(self, text, answers):
         """
-        Sends a question to the user regarding the RIN and waits for a response.
         Checks if the response is a valid RIN and returns it if it is.
-        Return None if the user doesn't respond in time or if the response is not a valid RIN.
         """
-        while True:
-            rin = await self.ask_question(
-                user, "What is your RIN? (Example: 123456789)"
-            )
-            if rin is None:
-                return None
-
-            if rin.isdigit() and len(rin) == 9:
-                return rin
-            else:
-                await user.send(
-                    f"{rin} is not a valid RIN. Please enter a valid RIN. Make sure it has 9 digits."
-                )
+        rin = text.strip()
+        if rin.isdigit() and len(rin) == 9:
+            return rin
+        raise ValueError(
+            f"{rin} is not a valid RIN. Please enter a valid RIN. Make sure it has 9 digits."
+        )
 
     @profile.command(name="update", help="Updates your profile.")
     async def update(self, ctx):
@@ -276,137 +317,100 @@ class Profile(commands.Cog):
         """
         Updates your profile by allowing you to modify each individual aspect of your profile.
         """
-        updated_user = self.bot.db.get_data("user", ctx.author.id)
+        updated_user = await self.bot.db.get_data("user", ctx.author.id)
         if not updated_user:
             await ctx.send(
                 "You do not have a profile yet! Please use the !profile command to create one."
             )
             return
 
-        aspects = [
-            "First Name",
-            "Last Name",
-            "Major",
-            "Graduation Year",
-            "RIN",
-            "RPI Email",
-            "Exit",
-        ]
+        # The wizard starts from the current values and saves them all on exit
+        channel = ctx.author.dm_channel or await ctx.author.create_dm()
+        if ctx.channel.id != channel.id:
+            await ctx.send("Check your DMs to update your profile.")
+        await self.bot.conversations.start(
+            "profile_update",
+            ctx.author.id,
+            channel.id,
+            answers={
+                "user_id": ctx.author.id,
+                "guild_id": self.guild_id(ctx),
+                **{key: updated_user.to_dict()[key] for key, _, _ in PROFILE_FIELDS},
+            },
+        )
+
+    def update_conversation(self):
+        """
+        Builds the profile update wizard, which returns to the aspect menu
+        after each field until the user exits.
+        """
+        aspects = [label for _, label, _ in PROFILE_FIELDS] + ["Exit"]
         aspects_embed = discord.Embed(
             title="Update Page",
-            description="\n".join(
-                [f"{i+1}. {aspect}" for i, aspect in enumerate(aspects)]
-            ),
+            description="What aspect do you want to update?\n"
+            + "\n".join([f"{i+1}. {aspect}" for i, aspect in enumerate(aspects)]),
             color=discord.Color.pink(),
         )
-        while True:
-            await ctx.send(embed=aspects_embed)
-            user_choice = await self.user_choice(ctx.author)
-
-            if user_choice is None:
-                return  # Handle if user doesn't respond in time
-
-            if user_choice.isdigit() and 1 <= int(user_choice) <= len(aspects):
-                new_value = aspects[int(user_choice) - 1]
-                aspect = aspects[int(user_choice) - 1]
-
-                if aspect == "Exit":
-                    await ctx.send("Exiting update page.")
-                    break
-                if aspect == "First Name":
-                    await ctx.send(
-                        "Your previous response was: "
-                        + updated_user.get_value("first_name")
-                    )
-                    new_value = await self.ask_question(
-                        ctx.author, "What is your updated first name? (Example: John)"
-                    )
-                    updated_user.set_value("first_name", new_value)
-                elif aspect == "Last Name":
-                    await ctx.send(
-                        "Your previous response was: "
-                        + updated_user.get_value("last_name")
-                    )
-                    new_value = await self.ask_question(
-                        ctx.author, "What is your updated last name? (Example: Smith)"
-                    )
-                    updated_user.set_value("last_name", new_value)
-                elif aspect == "Major":
-                    await ctx.send(
-                        "Your previous response was: "
-                        + ", ".join(updated_user.get_value("major"))
-                    )
-                    new_value = await Profile.ask_major(self, ctx.author)
-                    updated_user.set_value("major", new_value)
-                elif aspect == "Graduation Year":
-                    await ctx.send(
-                        "Your previous response was: "
-                        + updated_user.get_value("graduation_year")
-                    )
-                    new_value = await Profile.ask_graduation_year(self, ctx.author)
-                    updated_user.set_value("graduation_year", new_value)
-                elif aspect == "RIN":
-                    await ctx.send(
-                        "Your previous response was: "
-                        + updated_user.get_value("student_id")
-                    )
-                    new_value = await Profile.ask_rin(self, ctx.author)
-                    updated_user.set_value("student_id", new_value)
-                elif aspect == "RPI Email":
-                    await ctx.send(
-                        "Your previous response was: "
-                        + updated_user.get_value("school_email")
-                    )
-                    new_value = await Profile.ask_email(self, ctx.author)
-                    updated_user.set_value("school_email", new_value)
-
-                await ctx.send(f"Your {aspect} has been updated.")
-
-            else:
-                await ctx.send(
+
+        def parse_aspect(text, answers):
+            choice = text.strip()
+            if not (choice.isdigit() and 1 <= int(choice) <= len(aspects)):
+                raise ValueError(
                     f"Invalid choice. Please enter a number between 1 and {len(aspects)}"
                 )
-        await self.show_user_profile(ctx, updated_user)
-        self.bot.db.upsert_data(updated_user)
+            index = int(choice) - 1
+            return PROFILE_FIELDS[index][0] if index < len(PROFILE_FIELDS) else None
+
+        # A new email starts at its entry step, before the code is checked
+        aspect = Step(
+            "aspect",
+            aspects_embed,
+            parse=parse_aspect,
+            next=lambda key, answers: "new_email" if key == "school_email" else key,
+            reply=lambda key, answers: None if key else "Exiting update page.",
+        )
+        steps = [aspect]
+        for key, label, question in PROFILE_FIELDS:
+            steps += self.field_steps(key, label, question, updating=True)
+        return Conversation("profile_update", steps, self.finish_update)
 
-    async def user_choice(self, user):
+    async def finish_update(self, session):
         """
-        Asks the user to select an aspect of their profile to update.
-
-        :param user: The user to ask.
-        :type user: discord.User
-        :return: The user's response.
-        :rtype: str
-        :raises discord.TimeoutError: The user took too long to respond.
+        Saves the answers of a profile update wizard once the user exits.
         """
-        try:
-            await user.send("What aspect do you want to update?")
-
-            # Wait for the user's reply (timeout in seconds)
-            msg = await self.bot.wait_for(
-                "message",
-                check=lambda message: message.author == user
-                and isinstance(message.channel, discord.DMChannel),
-                timeout=60,
-            )
+        user = await self.bot.db.get_data("user", session.user_id)
+        if not user:
+            return
+        user = Data.from_dict(
+            {
+                **user.to_dict(),
+                **{key: session.answers[key] for key, _, _ in PROFILE_FIELDS},
+                "guild": self.linked_guilds(user, session),
+            }
+        )
+        await self.bot.db.upsert_data(user)
+        self.logger.info(f"User {session.user_id} updated their profile")
 
-            return msg.content
-        except discord.TimeoutError:
-            await user.send(
-                "You took too long to respond! Please start the profile setup again."
-            )
-            return None
+        author = self.bot.get_user(session.user_id) or await self.bot.fetch_user(
+            session.user_id
+        )
+        await self.bot.send_conversation_message(
+            session,
+            self.create_profile_embed(
+                author, user, f"{author.display_name}'s Updated Profile"
+            ),
+        )
 
-    async def show_user_profile(self, ctx, user_profile):
+    def create_profile_embed(self, author, user_profile, title):
         """
-        Sends an embed showing the user's updated profile.
+        Creates an embed showing a user's profile.
         """
         embed = discord.Embed(
-            title=f"{ctx.author.display_name}'s Updated Profile",
+            title=title,
             description="Here is the information you provided:",
             color=discord.Color.purple(),
         )
-        embed.set_thumbnail(url=ctx.author.display_avatar.url)
+        embed.set_thumbnail(url=author.display_avatar.url)
         embed.add_field(
             name="First Name", value=user_profile.get_value("first_name"), inline=True
         )
@@ -414,7 +418,7 @@ class Profile(commands.Cog):
             name="Last Name", value=user_profile.get_value("last_name"), inline=True
         )
         embed.add_field(
-            name="Major", value=", ".join(user_profile.get_value("major")), inline=True
+            name="Major", value=", ".join(user_profile.get_list("major")), inline=True
         )
         embed.add_field(
             name="Graduation Year",
@@ -427,7 +431,35 @@ class Profile(commands.Cog):
         embed.add_field(
             name="RIN", value=user_profile.get_value("student_id"), inline=True
         )
+        return embed
 
+    async def show_user_profile(self, ctx, user_profile):
+        """
+        Sends an embed showing the user's profile.
+        """
+        embed = self.create_profile_embed(
+            ctx.author, user_profile, f"{ctx.author.display_name}'s Profile"
+        )
+        await ctx.send(embed=embed)
+
+    @profile.command(
+        name="majors", help="Finds majors by name. Usage: !profile majors [search]"
+    )
+    async def find_majors(self, ctx, *, query: str = ""):
+        """
+        Lists the majors matching a search, with the numbers the profile wizards accept.
+        """
+        matches = self.majors.complete(query)
+        if not matches:
+            await ctx.send(f"No majors match '{query}'.")
+            return
+        embed = discord.Embed(
+            title="Major List",
+            description="\n".join(
+                f"{self.majors.names.index(major) + 1}. {major}" for major in matches
+            ),
+            color=discord.Color.purple(),
+        )
         await ctx.send(embed=embed)
 
     @profile.command(name="show", help="Shows your profile.")
@@ -435,7 +467,7 @@ class Profile(commands.Cog):
         """
         Shows your profile.
         """
-        user = self.bot.db.get_data("user", ctx.author.id)
+        user = await self.bot.db.get_data("user", ctx.author.id)
         if user == -1 or not user:
             await ctx.send(
                 "You don't have a profile. Please use the !profile command to create one."
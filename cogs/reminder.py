@@ -0,0 +1,226 @@
+# cogs/reminder.py - sends event reminders to the announcements channel
+
+import time
+import asyncio
+import discord
+import logging
+from discord.ext import commands
+from modules.data import Data
+from modules.recurrence import ONE_OFF, occurrences, series_criteria
+from modules.scheduler import ReminderQueue
+from modules.timestamp import DATETIME_TZ_FORMAT, format_epochs
+
+# Seconds before an event starts at which reminders are sent
+REMINDER_LEADS = (86400, 3600)
+
+# How far ahead events are loaded into the queue per range query
+LOAD_WINDOW = 7 * 86400
+
+
+class Reminders(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.logger = logging.getLogger(
+            f"discord.cog.{self.__class__.__name__.lower()}"
+        )
+        self.queue = ReminderQueue()
+        self.loaded_until = None
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+    async def cog_load(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def cog_unload(self):
+        if self.task:
+            self.task.cancel()
+
+    # * * * * * Loading * * * * * #
+    @staticmethod
+    def sent_marker(event: Data, start_time: float, lead: int):
+        """
+        Returns the value recorded in reminders_sent for a reminder.
+
+        Later occurrences of a series are told apart by their start time; the first
+        one shares the plain lead with the event the series was created from.
+        """
+        if start_time == event.get_value("start_time"):
+            return lead
+        return f"{int(start_time)}:{lead}"
+
+    def sent_leads(self, event: Data, start_time: float):
+        """Returns the leads of the reminders already sent for an event or occurrence."""
+        sent = event.get_list("reminders_sent")
+        return [
+            lead
+            for lead in REMINDER_LEADS
+            if self.sent_marker(event, start_time, lead) in sent
+        ]
+
+    def schedule(self, event: Data, now: float, start_time: float = None):
+        """
+        Schedules the reminders of an event, or of one occurrence of a series,
+        that have not been sent yet.
+        """
+        key = event.get_value("id")
+        if start_time is None:
+            start_time = event.get_value("start_time")
+        else:
+            key = (key, start_time)
+
+        fire_at = self.queue.schedule(
+            key, start_time, REMINDER_LEADS, now, self.sent_leads(event, start_time)
+        )
+        if fire_at is not None:
+            self.wakeup.set()
+
+    def schedule_series(self, event: Data, lower: float, upper: float, now: float):
+        """Schedules the occurrences of a series that start within a window."""
+        for start_time in occurrences(
+            event.get_value("datetime"),
+            event.get_value("timezone"),
+            event.get_value("recurrence"),
+            lower,
+            upper,
+            event.get_list("exceptions"),
+        ):
+            self.schedule(event, now, start_time)
+
+    async def load_until(self, horizon: float):
+        """
+        Loads events starting before the horizon that are not loaded yet.
+
+        Only the slice between the previous horizon and the new one is queried,
+        so each event is read once as the window slides forward.
+        """
+        now = time.time()
+        lower = self.loaded_until if self.loaded_until is not None else now
+        events = await self.bot.db.search_range(
+            "event", "start_time", lower, horizon, {"recurrence": ONE_OFF}
+        )
+        for event in events:
+            self.schedule(event, now)
+
+        # Series are few, so each is re-read and expanded over just the new slice
+        series = await self.bot.db.search_range(
+            "event", "start_time", upper=horizon, criteria=series_criteria({}, lower)
+        )
+        for event in series:
+            self.schedule_series(event, lower, horizon, now)
+        events += series
+
+        self.loaded_until = horizon
+        self.logger.info(
+            f"Loaded {len(events)} events for reminders; {len(self.queue)} queued."
+        )
+
+    # * * * * * Dispatching * * * * * #
+    async def run(self):
+        """Sleeps until the next reminder or window boundary, then handles it."""
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                now = time.time()
+                if (
+                    self.loaded_until is None
+                    or now >= self.loaded_until - LOAD_WINDOW / 2
+                ):
+                    await self.load_until(now + LOAD_WINDOW + max(REMINDER_LEADS))
+
+                for key, lead in self.queue.pop_due(now):
+                    await self.send_reminder(key, lead)
+
+                next_due = self.queue.next_due()
+                deadline = self.loaded_until - LOAD_WINDOW / 2
+                if next_due is not None:
+                    deadline = min(deadline, next_due)
+
+                self.wakeup.clear()
+                await asyncio.wait_for(
+                    self.wakeup.wait(), timeout=max(deadline - time.time(), 0)
+                )
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Reminder loop failed: {e}")
+                await asyncio.sleep(60)
+
+    async def send_reminder(self, key, lead: int):
+        """
+        Sends a reminder once; the database claim guards against repeats.
+
+        Args:
+            key: The event ID, or (series ID, occurrence start) for a recurring event.
+            lead (int): Seconds before the start the reminder is for.
+        """
+        event_id, start_time = key if isinstance(key, tuple) else (key, None)
+        event = await self.bot.db.get_data("event", event_id)
+        if not event:
+            return
+        if start_time is None:
+            start_time = event.get_value("start_time")
+        elif start_time in event.get_list("exceptions"):
+            self.logger.info(f"Occurrence {start_time} of event {event_id} skipped.")
+            return
+
+        # Another process may have sent a later reminder since this one was queued
+        if any(sent < lead for sent in self.sent_leads(event, start_time)):
+            self.logger.info(f"Reminder {lead}s for event {event_id} superseded.")
+            return
+
+        marker = self.sent_marker(event, start_time, lead)
+        if not await self.bot.db.claim_value(
+            "event", event_id, "reminders_sent", marker
+        ):
+            self.logger.info(f"Reminder {lead}s for event {event_id} already sent.")
+            return
+
+        guild = await self.bot.db.get_data("guild", event.get_value("guild_id"))
+        channel_id = guild.get_value("announcements_channel") if guild else None
+        channel = self.bot.get_channel(int(channel_id)) if channel_id else None
+        if channel is None:
+            self.logger.warning(
+                f"No announcements channel for reminder of event {event_id}."
+            )
+            return
+
+        embed = discord.Embed(
+            title=f"Reminder: {event.get_value('name')}",
+            description=event.get_value("description"),
+            color=discord.Color.gold(),
+        )
+        embed.add_field(
+            name="Date/Time",
+            value=format_epochs(
+                [start_time], event.get_value("timezone"), DATETIME_TZ_FORMAT
+            )[0],
+            inline=True,
+        )
+        embed.add_field(name="Location", value=event.get_value("location"), inline=True)
+        await channel.send(embed=embed)
+        self.logger.info(f"Sent {lead}s reminder for event {event_id}.")
+
+    # * * * * * Event Listeners * * * * * #
+    @commands.Cog.listener()
+    async def on_event_create(self, event: Data):
+        start_time = event.get_value("start_time")
+        if self.loaded_until is None or start_time is None:
+            return
+
+        now = time.time()
+        if event.to_dict().get("recurrence"):
+            # The event may have been one-off, or had other occurrences, until now
+            self.queue.remove_event(event.get_value("id"))
+            self.schedule_series(event, now, self.loaded_until, now)
+        elif start_time < self.loaded_until:
+            self.schedule(event, now)
+
+    @commands.Cog.listener()
+    async def on_event_delete(self, event_id: int):
+        self.queue.remove_event(event_id)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Reminders(bot))
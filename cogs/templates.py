@@ -3,6 +3,7 @@
 import discord
 import logging
 from discord.ext import commands
+from modules.settings import eboard_only
 
 class Templates(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -38,24 +39,8 @@ class Templates(commands.Cog):
 
     #! Template code for a command that cannot be run without the set eboard role
     @commands.command(name="eboard_required", help="EBOARD - Shows the bot's latency.")
+    @eboard_only()
     async def eboard_ping(self, ctx):
-        if self.bot.db.get_data("guild", ctx.guild.id).get_value("eboard_role") is None:
-            embed = discord.Embed(
-                title="eboard role not configured!",
-                description="Use '!settings set eboard_role' to fix this",
-                color=discord.Color.red(),
-            )
-            await ctx.send(embed=embed)
-            return
-        
-        if not commands.has_role(self.bot.db.get_data("guild", ctx.guild.id).get_value("eboard_role")):
-            embed = discord.Embed(
-                title="Missing required eboard role!",
-                color=discord.Color.red(),
-            )
-            await ctx.send(embed=embed)
-            return
-        
         message = f"⏱ {round(self.bot.latency * 1000)} ms Latency!"
         embed = discord.Embed(
             title="Ping (But eboard)",
@@ -1,67 +1,235 @@
 import os
-import discord
-import logging
-from discord.ext import commands
-from dotenv import load_dotenv
-from modules.email import Email
-from modules.database import Database
+import time
+import asyncio
+from modules.startup import StartupProfile
+
+# Set STARTUP_PROFILE to a report path, or to 1, to time each startup phase and import
+startup_profile = StartupProfile.from_env()
+
+with startup_profile.phase("imports"):
+    import discord
+    import logging
+    from discord.ext import commands, tasks
+    from dotenv import load_dotenv
+    from modules.conversation import ConversationRouter
+    from modules.email import EmailService
+    from modules.extensions import ExtensionLoader
+    from modules.membership import FLUSH_INTERVAL, MembershipBuffer
+    from modules.outbox import Outbox
+    from modules.reconcile import Reconciler
+    from modules.settings import SettingsService
+    from modules.verification import VerificationService
+    from modules.database import Database
+    from modules.snowflake import Snowflake
+
+# Rarely used extensions, loaded on the first use of one of their commands
+DEFERRED_EXTENSIONS = {
+    "cogs.templates": [
+        "single",
+        "admin_required",
+        "eboard_required",
+        "admin_optional",
+        "say",
+    ],
+}
 
 
 # Create the bot class, inheriting from commands.AutoShardedBot
 class Bot(commands.AutoShardedBot):
-    async def __init__(self, *args, **kwargs):
+    def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.logger = logging.getLogger("discord.main")
         self.logger.setLevel(logging.INFO)
-        self.email = Email()
-        self.db = await Database()
+        # Sends in the background over pooled SMTP connections
+        self.email = EmailService()
+        self.startup_profile = startup_profile
+        with self.startup_profile.phase("database init"):
+            self.db = Database()
+        # Each bot process needs its own WORKER_ID so event IDs never collide
+        self.id_generator = Snowflake(int(os.getenv("WORKER_ID") or 0))
+        # Emails are queued durably here and sent at the provider's rate
+        self.outbox = Outbox(self.db, self.email, self.id_generator.next_id)
+        self.verification = VerificationService(self.db, self.outbox)
+        # Guild settings are read once per guild and then checked in memory
+        self.settings = SettingsService(self.db)
+        # Joins and leaves are written in batches so join storms do not contend on the guild
+        self.members = MembershipBuffer()
+        self.members_lock = asyncio.Lock()
+        # Catches member lists up with changes made while the bot was offline;
+        # batched joins and leaves for a guild wait until it is caught up
+        self.reconciler = Reconciler(self.db, lock=self.members_lock)
+        self.startup_reconciliation = None
+        # Loads the cogs concurrently and records how long each took
+        self.extension_loader = ExtensionLoader(
+            self.load_extension, DEFERRED_EXTENSIONS
+        )
+        # Routes DM and channel replies to wizards such as !profile create
+        self.conversations = ConversationRouter(
+            self.send_conversation_message, self.db, self.id_generator.next_id
+        )
 
     # Event that runs when the bot joins a new server
     async def on_guild_join(self, guild: discord.Guild):
-        # If already in guild, do nothing
-        if self.db.get_data("guild", guild.id):
-            self.logger.info(
-                f"Joined Guild: {guild.name} (ID: {guild.id}) already exists in database"
-            )
-            return
+        self.logger.info(f"Joined Guild: {guild.name} (ID: {guild.id})")
+        # Creates the guild document if needed and records its members
+        await self.reconcile_guild(guild)
 
-        # Else, add guild to data base
-        new_guild_data = self.db.create_data("guild", guild.id)
-        self.db.upsert_data(new_guild_data)
-        self.logger.info(
-            f"Inserted New Guild: {guild.name} (ID: {guild.id}) into database"
+    async def reconcile_guild(self, guild: discord.Guild, on_progress=None):
+        """
+        Brings a guild's stored member list in line with its real members.
+        Returns the finished progress.
+        """
+
+        async def fetch_members():
+            # An incomplete member cache would make present members look like they left
+            if not guild.chunked:
+                await guild.chunk()
+
+        # Members are fetched and read only once the guild's turn comes
+        return await self.reconciler.start(
+            guild.id,
+            lambda: (member.id for member in guild.members),
+            guild.member_count or len(guild.members),
+            on_progress,
+            fetch_members,
         )
 
+    async def reconcile_all(self):
+        """Reconciles every guild, a few at a time."""
+        await asyncio.gather(
+            *(self.reconcile_guild(guild) for guild in self.guilds),
+            return_exceptions=True,
+        )
+
+    # Event that runs when the bot leaves a server
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.settings.forget(guild.id)
+
     # Event that runs when a member joins a guild
     async def on_member_join(self, member: discord.Member):
-        # get current guild data
-        guild_data = self.db.get_data("guild", member.guild.id)
+        full = self.members.join(member.guild.id, member.id)
+        # After a failed write, leave retries to flush_members instead of every event
+        if full and self.members.can_write(time.monotonic()):
+            await self.write_members()
 
-        # if guild does not exist, create it
-        if not guild_data:
-            self.logger.warn(
-                f"Guild {member.guild.name} does not exist in database for user {member.id} on join"
-            )
-            guild_data = self.db.create_data("guild", member.guild.id)
+    # Event that runs when a member leaves a guild
+    async def on_member_remove(self, member: discord.Member):
+        full = self.members.leave(member.guild.id, member.id)
+        if full and self.members.can_write(time.monotonic()):
+            await self.write_members()
 
-        # add member id to server users list
-        guild_data.append_value("users", member.id)
-        self.db.upsert_data(guild_data)
-        self.logger.info(
-            f"User {member.id} joined guild {member.guild.name} (ID: {member.guild.id})"
-        )
+    @tasks.loop(seconds=FLUSH_INTERVAL)
+    async def flush_members(self):
+        if self.members.can_write(time.monotonic()):
+            await self.write_members()
+
+    async def write_members(self):
+        """
+        Writes buffered joins and leaves with one round trip for all guild
+        member lists, then links or unlinks member profiles per guild.
+        Changes whose guild or profile write fails go back in the buffer, as
+        do changes for guilds being reconciled, which are newer than its snapshot.
+        """
+        # Batches must land in order, or a leave could be undone by an older join
+        async with self.members_lock:
+            changes = self.members.drain()
+            for guild_id in [id for id in changes if self.reconciler.reconciling(id)]:
+                self.members.requeue(guild_id, *changes.pop(guild_id))
+            if not changes:
+                return
+            try:
+                await self.db.update_sets_bulk("guild", "user", changes)
+            except Exception as e:
+                for guild_id, (joined, left) in changes.items():
+                    self.members.requeue(guild_id, joined, left)
+                delay = self.members.write_failed(time.monotonic())
+                self.logger.error(
+                    f"Failed to record member changes, retrying in {delay:.0f} s: {e}"
+                )
+                if self.members.dropped:
+                    # Startup reconciliation restores what was dropped
+                    self.logger.warning(
+                        f"Member buffer full; dropped {self.members.dropped} "
+                        "of the oldest changes so far"
+                    )
+                return
+
+            failed = []
+            for guild_id, (joined, left) in changes.items():
+                try:
+                    await self.db.add_to_set_many("user", joined, "guild", guild_id)
+                    await self.db.pull_from_many("user", left, "guild", guild_id)
+                except Exception as e:
+                    # Rewriting the guild side too is harmless, since both are set updates
+                    self.members.requeue(guild_id, joined, left)
+                    failed.append(guild_id)
+                    self.logger.error(
+                        f"Failed to update member profiles for guild {guild_id}: {e}"
+                    )
+                    continue
+                self.logger.info(
+                    f"Guild {guild_id}: {len(joined)} members joined, {len(left)} left"
+                )
+            if failed:
+                delay = self.members.write_failed(time.monotonic())
+                self.logger.error(
+                    f"Retrying member changes for {len(failed)} guilds in {delay:.0f} s"
+                )
+            else:
+                self.members.write_succeeded()
 
     async def setup_hook(self):
+        # Create any missing database indexes and fields before cogs start querying
+        with self.startup_profile.phase("index checks"):
+            await self.db.ensure_indexes()
+            backfilled = await self.db.backfill_fields()
+        if any(backfilled.values()):
+            self.logger.info(f"Backfilled missing fields: {backfilled}")
+        await self.email.start()
+        # The outbox's rate limit is per process, so only the first worker sends
+        if self.id_generator.worker_id == 0:
+            await self.outbox.start()
+
         # Import all cogs from the 'cogs/' directory
-        for filename in os.listdir("./cogs"):
+        extensions = []
+        for filename in sorted(os.listdir("./cogs")):
             if filename.endswith(".py"):
-                try:
-                    await self.load_extension(f"cogs.{filename[:-3]}")
-                    self.logger.info(f"Loaded {filename}")
-                except Exception as e:
-                    self.logger.error(f"Failed to load {filename}: {e}")
+                extensions.append(f"cogs.{filename[:-3]}")
             else:
                 self.logger.warning(f"Skipping {filename}: Not a Python file")
+        with self.startup_profile.phase("cog setup"):
+            await self.extension_loader.load_all(extensions)
+        self.logger.info(f"Startup report:\n{self.extension_loader.report()}")
+
+        # Cogs register their conversations on load, so resume sessions afterwards
+        resumed = await self.conversations.load()
+        self.logger.info(f"Resumed {resumed} conversations")
+        self.expire_conversations.start()
+        self.flush_members.start()
+        # Ends in on_ready, once the gateway has connected
+        self.startup_profile.begin("gateway ready")
+
+    async def close(self):
+        # Write buffered joins and leaves, waiting for any flush in progress
+        self.flush_members.stop()
+        await self.write_members()
+        # Deliver any queued emails before the connections go away
+        await self.outbox.stop()
+        await self.email.stop()
+        await super().close()
+
+    @tasks.loop(seconds=30)
+    async def expire_conversations(self):
+        await self.conversations.expire_due()
+
+    async def send_conversation_message(self, session, content):
+        channel = self.get_channel(session.channel_id) or await self.fetch_channel(
+            session.channel_id
+        )
+        if isinstance(content, discord.Embed):
+            await channel.send(embed=content)
+        else:
+            await channel.send(content)
 
     async def on_ready(self):
         # Notify when the bot is ready and print shard info
@@ -69,12 +237,57 @@ class Bot(commands.AutoShardedBot):
         self.logger.info(
             f"Connected to {len(self.guilds)} guilds across {self.shard_count} shards."
         )
+        # on_ready fires again after reconnects; reconcile only once per process
+        if self.startup_reconciliation is None:
+            self.write_startup_profile()
+            self.startup_reconciliation = asyncio.create_task(self.reconcile_all())
+
+    def write_startup_profile(self):
+        """Ends the startup timeline and writes its report, if startup is being profiled."""
+        self.startup_profile.end("gateway ready")
+        try:
+            path = self.startup_profile.write(self.extension_loader.timings.values())
+        except OSError as e:
+            self.logger.error(f"Failed to write startup profile: {e}")
+            return
+        if path:
+            self.logger.info(
+                f"Startup profile written to {path}:\n{self.startup_profile.summary()}"
+            )
 
     async def on_message(self, message):
-        if self.allowed_channel_id is None:
-            await self.process_commands(message)
-        elif message.channel.id == self.allowed_channel_id:
-            await self.process_commands(message)
+        if message.author.bot:
+            return
+        locked_out = (
+            self.allowed_channel_id is not None
+            and message.channel.id != self.allowed_channel_id
+        )
+        # Other server channels are ignored, but DMs still carry wizard replies
+        if locked_out and message.guild is not None:
+            return
+        # A command typed during a wizard runs as a command, not as an answer
+        prefix = self.command_prefix
+        is_command = isinstance(prefix, str) and message.content.startswith(prefix)
+        if not is_command and await self.conversations.handle(
+            message.author.id, message.channel.id, message.content
+        ):
+            return
+        if locked_out:
+            return
+        await self.load_deferred_extension(message)
+        await self.process_commands(message)
+
+    async def load_deferred_extension(self, message):
+        """Loads the deferred extension whose command a message invokes, if any."""
+        prefix = self.command_prefix
+        if not isinstance(prefix, str) or not message.content.startswith(prefix):
+            return
+        invoked_with = message.content[len(prefix) :].split(maxsplit=1)
+        if not invoked_with:
+            return
+        name = self.extension_loader.deferred_extension(invoked_with[0])
+        if name:
+            await self.extension_loader.load(name)
 
     async def on_command(self, ctx):
         self.logger.info(f"Command executed: {ctx.command} by {ctx.author}")
@@ -0,0 +1,104 @@
+# modules/attendance.py - buffers event check-ins for batched writes
+
+from typing import Dict, Iterable, List, Set
+
+from modules.cache import LRUCache
+
+# Events whose attendees are remembered for deduplication at most
+MAX_OPEN_EVENTS = 1000
+
+
+class AttendanceBuffer:
+    def __init__(self, max_events: int = MAX_OPEN_EVENTS):
+        """
+        Initializes an empty check-in buffer.
+
+        Check-ins are deduplicated in memory per event and accumulate until
+        drained, so a burst of clicks becomes one write per event. Only the
+        most recently used events are remembered; callers reopen an event
+        from its stored attendees once it has been forgotten.
+
+        Args:
+            max_events (int): The number of events remembered at most.
+        """
+        self.__seen = LRUCache(max_events)
+        self.__pending: Dict[int, Set[int]] = {}
+
+    def open(self, event_id: int, attendees: Iterable[int] = ()):
+        """
+        Starts accepting check-ins for an event.
+
+        Args:
+            event_id (int): The ID of the event.
+            attendees (Iterable[int]): Users already recorded as attending.
+        """
+        # Check-ins not written yet are not among the stored attendees
+        seen = self.__seen.get(event_id) or set(self.__pending.get(event_id, ()))
+        seen.update(attendees)
+        self.__seen.set(event_id, seen)
+
+    def is_open(self, event_id: int) -> bool:
+        """
+        Checks whether an event's attendees are remembered.
+
+        Args:
+            event_id (int): The ID of the event.
+
+        Returns:
+            bool: True if check-ins for the event are deduplicated without reopening it.
+        """
+        return event_id in self.__seen
+
+    def close(self, event_id: int):
+        """
+        Stops tracking an event, e.g. once it is deleted. Pending check-ins are kept until drained.
+
+        Args:
+            event_id (int): The ID of the event.
+        """
+        self.__seen.pop(event_id)
+
+    def check_in(self, event_id: int, user_id: int) -> bool:
+        """
+        Records a check-in.
+
+        Args:
+            event_id (int): The ID of the event.
+            user_id (int): The ID of the user checking in.
+
+        Returns:
+            bool: True if this is the user's first check-in for the event.
+        """
+        seen = self.__seen.get(event_id)
+        if seen is None:
+            self.open(event_id)
+            seen = self.__seen.get(event_id)
+        if user_id in seen:
+            return False
+        seen.add(user_id)
+        self.__pending.setdefault(event_id, set()).add(user_id)
+        return True
+
+    def drain(self) -> Dict[int, List[int]]:
+        """
+        Removes and returns all check-ins not yet written.
+
+        Returns:
+            Dict[int, List[int]]: User IDs to record, by event ID.
+        """
+        pending, self.__pending = self.__pending, {}
+        return {event_id: sorted(users) for event_id, users in pending.items()}
+
+    def requeue(self, event_id: int, user_ids: Iterable[int]):
+        """
+        Puts back check-ins whose write failed so the next drain retries them.
+
+        Args:
+            event_id (int): The ID of the event.
+            user_ids (Iterable[int]): The users to record.
+        """
+        self.__pending.setdefault(event_id, set()).update(user_ids)
+
+    def __len__(self) -> int:
+        """Returns the number of check-ins waiting to be written."""
+        return sum(len(users) for users in self.__pending.values())
@@ -0,0 +1,130 @@
+# modules/cache.py - size-bounded least recently used cache
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    def __init__(
+        self,
+        max_size: int,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        """
+        Initializes an empty cache.
+
+        Each entry has a caller-supplied size (e.g. the byte length of a serialized
+        payload); the least recently used entries are evicted once the total size
+        exceeds max_size.
+
+        Args:
+            max_size (int): The maximum total size of all entries.
+            on_evict (Optional[Callable[[Hashable, Any], None]]): Called with the key and
+                value of each entry evicted to stay within max_size.
+        """
+        self.max_size = max_size
+        self.__on_evict = on_evict
+        self.__entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.__size = 0
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Optional[Any]:
+        """
+        Returns a cached value and marks it as recently used.
+
+        Args:
+            key (Hashable): The key of the entry.
+            now (Optional[float]): The current Unix epoch. Defaults to time.time().
+
+        Returns:
+            Optional[Any]: The value, or None if it is missing or expired.
+        """
+        entry = self.__entries.get(key)
+        if entry is None:
+            return None
+
+        value, size, expires_at = entry
+        if expires_at is not None and expires_at <= (
+            time.time() if now is None else now
+        ):
+            self.pop(key)
+            return None
+
+        self.__entries.move_to_end(key)
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        size: int = 1,
+        expires_at: Optional[float] = None,
+    ):
+        """
+        Stores a value, evicting the least recently used entries if over budget.
+
+        Args:
+            key (Hashable): The key of the entry.
+            value (Any): The value to store.
+            size (int): The size the entry counts against max_size.
+            expires_at (Optional[float]): Unix epoch after which the entry is stale. Defaults to never.
+        """
+        self.pop(key)
+        if size > self.max_size:
+            return
+
+        self.__entries[key] = (value, size, expires_at)
+        self.__size += size
+        while self.__size > self.max_size:
+            evicted_key, (evicted, evicted_size, _) = self.__entries.popitem(last=False)
+            self.__size -= evicted_size
+            if self.__on_evict is not None:
+                self.__on_evict(evicted_key, evicted)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """
+        Removes an entry.
+
+        Args:
+            key (Hashable): The key of the entry.
+
+        Returns:
+            Optional[Any]: The removed value, or None if there was no entry.
+        """
+        entry = self.__entries.pop(key, None)
+        if entry is None:
+            return None
+        self.__size -= entry[1]
+        return entry[0]
+
+    def pop_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """
+        Removes every entry matching a predicate.
+
+        Args:
+            predicate (Callable[[Hashable, Any], bool]): Called with each key and value.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        keys = [
+            key
+            for key, (value, _, _) in self.__entries.items()
+            if predicate(key, value)
+        ]
+        for key in keys:
+            self.pop(key)
+        return len(keys)
+
+    @property
+    def size(self) -> int:
+        """The total size of all entries."""
+        return self.__size
+
+    def __len__(self) -> int:
+        """Returns the number of entries."""
+        return len(self.__entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Checks whether an entry exists, without checking its expiry."""
+        return key in self.__entries
@@ -0,0 +1,458 @@
+# modules/conversation.py - routes messages to multi-step conversations
+
+import asyncio
+import heapq
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from modules.data import Data
+
+# Seconds a conversation waits for each answer before it is abandoned
+DEFAULT_TIMEOUT = 300
+
+# Replies that abandon a conversation at any step
+CANCEL_WORDS = {"cancel"}
+
+# A conversation is identified by the user answering and the channel they answer in
+SessionKey = Tuple[int, int]
+
+
+async def _resolve(value: Any) -> Any:
+    """Awaits a value if a callback returned an awaitable."""
+    return await value if inspect.isawaitable(value) else value
+
+
+class Step:
+    def __init__(
+        self,
+        key: str,
+        prompt: Any,
+        parse: Optional[Callable[[str, Dict[str, Any]], Any]] = None,
+        next: Optional[Callable[[Any, Dict[str, Any]], Optional[str]]] = None,
+        reply: Optional[Callable[[Any, Dict[str, Any]], Any]] = None,
+    ):
+        """
+        Initializes one question of a conversation.
+
+        Args:
+            key (str): The name of the step; its parsed answer is stored under this key.
+            prompt (Any): The message to send, or a callable building it from the answers so far.
+            parse (Optional[Callable[[str, Dict[str, Any]], Any]]): Turns the reply into the answer, raising ValueError with a message for the user if it is invalid. May be async. Defaults to the stripped reply.
+            next (Optional[Callable[[Any, Dict[str, Any]], Optional[str]]]): Picks the next step from the answer, or None to finish. Defaults to the following step.
+            reply (Optional[Callable[[Any, Dict[str, Any]], Any]]): Builds a message acknowledging a valid answer, or None to send nothing.
+        """
+        self.key = key
+        self.prompt = prompt
+        self.parse = parse
+        self.next = next
+        self.reply = reply
+
+    def render(self, answers: Dict[str, Any]) -> Any:
+        """Builds the prompt for the answers so far."""
+        return self.prompt(answers) if callable(self.prompt) else self.prompt
+
+
+class Conversation:
+    def __init__(
+        self,
+        name: str,
+        steps: List[Step],
+        on_complete: Callable[["Session"], Awaitable[None]],
+        timeout: float = DEFAULT_TIMEOUT,
+        timeout_message: Optional[str] = "You took too long to respond!",
+    ):
+        """
+        Initializes a conversation, a state machine whose states are its steps.
+
+        Args:
+            name (str): The unique name the conversation is registered and persisted under.
+            steps (List[Step]): The steps, the first being the default starting step.
+            on_complete (Callable[[Session], Awaitable[None]]): Called once the last step is answered.
+            timeout (float): Seconds to wait for each answer.
+            timeout_message (Optional[str]): Sent when the conversation times out.
+
+        Raises:
+            ValueError: If there are no steps or two steps share a key.
+        """
+        if not steps:
+            raise ValueError(f"Conversation '{name}' has no steps.")
+        self.name = name
+        self.steps = {step.key: step for step in steps}
+        if len(self.steps) != len(steps):
+            raise ValueError(f"Conversation '{name}' has duplicate step keys.")
+        self.first = steps[0].key
+        self.on_complete = on_complete
+        self.timeout = timeout
+        self.timeout_message = timeout_message
+        # Default transitions follow the order the steps were given in
+        keys = [step.key for step in steps]
+        self.__following = dict(zip(keys, keys[1:] + [None]))
+
+    def next_step(
+        self, step: Step, answer: Any, answers: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        Picks the step after an answer.
+
+        Args:
+            step (Step): The step just answered.
+            answer (Any): The parsed answer.
+            answers (Dict[str, Any]): All answers so far, including this one.
+
+        Returns:
+            Optional[str]: The key of the next step, or None if the conversation is over.
+        """
+        if step.next is not None:
+            return step.next(answer, answers)
+        return self.__following[step.key]
+
+
+class Session:
+    __slots__ = (
+        "id",
+        "user_id",
+        "channel_id",
+        "conversation",
+        "step",
+        "answers",
+        "expires_at",
+        "lock",
+    )
+
+    def __init__(
+        self,
+        id: Optional[int],
+        user_id: int,
+        channel_id: int,
+        conversation: Conversation,
+        step: str,
+        answers: Dict[str, Any],
+        expires_at: float,
+    ):
+        """
+        Initializes the state of one user's conversation in one channel.
+
+        Args:
+            id (Optional[int]): The ID the session is persisted under, if persisted.
+            user_id (int): The ID of the user answering.
+            channel_id (int): The ID of the channel they answer in.
+            conversation (Conversation): The conversation being held.
+            step (str): The key of the step awaiting an answer.
+            answers (Dict[str, Any]): The answers so far, plus any values given at the start.
+            expires_at (float): The Unix epoch after which the session is abandoned.
+        """
+        self.id = id
+        self.user_id = user_id
+        self.channel_id = channel_id
+        self.conversation = conversation
+        self.step = step
+        self.answers = answers
+        self.expires_at = expires_at
+        # Replies are handled one at a time so an async parse cannot interleave
+        self.lock = asyncio.Lock()
+
+    @property
+    def key(self) -> SessionKey:
+        """The (user ID, channel ID) the session is routed by."""
+        return (self.user_id, self.channel_id)
+
+    def to_data(self) -> Data:
+        """
+        Converts the session into a Data object for the session collection.
+
+        Returns:
+            Data: The session's persisted form.
+        """
+        data = Data.from_template("session", self.id)
+        return Data.from_dict(
+            {
+                **data.to_dict(),
+                "user_id": self.user_id,
+                "channel_id": self.channel_id,
+                "conversation": self.conversation.name,
+                "step": self.step,
+                "answers": self.answers,
+                "expires_at": self.expires_at,
+            }
+        )
+
+
+class ConversationRouter:
+    def __init__(
+        self,
+        send: Callable[[Session, Any], Awaitable[None]],
+        db=None,
+        next_id: Optional[Callable[[], int]] = None,
+    ):
+        """
+        Initializes a router with no conversations.
+
+        Each incoming message is routed with a single dictionary lookup on
+        (author, channel), however many conversations are in progress. When a
+        database is given, sessions are saved after every step and reloaded on
+        startup, so a restart resumes them where they left off.
+
+        Args:
+            send (Callable[[Session, Any], Awaitable[None]]): Sends a prompt or reply to a session's channel.
+            db (Optional[Database]): Where sessions are persisted. Defaults to keeping them in memory only.
+            next_id (Optional[Callable[[], int]]): Generates IDs for persisted sessions. Required with db.
+
+        Raises:
+            ValueError: If a database is given without an ID generator.
+        """
+        if db is not None and next_id is None:
+            raise ValueError("Persisted sessions need an ID generator.")
+        self.__send = send
+        self.__db = db
+        self.__next_id = next_id
+        self.__conversations: Dict[str, Conversation] = {}
+        self.__sessions: Dict[SessionKey, Session] = {}
+        # (expires_at, key) pairs; entries for refreshed or finished sessions are skipped when popped
+        self.__expiries: List[Tuple[float, SessionKey]] = []
+
+    # * * * * * Registration * * * * * #
+    def register(self, conversation: Conversation):
+        """
+        Makes a conversation available to start and to resume after a restart.
+
+        Args:
+            conversation (Conversation): The conversation to register.
+        """
+        self.__conversations[conversation.name] = conversation
+
+    def get(self, user_id: int, channel_id: int) -> Optional[Session]:
+        """
+        Finds the session in progress for a user in a channel.
+
+        Args:
+            user_id (int): The ID of the user.
+            channel_id (int): The ID of the channel.
+
+        Returns:
+            Optional[Session]: The session, or None if there is none.
+        """
+        return self.__sessions.get((user_id, channel_id))
+
+    # * * * * * Sessions * * * * * #
+    async def start(
+        self,
+        name: str,
+        user_id: int,
+        channel_id: int,
+        answers: Optional[Dict[str, Any]] = None,
+        step: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> Session:
+        """
+        Starts a conversation and sends its first prompt, replacing any session
+        the user has in the channel.
+
+        Args:
+            name (str): The name of a registered conversation.
+            user_id (int): The ID of the user answering.
+            channel_id (int): The ID of the channel they answer in.
+            answers (Optional[Dict[str, Any]]): Values available to every step, e.g. current profile fields.
+            step (Optional[str]): The step to start at. Defaults to the conversation's first step.
+            now (Optional[float]): The current Unix epoch. Defaults to time.time().
+
+        Returns:
+            Session: The new session.
+
+        Raises:
+            ValueError: If the conversation or step does not exist.
+        """
+        conversation = self.__conversations.get(name)
+        if conversation is None:
+            raise ValueError(f"Conversation '{name}' is not registered.")
+        step = step or conversation.first
+        if step not in conversation.steps:
+            raise ValueError(f"Conversation '{name}' has no step '{step}'.")
+
+        previous = self.__sessions.get((user_id, channel_id))
+        if previous is not None:
+            await self.__remove(previous)
+
+        session = Session(
+            self.__next_id() if self.__db is not None else None,
+            user_id,
+            channel_id,
+            conversation,
+            step,
+            dict(answers or {}),
+            0,
+        )
+        await self.__advance(session, step, now)
+        return session
+
+    async def cancel(self, user_id: int, channel_id: int) -> bool:
+        """
+        Abandons a session without completing it.
+
+        Args:
+            user_id (int): The ID of the user.
+            channel_id (int): The ID of the channel.
+
+        Returns:
+            bool: True if there was a session to cancel.
+        """
+        session = self.__sessions.get((user_id, channel_id))
+        if session is None:
+            return False
+        await self.__remove(session)
+        return True
+
+    async def handle(
+        self, user_id: int, channel_id: int, content: str, now: Optional[float] = None
+    ) -> bool:
+        """
+        Feeds a message to the session it answers, if any.
+
+        Args:
+            user_id (int): The ID of the message author.
+            channel_id (int): The ID of the message's channel.
+            content (str): The message text.
+            now (Optional[float]): The current Unix epoch. Defaults to time.time().
+
+        Returns:
+            bool: True if the message was consumed by a session.
+        """
+        session = self.__sessions.get((user_id, channel_id))
+        if session is None:
+            return False
+
+        async with session.lock:
+            # The session may have finished while this reply waited for the lock
+            if self.__sessions.get(session.key) is not session:
+                return False
+            now = time.time() if now is None else now
+            if session.expires_at <= now:
+                await self.__expire(session)
+                return False
+            if content.strip().lower() in CANCEL_WORDS:
+                await self.__remove(session)
+                await self.__send(session, "Cancelled.")
+                return True
+
+            step = session.conversation.steps[session.step]
+            try:
+                answer = await _resolve(
+                    step.parse(content, session.answers)
+                    if step.parse
+                    else content.strip()
+                )
+            except ValueError as e:
+                await self.__send(session, str(e))
+                await self.__send(session, step.render(session.answers))
+                return True
+
+            session.answers[step.key] = answer
+            if step.reply is not None:
+                message = step.reply(answer, session.answers)
+                if message is not None:
+                    await self.__send(session, message)
+
+            following = session.conversation.next_step(step, answer, session.answers)
+            if following is None:
+                await self.__remove(session)
+                await session.conversation.on_complete(session)
+            else:
+                await self.__advance(session, following, now)
+        return True
+
+    async def expire_due(self, now: Optional[float] = None) -> int:
+        """
+        Abandons every session whose timeout has passed, telling its user.
+
+        Args:
+            now (Optional[float]): The current Unix epoch. Defaults to time.time().
+
+        Returns:
+            int: The number of sessions expired.
+        """
+        now = time.time() if now is None else now
+        expired = 0
+        while self.__expiries and self.__expiries[0][0] <= now:
+            expires_at, key = heapq.heappop(self.__expiries)
+            session = self.__sessions.get(key)
+            # Skip entries superseded by a later step or a finished session
+            if session is None or session.expires_at != expires_at:
+                continue
+            await self.__expire(session)
+            expired += 1
+        return expired
+
+    async def load(self, now: Optional[float] = None) -> int:
+        """
+        Resumes persisted sessions, discarding expired ones and those whose
+        conversation is no longer registered.
+
+        Args:
+            now (Optional[float]): The current Unix epoch. Defaults to time.time().
+
+        Returns:
+            int: The number of sessions resumed.
+        """
+        if self.__db is None:
+            return 0
+        now = time.time() if now is None else now
+
+        stale = []
+        for data in await self.__db.search_data("session", {}):
+            conversation = self.__conversations.get(data.get_value("conversation"))
+            step = data.get_value("step")
+            if (
+                conversation is None
+                or step not in conversation.steps
+                or data.get_value("expires_at") <= now
+            ):
+                stale.append(data.get_value("id"))
+                continue
+
+            session = Session(
+                data.get_value("id"),
+                data.get_value("user_id"),
+                data.get_value("channel_id"),
+                conversation,
+                step,
+                dict(data.to_dict()["answers"]),
+                data.get_value("expires_at"),
+            )
+            self.__sessions[session.key] = session
+            heapq.heappush(self.__expiries, (session.expires_at, session.key))
+
+        if stale:
+            await self.__db.hard_delete("session", stale)
+        return len(self.__sessions)
+
+    def __len__(self) -> int:
+        """Returns the number of sessions in progress."""
+        return len(self.__sessions)
+
+    # * * * * * Internal Helpers * * * * * #
+    async def __advance(self, session: Session, step: str, now: Optional[float]):
+        """Moves a session to a step, saves it and sends the step's prompt."""
+        session.step = step
+        session.expires_at = (
+            time.time() if now is None else now
+        ) + session.conversation.timeout
+        self.__sessions[session.key] = session
+        heapq.heappush(self.__expiries, (session.expires_at, session.key))
+        if self.__db is not None:
+            await self.__db.upsert_data(session.to_data())
+        await self.__send(
+            session, session.conversation.steps[step].render(session.answers)
+        )
+
+    async def __remove(self, session: Session):
+        """Forgets a session and its persisted copy."""
+        if self.__sessions.get(session.key) is session:
+            del self.__sessions[session.key]
+        if self.__db is not None and session.id is not None:
+            await self.__db.hard_delete("session", session.id)
+
+    async def __expire(self, session: Session):
+        """Removes a timed out session and tells its user."""
+        await self.__remove(session)
+        if session.conversation.timeout_message:
+            await self.__send(session, session.conversation.timeout_message)
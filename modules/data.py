@@ -381,8 +381,10 @@ class Data:
         dict: The Data object as a dictionary.
         """
         ret = self.__data.copy()
-        ret["updated_at"] = self.__data["updated_at"].to_est()
-        ret["created_at"] = self.__data["created_at"].to_est()
+        for key in ("updated_at", "created_at"):
+            # Documents loaded from the database already hold the rendered string
+            if isinstance(ret[key], Timestamp):
+                ret[key] = ret[key].to_est()
         return ret
 
     def __str__(self) -> str:
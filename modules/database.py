@@ -4,11 +4,57 @@ import os
 import json
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCursor
 from pymongo import UpdateOne
-from typing import List, Dict, Optional, Any, Union
+from typing import AsyncIterator, List, Dict, Optional, Any, Tuple, Union
 
 from modules.timestamp import Timestamp
 from modules.data import Data
 
+# Indexes ensured at startup, as collection name -> list of (keys, options)
+INDEXES = {
+    "event": [
+        ([("id", 1)], {}),
+        ([("start_time", 1), ("id", 1)], {}),
+        ([("guild_id", 1), ("start_time", 1), ("id", 1)], {}),
+        ([("user", 1), ("start_time", 1), ("id", 1)], {}),
+        # Recurring series only, so looking up a guild's series skips one-off events
+        (
+            [("guild_id", 1), ("recurrence_end", 1)],
+            {"partialFilterExpression": {"recurrence": {"$gt": ""}}},
+        ),
+        (
+            [("name", "text"), ("description", "text"), ("location", "text")],
+            {"weights": {"name": 3, "location": 2, "description": 1}},
+        ),
+    ],
+    "guild": [([("id", 1)], {})],
+    "outbox": [
+        ([("id", 1)], {}),
+        ([("key", 1)], {"unique": True}),
+        ([("status", 1), ("next_attempt_at", 1)], {}),
+        ([("claim", 1)], {}),
+        # Sent and failed messages are deleted by the server once expires_at passes
+        ([("expires_at", 1)], {"expireAfterSeconds": 0}),
+    ],
+    "session": [([("id", 1)], {})],
+    "user": [
+        ([("id", 1)], {}),
+        # guild and major are both lists, and MongoDB cannot index two list
+        # fields together, so majors are filtered after this index narrows
+        ([("guild", 1), ("graduation_year", 1)], {}),
+    ],
+    # Codes are deleted by the server once expires_at passes
+    "verification": [
+        ([("id", 1)], {}),
+        ([("expires_at", 1)], {"expireAfterSeconds": 0}),
+    ],
+}
+
+# Fields added to a collection's template after documents were stored without
+# them, as collection name -> defaults set on documents missing the first field
+BACKFILLS = {
+    "user": {"is_deleted": False, "deleted_at": None},
+}
+
 
 class Database:
     def __init__(self, client: Optional[AsyncIOMotorClient] = None):
@@ -46,7 +92,7 @@ class Database:
         Returns:
             List[Data]: A list of Data objects corresponding to the given documents.
         """
-        return [Data(_collection_name, doc) for doc in documents]
+        return [Data.from_dict(doc) for doc in documents]
 
     @staticmethod
     def _extract_ids(items: Union[int, List[int], Data, List[Data]]) -> List[int]:
@@ -93,6 +139,57 @@ class Database:
 
         return cursor.limit(limit) if limit else cursor
 
+    @staticmethod
+    def _template_defaults(
+        collection_name: str, id: int, now: str, exclude: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Build the template fields to store when an upsert creates a document.
+
+        Args:
+            collection_name (str): The name of the collection.
+            id (int): The ID of the document.
+            now (str): The creation time.
+            exclude (List[str]): Fields the update sets itself, which must not be set twice.
+
+        Returns:
+            Dict[str, Any]: The fields for $setOnInsert.
+        """
+        defaults = {
+            **Data.from_template(collection_name, id).to_dict(),
+            "created_at": now,
+        }
+        return {
+            key: value
+            for key, value in defaults.items()
+            if key not in exclude and key != "updated_at"
+        }
+
+    # * * * * * Indexes * * * * * #
+    async def ensure_indexes(self):
+        """
+        Create every index declared in INDEXES. Existing indexes are left untouched.
+        """
+        for collection_name, indexes in INDEXES.items():
+            for keys, options in indexes:
+                await self.__db[collection_name].create_index(keys, **options)
+
+    async def backfill_fields(self) -> Dict[str, int]:
+        """
+        Set the defaults declared in BACKFILLS on documents stored before those fields existed,
+        so queries on them (e.g. is_deleted) match old documents too. Safe to run on every startup.
+
+        Returns:
+            Dict[str, int]: The number of documents updated, by collection name.
+        """
+        updated = {}
+        for collection_name, defaults in BACKFILLS.items():
+            result = await self.__db[collection_name].update_many(
+                {next(iter(defaults)): {"$exists": False}}, {"$set": defaults}
+            )
+            updated[collection_name] = result.modified_count
+        return updated
+
     # * * * * * Create Data * * * * * #
     async def create_data(self, collection_name: str, id: int):
         """
@@ -201,6 +298,97 @@ class Database:
         documents = await cursor.to_list(length=None)
         return self._documents_to_data(collection_name, documents)
 
+    async def search_range(
+        self,
+        collection_name: str,
+        field: str,
+        lower: Optional[Any] = None,
+        upper: Optional[Any] = None,
+        criteria: Optional[Dict[str, Any]] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+        deleted: Optional[bool] = False,
+        after: Optional[Tuple[Any, int]] = None,
+    ) -> List[Data]:
+        """
+        Search for Data objects whose field falls within a range, sorted by that field.
+
+        Args:
+            collection_name (str): The name of the collection to search in.
+            field (str): The indexed field to range over.
+            lower (Optional[Any]): Inclusive lower bound. If None, the range is open below.
+            upper (Optional[Any]): Exclusive upper bound. If None, the range is open above.
+            criteria (Optional[Dict[str, Any]]): Additional field-value pairs to match.
+            descending (bool): Sort from the upper bound down instead of the lower bound up.
+            limit (Optional[int]): The maximum number of results to return. If None, returns all matching results.
+            deleted (Optional[bool]): Flag to include deleted documents (if True) or exclude them (if False). Default is False.
+            after (Optional[Tuple[Any, int]]): The (field value, ID) of the last result of the previous page.
+                Only results sorted after it are returned, so each page is one index seek.
+
+        Returns:
+            List[Data]: A list of Data objects ordered by the field, then by ID.
+        """
+        criteria = dict(criteria or {})
+        criteria["is_deleted"] = deleted
+
+        bounds = {}
+        if lower is not None:
+            bounds["$gte"] = lower
+        if upper is not None:
+            bounds["$lt"] = upper
+        criteria[field] = bounds or {"$ne": None}
+
+        if after is not None:
+            value, id = after
+            beyond = "$lt" if descending else "$gt"
+            criteria["$or"] = [
+                {field: {beyond: value}},
+                {field: value, "id": {beyond: id}},
+            ]
+
+        direction = -1 if descending else 1
+        cursor = self.__db[collection_name].find(criteria)
+        cursor = cursor.sort([(field, direction), ("id", direction)])
+        cursor = self._apply_pagination(cursor, limit=limit)
+        documents = await cursor.to_list(length=None)
+        return self._documents_to_data(collection_name, documents)
+
+    async def text_search(
+        self,
+        collection_name: str,
+        query: str,
+        criteria: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        deleted: Optional[bool] = False,
+    ) -> List[Data]:
+        """
+        Search for Data objects through the collection's text index, best match first.
+
+        Args:
+            collection_name (str): The name of the collection to search in.
+            query (str): The search terms.
+            criteria (Optional[Dict[str, Any]]): Additional field-value pairs to match.
+            limit (Optional[int]): The maximum number of results to return. If None, returns all matching results.
+            deleted (Optional[bool]): Flag to include deleted documents (if True) or exclude them (if False). Default is False.
+
+        Returns:
+            List[Data]: A list of Data objects ordered by text score.
+
+        Raises:
+            OperationFailure: If the collection has no text index.
+        """
+        criteria = {**(criteria or {}), "$text": {"$search": query}}
+        criteria["is_deleted"] = deleted
+
+        score = {"score": {"$meta": "textScore"}}
+        cursor = self.__db[collection_name].find(criteria, score)
+        cursor = cursor.sort([("score", {"$meta": "textScore"})])
+        cursor = self._apply_pagination(cursor, limit=limit)
+        documents = await cursor.to_list(length=None)
+        for document in documents:
+            document.pop("score", None)
+        return self._documents_to_data(collection_name, documents)
+
     async def data_exists(self, data: Data, deleted: Optional[bool] = False) -> bool:
         """
         Check if a document exists in the database with the given Data object.
@@ -257,17 +445,385 @@ class Database:
             collection_name (str): The name of the collection to upsert the data into.
             data_list (list[Data]): The list of Data objects to upsert into the collection.
         """
+        for data in data_list:
+            data.set_value("updated_at", Timestamp.now())
         updates = [
-            {
-                "updateOne": {
-                    "filter": {"id": data.get_value("id")},
-                    "update": {"$set": data.to_dict()},
-                    "upsert": True,
-                }
-            }
+            UpdateOne(
+                {"id": data.get_value("id")}, {"$set": data.to_dict()}, upsert=True
+            )
             for data in data_list
         ]
-        await self.__db[collection_name].bulk_write(updates)
+        if updates:
+            await self.__db[collection_name].bulk_write(updates, ordered=False)
+
+    async def claim_value(
+        self, collection_name: str, id: int, key: str, value: Any
+    ) -> bool:
+        """
+        Atomically add a value to a list field unless it is already present.
+
+        Concurrent or repeated claims of the same value succeed exactly once,
+        which makes this suitable for at-most-once side effects.
+
+        Args:
+            collection_name (str): The name of the collection.
+            id (int): The ID of the document to update.
+            key (str): The list field to add the value to.
+            value (Any): The value to claim.
+
+        Returns:
+            bool: True if this call added the value, False if it was already present.
+        """
+        result = await self.__db[collection_name].update_one(
+            {"id": id, key: {"$ne": value}}, {"$addToSet": {key: value}}
+        )
+        return result.modified_count == 1
+
+    async def add_to_set(
+        self, collection_name: str, id: int, key: str, values: List[Any]
+    ):
+        """
+        Atomically add values to a list field, skipping values already present.
+
+        Args:
+            collection_name (str): The name of the collection.
+            id (int): The ID of the document to update.
+            key (str): The list field to add the values to.
+            values (List[Any]): The values to add.
+        """
+        if values:
+            await self.__db[collection_name].update_one(
+                {"id": id}, {"$addToSet": {key: {"$each": list(values)}}}
+            )
+
+    async def add_to_set_many(
+        self, collection_name: str, ids: List[int], key: str, value: Any
+    ):
+        """
+        Atomically add one value to a list field of several documents.
+
+        Args:
+            collection_name (str): The name of the collection.
+            ids (List[int]): The IDs of the documents to update.
+            key (str): The list field to add the value to.
+            value (Any): The value to add.
+        """
+        if ids:
+            await self.__db[collection_name].update_many(
+                {"id": {"$in": list(ids)}}, {"$addToSet": {key: value}}
+            )
+
+    async def pull_from_many(
+        self, collection_name: str, ids: List[int], key: str, value: Any
+    ):
+        """
+        Atomically remove one value from a list field of several documents.
+
+        Args:
+            collection_name (str): The name of the collection.
+            ids (List[int]): The IDs of the documents to update.
+            key (str): The list field to remove the value from.
+            value (Any): The value to remove.
+        """
+        if ids:
+            await self.__db[collection_name].update_many(
+                {"id": {"$in": list(ids)}}, {"$pull": {key: value}}
+            )
+
+    async def update_sets_bulk(
+        self,
+        collection_name: str,
+        key: str,
+        changes: Dict[int, Tuple[List[Any], List[Any]]],
+    ):
+        """
+        Add and remove values in a list field of several documents in one round trip,
+        creating missing documents from the template.
+
+        MongoDB cannot $addToSet and $pull the same field in one update, so each
+        document gets at most one of each.
+
+        Args:
+            collection_name (str): The name of the collection.
+            key (str): The list field to change.
+            changes (Dict[int, Tuple[List[Any], List[Any]]]): (values to add, values to remove), by document ID.
+        """
+        now = Timestamp.now().to_est()
+        operations = []
+        for id, (added, removed) in changes.items():
+            if added:
+                operations.append(
+                    UpdateOne(
+                        {"id": id},
+                        {
+                            "$addToSet": {key: {"$each": list(added)}},
+                            "$set": {"updated_at": now},
+                            "$setOnInsert": self._template_defaults(
+                                collection_name, id, now, [key]
+                            ),
+                        },
+                        upsert=True,
+                    )
+                )
+            if removed:
+                operations.append(
+                    UpdateOne(
+                        {"id": id},
+                        {
+                            "$pull": {key: {"$in": list(removed)}},
+                            "$set": {"updated_at": now},
+                        },
+                    )
+                )
+        if operations:
+            await self.__db[collection_name].bulk_write(operations, ordered=False)
+
+    async def insert_if_absent(
+        self, collection_name: str, criteria: Dict[str, Any], data: Data
+    ) -> bool:
+        """
+        Atomically insert a document unless one matching the criteria exists.
+
+        Args:
+            collection_name (str): The name of the collection.
+            criteria (Dict[str, Any]): Identifies an existing copy, e.g. an idempotency key. Back it with a unique index.
+            data (Data): The document to insert.
+
+        Returns:
+            bool: True if the document was inserted, False if a match already existed.
+        """
+        data.set_value("updated_at", Timestamp.now())
+        document = {**data.to_dict(), "id": data.get_value("id")}
+        result = await self.__db[collection_name].update_one(
+            criteria, {"$setOnInsert": document}, upsert=True
+        )
+        return result.upserted_id is not None
+
+    async def set_fields_if(
+        self, collection_name: str, criteria: Dict[str, Any], fields: Dict[str, Any]
+    ) -> bool:
+        """
+        Atomically set fields on one document, but only if it matches the criteria.
+
+        Args:
+            collection_name (str): The name of the collection.
+            criteria (Dict[str, Any]): The conditions the document must meet.
+            fields (Dict[str, Any]): The fields to set.
+
+        Returns:
+            bool: True if a document matched and was updated.
+        """
+        result = await self.__db[collection_name].update_one(criteria, {"$set": fields})
+        return result.modified_count == 1
+
+    async def set_fields_bulk(
+        self, collection_name: str, updates: Dict[int, Dict[str, Any]]
+    ):
+        """
+        Set fields on several documents in one round trip.
+
+        Args:
+            collection_name (str): The name of the collection.
+            updates (Dict[int, Dict[str, Any]]): The fields to set, by document ID.
+        """
+        operations = [
+            UpdateOne({"id": id}, {"$set": fields}) for id, fields in updates.items()
+        ]
+        if operations:
+            await self.__db[collection_name].bulk_write(operations, ordered=False)
+
+    async def merge_bulk(
+        self,
+        collection_name: str,
+        updates: Dict[int, Dict[str, Any]],
+        add_to_set: Optional[Dict[str, Any]] = None,
+        overwrite: bool = True,
+    ):
+        """
+        Set fields on several documents in one round trip, creating missing ones from the template.
+
+        Fields not being set keep their stored values, or get template defaults on new documents.
+        The filter on id stores the ID itself when a document is created.
+
+        Args:
+            collection_name (str): The name of the collection.
+            updates (Dict[int, Dict[str, Any]]): The fields to set, by document ID.
+            add_to_set (Optional[Dict[str, Any]]): A value to add to a list field of every document, by field.
+            overwrite (bool): Whether to replace stored values. If False, fields are only set on
+                new documents and on existing ones where the field is missing or empty.
+        """
+        add_to_set = add_to_set or {}
+        now = Timestamp.now().to_est()
+        operations = []
+        for id, fields in updates.items():
+            update = {
+                "$setOnInsert": self._template_defaults(
+                    collection_name, id, now, [*fields, *add_to_set]
+                ),
+            }
+            if overwrite:
+                update["$set"] = {**fields, "updated_at": now}
+            else:
+                update["$setOnInsert"].update({**fields, "updated_at": now})
+                operations += [
+                    UpdateOne(
+                        {
+                            "id": id,
+                            "$or": [{key: {"$in": [None, ""]}}, {key: {"$size": 0}}],
+                        },
+                        {"$set": {key: value, "updated_at": now}},
+                    )
+                    for key, value in fields.items()
+                ]
+            if add_to_set:
+                update["$addToSet"] = add_to_set
+            operations.append(UpdateOne({"id": id}, update, upsert=True))
+        if operations:
+            await self.__db[collection_name].bulk_write(operations, ordered=False)
+
+    async def iter_data(
+        self,
+        collection_name: str,
+        criteria: Dict[str, Any],
+        batch_size: int = 500,
+        deleted: Optional[bool] = False,
+    ) -> AsyncIterator[Data]:
+        """
+        Iterate over matching documents in ID order without loading them all at once.
+
+        Args:
+            collection_name (str): The name of the collection.
+            criteria (Dict[str, Any]): A dictionary of field-value pairs to match.
+            batch_size (int): The number of documents fetched per round trip.
+            deleted (Optional[bool]): Whether to iterate over deleted documents instead. Default is False.
+
+        Returns:
+            AsyncIterator[Data]: The matching documents.
+        """
+        cursor = (
+            self.__db[collection_name]
+            .find({**criteria, "is_deleted": deleted})
+            .sort("id", 1)
+            .batch_size(batch_size)
+        )
+        async for document in cursor:
+            yield Data.from_dict(document)
+
+    async def claim_many(
+        self,
+        collection_name: str,
+        criteria: Dict[str, Any],
+        fields: Dict[str, Any],
+        limit: int,
+        sort_field: str = "id",
+    ) -> List[Data]:
+        """
+        Claim up to limit matching documents by setting fields on them.
+
+        Documents are re-checked against the criteria as they are updated, so
+        when several processes claim at once each document goes to exactly one.
+        The fields must include a value unique to this claim, such as a token.
+
+        Args:
+            collection_name (str): The name of the collection.
+            criteria (Dict[str, Any]): Matches the documents available to claim.
+            fields (Dict[str, Any]): Set on claimed documents; must identify this claim.
+            limit (int): The most documents to claim.
+            sort_field (str): Claim documents in ascending order of this field.
+
+        Returns:
+            List[Data]: The claimed documents, after the update.
+        """
+        collection = self.__db[collection_name]
+        cursor = collection.find(criteria, {"id": 1}).sort(sort_field, 1).limit(limit)
+        ids = [document["id"] for document in await cursor.to_list(length=None)]
+        if not ids:
+            return []
+
+        await collection.update_many({**criteria, "id": {"$in": ids}}, {"$set": fields})
+        documents = await collection.find(fields).to_list(length=None)
+        return self._documents_to_data(collection_name, documents)
+
+    async def count_by(
+        self,
+        collection_name: str,
+        criteria: Dict[str, Any],
+        fields: List[str],
+        deleted: Optional[bool] = False,
+    ) -> Dict[str, Any]:
+        """
+        Count matching documents by each value of several fields in one aggregation.
+
+        List fields count each document once per element.
+
+        Args:
+            collection_name (str): The name of the collection.
+            criteria (Dict[str, Any]): A dictionary of field-value pairs to match.
+            fields (List[str]): The fields to count values of.
+            deleted (Optional[bool]): Whether to count deleted documents instead. Default is False.
+
+        Returns:
+            Dict[str, Any]: "total" maps to the number of matching documents, and each field to a dict of its value counts.
+        """
+        facets = {
+            field: [
+                {"$unwind": f"${field}"},
+                {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            ]
+            for field in fields
+        }
+        facets["total"] = [{"$count": "count"}]
+        pipeline = [
+            {"$match": {**criteria, "is_deleted": deleted}},
+            {"$facet": facets},
+        ]
+        result = (
+            await self.__db[collection_name].aggregate(pipeline).to_list(length=None)
+        )[0]
+
+        counts = {
+            field: {group["_id"]: group["count"] for group in result[field]}
+            for field in fields
+        }
+        counts["total"] = result["total"][0]["count"] if result["total"] else 0
+        return counts
+
+    async def take_data(
+        self, collection_name: str, criteria: Dict[str, Any]
+    ) -> Optional[Data]:
+        """
+        Atomically find and permanently delete one document.
+
+        Args:
+            collection_name (str): The name of the collection.
+            criteria (Dict[str, Any]): A dictionary of field-value pairs to match.
+
+        Returns:
+            Optional[Data]: The deleted document, or None if nothing matched.
+        """
+        document = await self.__db[collection_name].find_one_and_delete(criteria)
+        return Data.from_dict(document) if document else None
+
+    async def count_data(
+        self,
+        collection_name: str,
+        criteria: Dict[str, Any],
+        deleted: Optional[bool] = False,
+    ) -> int:
+        """
+        Count the documents matching the criteria.
+
+        Args:
+            collection_name (str): The name of the collection.
+            criteria (Dict[str, Any]): A dictionary of field-value pairs to match.
+            deleted (Optional[bool]): Whether to count deleted documents instead. Default is False.
+
+        Returns:
+            int: The number of matching documents.
+        """
+        return await self.__db[collection_name].count_documents(
+            {**criteria, "is_deleted": deleted}
+        )
 
     # * * * * * Delete and Restore Data * * * * * #
     async def soft_delete(
@@ -283,7 +839,7 @@ class Database:
         ids = self._extract_ids(items)
         await self.__db[collection_name].update_many(
             {"id": {"$in": ids}},
-            {"$set": {"is_deleted": True, "deleted_at": Timestamp.now()}},
+            {"$set": {"is_deleted": True, "deleted_at": Timestamp.now().to_est()}},
         )
 
     async def restore(
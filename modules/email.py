@@ -1,22 +1,131 @@
 # modules/email.py - handles all email interactions as an object
 
 import os
+import asyncio
+import logging
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from typing import List, Optional
 
+SMTP_SERVER = "smtp.gmail.com"  # Change to your SMTP server if not Gmail
+SMTP_PORT = 587  # SMTP port for TLS
+SMTP_TIMEOUT = 30  # Seconds before a stalled SMTP connection is given up on
 
-class Email:
-    def __init__(self):
-        """Initialize the Email object with configuration from environment variables."""
-        self.email = os.environ.get("EMAIL_CLIENT_ADDRESS")
-        self.password = os.environ.get("EMAIL_CLIENT_PASSWORD")
-        self.smtp_server = "smtp.gmail.com"  # Change to your SMTP server if not Gmail
-        self.smtp_port = 587  # SMTP port for TLS
+# Connections kept open to the SMTP server, which is also the most messages sent at once
+POOL_SIZE = 3
 
-    def send_email(self, recipient: str, subject: str, message: str) -> int:
+# Messages allowed to wait for a connection; further sends fail immediately
+MAX_QUEUE = 1000
+
+# Attempts per message; a pooled connection the server has closed is reopened once
+SEND_ATTEMPTS = 2
+
+logger = logging.getLogger("discord.email")
+
+
+def build_message(sender: str, recipient: str, subject: str, message: str) -> str:
+    """
+    Builds a plain text email.
+
+    Args:
+        sender (str): The sender's email address.
+        recipient (str): The recipient's email address.
+        subject (str): The subject of the email.
+        message (str): The message of the email.
+
+    Returns:
+        str: The email, ready to hand to an SMTP server.
+    """
+    # Create a multipart email message
+    msg = MIMEMultipart()
+    msg["From"] = sender
+    msg["To"] = recipient
+    msg["Subject"] = subject
+
+    # Attach the message body
+    msg.attach(MIMEText(message, "plain"))
+    return msg.as_string()
+
+
+class EmailService:
+    def __init__(
+        self,
+        sender: Optional[str] = None,
+        password: Optional[str] = None,
+        host: str = SMTP_SERVER,
+        port: int = SMTP_PORT,
+        pool_size: int = POOL_SIZE,
+        starttls: bool = True,
+        max_queue: int = MAX_QUEUE,
+        timeout: float = SMTP_TIMEOUT,
+    ):
         """
-        Sends an email to the specified recipient with the given subject and message.
+        Initializes an email service that sends in the background.
+
+        Messages are queued and sent by pool_size workers, each holding one
+        persistent, authenticated SMTP connection that is reused across
+        messages. The blocking SMTP calls run in worker threads, so a slow
+        server never stalls the event loop.
+
+        Args:
+            sender (Optional[str]): The sender's address. Defaults to EMAIL_CLIENT_ADDRESS.
+            password (Optional[str]): The sender's password. Defaults to EMAIL_CLIENT_PASSWORD; if empty, no login is attempted.
+            host (str): The SMTP server.
+            port (int): The SMTP port.
+            pool_size (int): The number of connections, and so of messages in flight.
+            starttls (bool): Whether to upgrade connections with STARTTLS.
+            max_queue (int): The number of messages allowed to wait for a connection.
+            timeout (float): Seconds before a stalled SMTP operation fails.
+        """
+        self.sender = sender or os.environ.get("EMAIL_CLIENT_ADDRESS")
+        self.password = (
+            password
+            if password is not None
+            else os.environ.get("EMAIL_CLIENT_PASSWORD")
+        )
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.starttls = starttls
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.__queue: Optional[asyncio.Queue] = None
+        self.__workers: List[asyncio.Task] = []
+
+    # * * * * * Lifecycle * * * * * #
+    async def start(self):
+        """
+        Starts the workers. Connections are opened on each worker's first message.
+        """
+        if self.__workers:
+            return
+        self.__queue = asyncio.Queue(self.max_queue)
+        self.__workers = [
+            asyncio.create_task(self.__work()) for _ in range(self.pool_size)
+        ]
+
+    async def stop(self):
+        """
+        Waits for queued messages to be sent, then closes every connection.
+        """
+        if not self.__workers:
+            return
+        await self.__queue.join()
+        for worker in self.__workers:
+            worker.cancel()
+        await asyncio.gather(*self.__workers, return_exceptions=True)
+        self.__workers = []
+
+    @property
+    def pending(self) -> int:
+        """The number of messages waiting for a connection."""
+        return self.__queue.qsize() if self.__queue else 0
+
+    # * * * * * Sending * * * * * #
+    def send(self, recipient: str, subject: str, message: str) -> asyncio.Future:
+        """
+        Queues an email and returns without waiting for it to be sent.
 
         Args:
             recipient (str): The recipient's email address.
@@ -24,27 +133,83 @@ class Email:
             message (str): The message of the email.
 
         Returns:
-            int: 0 if the email was sent successfully, -1 otherwise.
+            asyncio.Future: Resolves to True once the email is sent, or False if it could not be.
+
+        Raises:
+            RuntimeError: If the service has not been started.
         """
+        if not self.__workers:
+            raise RuntimeError("EmailService.start() must be awaited before sending.")
+
+        future = asyncio.get_running_loop().create_future()
+        payload = build_message(self.sender, recipient, subject, message)
         try:
-            # Create a multipart email message
-            msg = MIMEMultipart()
-            msg["From"] = self.email
-            msg["To"] = recipient
-            msg["Subject"] = subject
-
-            # Attach the message body
-            msg.attach(MIMEText(message, "plain"))
-
-            # Connect to the SMTP server and send the email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()  # Upgrade the connection to secure
-                server.login(self.email, self.password)  # Log in to the server
-                server.sendmail(
-                    self.email, recipient, msg.as_string()
-                )  # Send the email
-
-            return 0  # Email sent successfully
-        except Exception as e:
-            print(f"Error sending email: {e}")  # Log the error for debugging
-            return -1  # Email not sent
+            self.__queue.put_nowait((recipient, payload, future))
+        except asyncio.QueueFull:
+            logger.error(f"Email queue is full; dropping email to {recipient}")
+            future.set_result(False)
+        return future
+
+    # * * * * * Internal Helpers * * * * * #
+    def __connect(self) -> smtplib.SMTP:
+        """Opens and authenticates one SMTP connection. Blocking."""
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                connection.starttls()
+            if self.password:
+                connection.login(self.sender, self.password)
+        except Exception:
+            connection.close()
+            raise
+        return connection
+
+    @staticmethod
+    def __disconnect(connection: smtplib.SMTP):
+        """Closes one SMTP connection, ignoring a server that already hung up. Blocking."""
+        try:
+            connection.quit()
+        except smtplib.SMTPException:
+            connection.close()
+
+    async def __work(self):
+        """Sends queued messages over this worker's connection until cancelled."""
+        connection: Optional[smtplib.SMTP] = None
+        try:
+            while True:
+                recipient, payload, future = await self.__queue.get()
+                sent = False
+                for attempt in range(SEND_ATTEMPTS):
+                    try:
+                        if connection is None:
+                            connection = await asyncio.to_thread(self.__connect)
+                        await asyncio.to_thread(
+                            connection.sendmail, self.sender, recipient, payload
+                        )
+                        sent = True
+                        break
+                    except (
+                        smtplib.SMTPRecipientsRefused,
+                        smtplib.SMTPSenderRefused,
+                        smtplib.SMTPDataError,
+                    ) as e:
+                        # The server rejected this message; the connection is still good
+                        logger.error(f"Error sending email to {recipient}: {e}")
+                        break
+                    except OSError as e:
+                        # Includes SMTPServerDisconnected and timeouts; retry on a new connection
+                        if connection is not None:
+                            connection.close()
+                        connection = None
+                        if attempt == SEND_ATTEMPTS - 1:
+                            logger.error(f"Error sending email to {recipient}: {e}")
+                    except Exception as e:
+                        logger.error(f"Error sending email to {recipient}: {e}")
+                        break
+
+                self.__queue.task_done()
+                if not future.done():
+                    future.set_result(sent)
+        finally:
+            if connection is not None:
+                await asyncio.to_thread(self.__disconnect, connection)
@@ -0,0 +1,237 @@
+# modules/extensions.py - loads bot extensions concurrently and times each one
+
+import ast
+import asyncio
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("discord.extensions")
+
+# The parser is not safe to run from several threads at once
+PARSE_LOCK = threading.Lock()
+
+
+def extension_dependencies(name: str) -> List[str]:
+    """
+    Finds the modules an extension imports at its top level, without running it.
+    Relative and conditional imports are left to the extension.
+
+    Args:
+        name (str): The extension's module name, e.g. cogs.event.
+
+    Returns:
+        List[str]: The imported modules' names, in import order.
+
+    Raises:
+        ModuleNotFoundError: If the extension does not exist.
+    """
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    source = spec.loader.get_source(name)
+    if source is None:
+        return []
+    dependencies: List[str] = []
+    with PARSE_LOCK:
+        tree = ast.parse(source)
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            dependencies += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            dependencies.append(node.module)
+    return list(dict.fromkeys(dependencies))
+
+
+def import_dependencies(name: str, extensions: Iterable[str] = ()):
+    """
+    Imports an extension's dependencies but not the extension itself, which
+    the bot's loader executes. Dependencies that fail to import are left for
+    the loader to report.
+
+    Args:
+        name (str): The extension's module name.
+        extensions (Iterable[str]): Other extensions, which are also left for the loader.
+    """
+    extensions = set(extensions)
+    for dependency in extension_dependencies(name):
+        if dependency in extensions:
+            continue
+        try:
+            importlib.import_module(dependency)
+        except ImportError:
+            pass
+
+
+class ExtensionTiming:
+    __slots__ = ("name", "import_seconds", "setup_seconds", "error", "deferred")
+
+    def __init__(self, name: str, deferred: bool = False):
+        """
+        Initializes the record of one extension's loading: import_seconds is
+        the time spent importing its dependencies, and setup_seconds the time
+        the bot took to execute and set up the extension itself.
+
+        Args:
+            name (str): The extension's module name, e.g. cogs.event.
+            deferred (bool): Whether loading waits for the extension's first command.
+        """
+        self.name = name
+        self.import_seconds: Optional[float] = None
+        self.setup_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.deferred = deferred
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the extension finished loading."""
+        return self.setup_seconds is not None and self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the timing by field name."""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __str__(self) -> str:
+        if self.error:
+            return f"{self.name}: failed ({self.error})"
+        if not self.loaded:
+            return f"{self.name}: deferred"
+        return (
+            f"{self.name}: dependencies {self.import_seconds * 1000:.0f} ms, "
+            f"load {self.setup_seconds * 1000:.0f} ms"
+        )
+
+
+class ExtensionLoader:
+    def __init__(
+        self,
+        load: Callable[[str], Awaitable[None]],
+        deferred: Optional[Dict[str, Iterable[str]]] = None,
+    ):
+        """
+        Initializes an extension loader.
+
+        Each extension's dependencies are imported in a worker thread, so
+        they are imported side by side, and then the extensions are loaded
+        concurrently, so setup that waits on the network overlaps. The
+        extension modules themselves are only executed by the loader. Deferred extensions are loaded
+        the first time one of their commands is used instead.
+
+        Args:
+            load (Callable[[str], Awaitable[None]]): Loads and sets up an extension, e.g. Bot.load_extension.
+            deferred (Optional[Dict[str, Iterable[str]]]): The command names of each extension to defer, by extension name.
+        """
+        self.__load = load
+        self.__deferred_commands = {
+            command: name
+            for name, commands in (deferred or {}).items()
+            for command in commands
+        }
+        self.__loading: Dict[str, asyncio.Task] = {}
+        self.timings: Dict[str, ExtensionTiming] = {}
+        self.total_seconds: Optional[float] = None
+
+    async def load_all(self, names: Iterable[str]) -> List[ExtensionTiming]:
+        """
+        Loads every extension that is not deferred, concurrently.
+
+        Args:
+            names (Iterable[str]): The extensions' module names.
+
+        Returns:
+            List[ExtensionTiming]: How each extension loaded, in the given order.
+        """
+        start = time.perf_counter()
+        deferred = set(self.__deferred_commands.values())
+        for name in names:
+            self.timings[name] = ExtensionTiming(name, deferred=name in deferred)
+        await asyncio.gather(
+            *(
+                self.load(name)
+                for name, timing in self.timings.items()
+                if not timing.deferred
+            )
+        )
+        self.total_seconds = time.perf_counter() - start
+        return list(self.timings.values())
+
+    async def load(self, name: str) -> ExtensionTiming:
+        """
+        Loads one extension, timing its dependencies and its load. Failures are recorded, not raised.
+        Concurrent calls for the same extension share one load.
+
+        Args:
+            name (str): The extension's module name.
+
+        Returns:
+            ExtensionTiming: How the extension loaded.
+        """
+        timing = self.timings.setdefault(name, ExtensionTiming(name, deferred=True))
+        if timing.loaded:
+            return timing
+        task = self.__loading.get(name)
+        if task is None:
+            task = self.__loading[name] = asyncio.create_task(self.__timed_load(timing))
+        return await asyncio.shield(task)
+
+    async def __timed_load(self, timing: ExtensionTiming) -> ExtensionTiming:
+        """Imports an extension's dependencies in a thread, then loads it."""
+        try:
+            start = time.perf_counter()
+            await asyncio.to_thread(
+                import_dependencies, timing.name, list(self.timings)
+            )
+            timing.import_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            await self.__load(timing.name)
+            timing.setup_seconds = time.perf_counter() - start
+            timing.error = None
+            logger.info(f"Loaded {timing}")
+        except Exception as e:
+            timing.error = str(e)
+            logger.error(f"Failed to load {timing.name}: {e}")
+        finally:
+            self.__loading.pop(timing.name, None)
+        return timing
+
+    def deferred_extension(self, command: str) -> Optional[str]:
+        """
+        Finds the deferred extension providing a command, if it is not loaded yet.
+
+        Args:
+            command (str): The name the command was invoked with.
+
+        Returns:
+            Optional[str]: The extension's module name, or None if there is nothing to load.
+        """
+        name = self.__deferred_commands.get(command)
+        timing = self.timings.get(name)
+        if name is None or (timing is not None and timing.loaded):
+            return None
+        return name
+
+    def report(self) -> str:
+        """
+        Summarizes how the extensions loaded, slowest first.
+
+        Returns:
+            str: One line per extension, after a total line.
+        """
+        timings = sorted(
+            self.timings.values(),
+            key=lambda timing: -(
+                (timing.import_seconds or 0) + (timing.setup_seconds or 0)
+            ),
+        )
+        total = (
+            f"{self.total_seconds * 1000:.0f} ms"
+            if self.total_seconds is not None
+            else "not loaded"
+        )
+        lines = [f"{len(self.timings)} extensions, {total}"]
+        lines += [str(timing) for timing in timings]
+        return "\n".join(lines)
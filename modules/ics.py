@@ -0,0 +1,479 @@
+# modules/ics.py - reads and writes iCalendar (RFC 5545) files
+
+import calendar
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from modules.cache import LRUCache
+from modules.timestamp import (
+    DATETIME_FORMAT,
+    DEFAULT_TIMEZONE,
+    format_epochs,
+    get_tz,
+    to_epochs,
+)
+
+ICS_DATETIME_FORMAT = "%Y%m%dT%H%M%S"
+ICS_DATE_FORMAT = "%Y%m%d"
+ICS_UTC_FORMAT = "%Y%m%dT%H%M%SZ"
+PRODID = "-//CApy//Club Assistant//EN"
+DEFAULT_DURATION = 3600  # Seconds, for events without an end time
+
+# Rendered calendar budget in bytes; the least recently fetched guilds are dropped beyond it
+CALENDAR_CACHE_BYTES = 16 * 1024 * 1024
+
+# A property's parameters and value, e.g. DTSTART;TZID=America/New_York:20240910T180000
+Property = Tuple[Dict[str, str], str]
+
+
+# * * * * * Parsing * * * * * #
+def unfold(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """
+    Joins folded content lines, which continue on lines starting with a space or tab.
+
+    Args:
+        lines (Iterable[str]): The raw lines of an ICS file.
+
+    Returns:
+        Iterator[Tuple[int, str]]: (line number, unfolded content line) pairs.
+    """
+    current, start = None, 0
+    for number, line in enumerate(lines, start=1):
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current:
+            yield start, current
+        current, start = line, number
+    if current:
+        yield start, current
+
+
+def parse_line(line: str) -> Tuple[str, Property]:
+    """
+    Splits a content line into its name, parameters and value.
+
+    Args:
+        line (str): An unfolded content line.
+
+    Returns:
+        Tuple[str, Property]: The uppercase property name and its (parameters, value).
+
+    Raises:
+        ValueError: If the line has no value separator.
+    """
+    quoted = False
+    for index, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ":" and not quoted:
+            head, value = line[:index], line[index + 1 :]
+            break
+    else:
+        raise ValueError(f"Malformed content line: {line}")
+
+    name, *params = head.split(";")
+    parameters = {}
+    for param in params:
+        key, _, param_value = param.partition("=")
+        parameters[key.upper()] = param_value.strip('"')
+    return name.upper(), (parameters, value)
+
+
+def unescape(text: str) -> str:
+    """Reverses RFC 5545 TEXT escaping."""
+    result, escaped = [], False
+    for char in text:
+        if escaped:
+            result.append("\n" if char in "nN" else char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        else:
+            result.append(char)
+    return "".join(result)
+
+
+def iter_vevents(lines: Iterable[str]) -> Iterator[Tuple[int, Dict[str, Property]]]:
+    """
+    Streams the VEVENT components of an ICS file.
+
+    Args:
+        lines (Iterable[str]): The raw lines of an ICS file.
+
+    Returns:
+        Iterator[Tuple[int, Dict[str, Property]]]: (line number of BEGIN:VEVENT, properties) pairs.
+    """
+    event, start, depth = None, 0, 0
+    for number, line in unfold(lines):
+        try:
+            name, (parameters, value) = parse_line(line)
+        except ValueError:
+            continue
+
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            event, start, depth = {}, number, 0
+        elif event is None:
+            continue
+        elif name == "BEGIN":
+            # Nested components such as VALARM have properties of their own
+            depth += 1
+        elif name == "END" and depth:
+            depth -= 1
+        elif name == "END" and value.upper() == "VEVENT":
+            yield start, event
+            event = None
+        elif not depth:
+            event.setdefault(name, (parameters, value))
+
+
+# * * * * * Conversion * * * * * #
+def to_local(property: Property) -> Tuple[str, str]:
+    """
+    Converts a DTSTART/DTEND property into a wall-clock datetime and timezone.
+
+    UTC times are expressed in America/New_York, TZID times keep their zone,
+    floating times are taken as America/New_York and dates start at midnight.
+
+    Args:
+        property (Property): The (parameters, value) of the property.
+
+    Returns:
+        Tuple[str, str]: The datetime in the format MM/DD/YY HH:MM {AM/PM} and the IANA timezone.
+
+    Raises:
+        ValueError: If the value is not a valid date or date-time.
+        KeyError: If the TZID is not a known timezone.
+    """
+    parameters, value = property
+    value = value.strip()
+
+    if parameters.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+        local = datetime.strptime(value, ICS_DATE_FORMAT)
+        return local.strftime(DATETIME_FORMAT), DEFAULT_TIMEZONE
+
+    if value.endswith("Z"):
+        epoch = calendar.timegm(
+            datetime.strptime(value[:-1], ICS_DATETIME_FORMAT).timetuple()
+        )
+        return (
+            format_epochs([epoch], DEFAULT_TIMEZONE, DATETIME_FORMAT)[0],
+            DEFAULT_TIMEZONE,
+        )
+
+    tz_name = parameters.get("TZID", DEFAULT_TIMEZONE)
+    get_tz(tz_name)
+    local = datetime.strptime(value, ICS_DATETIME_FORMAT)
+    return local.strftime(DATETIME_FORMAT), tz_name
+
+
+def to_epoch(property: Property) -> float:
+    """
+    Converts a DTSTART/DTEND/EXDATE property holding one value into a Unix epoch.
+
+    Args:
+        property (Property): The (parameters, value) of the property.
+
+    Returns:
+        float: The Unix epoch.
+    """
+    datetime_str, tz_name = to_local(property)
+    return to_epochs([datetime_str], tz_name)[0]
+
+
+def event_fields(vevent: Dict[str, Property]) -> Dict[str, Any]:
+    """
+    Maps a VEVENT onto event template fields.
+
+    Args:
+        vevent (Dict[str, Property]): The properties of the VEVENT.
+
+    Returns:
+        Dict[str, Any]: The name, description, datetime, timezone and location of the event,
+            and its end_time, recurrence and exceptions if the VEVENT has DTEND, RRULE or EXDATE.
+            The RRULE is passed through unchecked.
+
+    Raises:
+        ValueError: If the VEVENT has no SUMMARY or DTSTART, or ends before it starts.
+    """
+    if "SUMMARY" not in vevent or "DTSTART" not in vevent:
+        raise ValueError("VEVENT is missing SUMMARY or DTSTART.")
+
+    datetime_str, tz_name = to_local(vevent["DTSTART"])
+    fields = {
+        "name": unescape(vevent["SUMMARY"][1]),
+        "description": unescape(vevent.get("DESCRIPTION", ({}, ""))[1]),
+        "datetime": datetime_str,
+        "timezone": tz_name,
+        "location": unescape(vevent.get("LOCATION", ({}, ""))[1]),
+    }
+    if "DTEND" in vevent:
+        end_time = to_epoch(vevent["DTEND"])
+        if end_time <= to_epochs([datetime_str], tz_name)[0]:
+            raise ValueError("VEVENT ends before it starts.")
+        fields["end_time"] = end_time
+    if "RRULE" in vevent:
+        fields["recurrence"] = vevent["RRULE"][1].strip().upper()
+    if "EXDATE" in vevent:
+        parameters, value = vevent["EXDATE"]
+        fields["exceptions"] = sorted(
+            to_epoch((parameters, skipped)) for skipped in value.split(",") if skipped
+        )
+    return fields
+
+
+# * * * * * Rendering * * * * * #
+def escape(text: str) -> str:
+    """Applies RFC 5545 TEXT escaping."""
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """
+    Folds a content line so that no physical line exceeds 75 octets.
+
+    Args:
+        line (str): An unfolded content line.
+
+    Returns:
+        str: The line with CRLF-space breaks, never splitting a UTF-8 character.
+    """
+    parts, current, size = [], [], 0
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > 75:
+            parts.append("".join(current))
+            current, size = [" "], 1
+        current.append(char)
+        size += width
+    parts.append("".join(current))
+    return "\r\n".join(parts)
+
+
+def format_utc(epoch: float) -> str:
+    """Formats a Unix epoch as an ICS UTC date-time."""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime(ICS_UTC_FORMAT)
+
+
+def render_vevent(
+    uid: str,
+    name: str,
+    description: str,
+    location: str,
+    start_time: float,
+    end_time: Optional[float] = None,
+    stamp: Optional[float] = None,
+    tz_name: str = DEFAULT_TIMEZONE,
+    recurrence: str = "",
+    exceptions: Iterable[float] = (),
+) -> bytes:
+    """
+    Renders one VEVENT component.
+
+    Args:
+        uid (str): The globally unique ID of the event.
+        name (str): The event name.
+        description (str): The event description.
+        location (str): The event location.
+        start_time (float): The event start as a Unix epoch.
+        end_time (Optional[float]): The event end as a Unix epoch. Defaults to one hour after the start.
+        stamp (Optional[float]): When the event was created, as a Unix epoch. Defaults to the start.
+        tz_name (str): The IANA timezone of the event, used for recurring events.
+        recurrence (str): An RRULE value for recurring events, or empty for one-off events.
+        exceptions (Iterable[float]): Start times of cancelled occurrences, as Unix epochs.
+
+    Returns:
+        bytes: The CRLF-terminated VEVENT, encoded as UTF-8.
+    """
+    if end_time is None:
+        end_time = start_time + DEFAULT_DURATION
+
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{format_utc(stamp if stamp is not None else start_time)}",
+    ]
+    if recurrence:
+        # Recurring times are local so occurrences keep their wall-clock time across DST
+        start, end = format_epochs([start_time, end_time], tz_name, ICS_DATETIME_FORMAT)
+        lines += [
+            f"DTSTART;TZID={tz_name}:{start}",
+            f"DTEND;TZID={tz_name}:{end}",
+            f"RRULE:{recurrence}",
+        ]
+        if exceptions:
+            skipped = format_epochs(sorted(exceptions), tz_name, ICS_DATETIME_FORMAT)
+            lines.append(f"EXDATE;TZID={tz_name}:{','.join(skipped)}")
+    else:
+        lines += [f"DTSTART:{format_utc(start_time)}", f"DTEND:{format_utc(end_time)}"]
+    lines.append(f"SUMMARY:{escape(name)}")
+    if description:
+        lines.append(f"DESCRIPTION:{escape(description)}")
+    if location:
+        lines.append(f"LOCATION:{escape(location)}")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) + "\r\n" for line in lines).encode("utf-8")
+
+
+class GuildCalendar:
+    __slots__ = ("vevents", "vevent_bytes", "document")
+
+    def __init__(self, vevents: Dict[int, bytes]):
+        """
+        Initializes one guild's cached calendar.
+
+        Args:
+            vevents (Dict[int, bytes]): Rendered VEVENTs by event ID.
+        """
+        self.vevents = dict(vevents)
+        self.vevent_bytes = sum(len(vevent) for vevent in self.vevents.values())
+        self.document: Optional[Tuple[bytes, str]] = None
+
+    def set(self, event_id: int, vevent: Optional[bytes]):
+        """Adds, replaces or, given None, removes one event, invalidating the document."""
+        previous = self.vevents.pop(event_id, None)
+        if previous is not None:
+            self.vevent_bytes -= len(previous)
+        if vevent is not None:
+            self.vevents[event_id] = vevent
+            self.vevent_bytes += len(vevent)
+        self.document = None
+
+    @property
+    def size(self) -> int:
+        """The bytes held, counting the document once it is built."""
+        return self.vevent_bytes + (len(self.document[0]) if self.document else 0)
+
+
+class CalendarCache:
+    def __init__(self, max_bytes: int = CALENDAR_CACHE_BYTES):
+        """
+        Initializes an empty cache of per-guild calendars.
+
+        Each guild keeps its rendered VEVENTs by event ID, so a change re-renders
+        one VEVENT; the full document and its ETag are rebuilt only when a guild
+        that changed is fetched again. Calendars are kept in an LRU cache sized
+        by their bytes, so guilds whose calendars are not fetched are dropped
+        and loaded again on their next fetch.
+
+        Args:
+            max_bytes (int): The total size of the cached calendars at most.
+        """
+        self.__calendars = LRUCache(max_bytes, on_evict=self.__forget_events)
+        self.__guild_of: Dict[int, int] = {}
+
+    def __forget_events(self, guild_id: int, calendar: GuildCalendar):
+        """Drops the event lookup of a calendar leaving the cache."""
+        for event_id in calendar.vevents:
+            if self.__guild_of.get(event_id) == guild_id:
+                del self.__guild_of[event_id]
+
+    def __store(self, guild_id: int, calendar: GuildCalendar):
+        """Caches a calendar at its current size, unless it alone exceeds the budget."""
+        if calendar.size > self.__calendars.max_size:
+            self.forget(guild_id)
+            return
+        self.__calendars.set(guild_id, calendar, calendar.size)
+
+    def is_loaded(self, guild_id: int) -> bool:
+        """Checks whether a guild's events are in the cache."""
+        return guild_id in self.__calendars
+
+    def load(self, guild_id: int, vevents: Dict[int, bytes]) -> Tuple[bytes, str]:
+        """
+        Replaces a guild's cached events.
+
+        Args:
+            guild_id (int): The ID of the guild.
+            vevents (Dict[int, bytes]): Rendered VEVENTs by event ID.
+
+        Returns:
+            Tuple[bytes, str]: The VCALENDAR bytes and a quoted ETag, even if the
+                calendar is too large to keep.
+        """
+        self.forget(guild_id)
+        calendar = GuildCalendar(vevents)
+        self.__guild_of.update((event_id, guild_id) for event_id in vevents)
+        document = self.__render(calendar)
+        self.__store(guild_id, calendar)
+        return document
+
+    def upsert(self, guild_id: int, event_id: int, vevent: bytes):
+        """
+        Adds or replaces one event of a loaded guild; unloaded guilds are ignored.
+
+        Args:
+            guild_id (int): The ID of the guild.
+            event_id (int): The ID of the event.
+            vevent (bytes): The rendered VEVENT.
+        """
+        calendar = self.__calendars.get(guild_id)
+        if calendar is not None:
+            calendar.set(event_id, vevent)
+            self.__guild_of[event_id] = guild_id
+            self.__store(guild_id, calendar)
+
+    def remove(self, event_id: int):
+        """
+        Removes one event from whichever guild calendar holds it.
+
+        Args:
+            event_id (int): The ID of the event.
+        """
+        guild_id = self.__guild_of.pop(event_id, None)
+        calendar = self.__calendars.get(guild_id) if guild_id is not None else None
+        if calendar is not None:
+            calendar.set(event_id, None)
+            self.__store(guild_id, calendar)
+
+    def forget(self, guild_id: int):
+        """
+        Drops a guild's calendar, e.g. when the bot leaves it.
+
+        Args:
+            guild_id (int): The ID of the guild.
+        """
+        calendar = self.__calendars.pop(guild_id)
+        if calendar is not None:
+            self.__forget_events(guild_id, calendar)
+
+    def get(self, guild_id: int) -> Optional[Tuple[bytes, str]]:
+        """
+        Returns a guild's calendar document and its ETag.
+
+        Args:
+            guild_id (int): The ID of the guild.
+
+        Returns:
+            Optional[Tuple[bytes, str]]: The VCALENDAR bytes and a quoted ETag, or None if the guild is not loaded.
+        """
+        calendar = self.__calendars.get(guild_id)
+        if calendar is None:
+            return None
+        if calendar.document is None:
+            document = self.__render(calendar)
+            # The document counts against the budget too
+            self.__store(guild_id, calendar)
+            return document
+        return calendar.document
+
+    @staticmethod
+    def __render(calendar: GuildCalendar) -> Tuple[bytes, str]:
+        """Builds a calendar's document and ETag and keeps them on the calendar."""
+        document = b"".join(
+            [
+                f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:{PRODID}\r\n".encode(),
+                *calendar.vevents.values(),
+                b"END:VCALENDAR\r\n",
+            ]
+        )
+        etag = f'"{hashlib.sha1(document).hexdigest()[:20]}"'
+        calendar.document = (document, etag)
+        return calendar.document
@@ -0,0 +1,156 @@
+# modules/importer.py - streaming parsers for bulk imports
+
+import io
+import csv
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from modules.data import templates
+from modules.recurrence import series_end
+from modules.timestamp import format_time, get_timezone
+from modules import ics
+
+
+# * * * * * Streams * * * * * #
+def iter_lines(data: bytes) -> Iterator[str]:
+    """
+    Lazily decodes an uploaded file into lines.
+
+    Args:
+        data (bytes): The raw file contents. A UTF-8 byte order mark is skipped.
+
+    Returns:
+        Iterator[str]: The lines of the file, without line endings.
+    """
+    with io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig") as stream:
+        for line in stream:
+            yield line.rstrip("\r\n")
+
+
+def iter_csv(lines: Iterable[str]) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Parses CSV lines into rows keyed by lowercase header names.
+
+    Args:
+        lines (Iterable[str]): The lines of a CSV file, starting with the header.
+
+    Returns:
+        Iterator[Tuple[int, Dict[str, str]]]: (line number, row) pairs.
+    """
+    reader = csv.DictReader(lines)
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    for row in reader:
+        yield reader.line_num, {
+            key: (value or "").strip() for key, value in row.items() if key
+        }
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Groups an iterable into lists of at most the given size.
+
+    Args:
+        items (Iterable[Any]): The items to group.
+        size (int): The maximum size of each group.
+
+    Returns:
+        Iterator[List[Any]]: Consecutive groups of items.
+    """
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+# * * * * * Validation * * * * * #
+def validate_row(collection: str, row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Checks that a row only sets template fields, with values of the template's type.
+
+    Args:
+        collection (str): The template to validate against.
+        row (Dict[str, Any]): The field values to validate.
+
+    Returns:
+        Dict[str, Any]: The row, unchanged.
+
+    Raises:
+        ValueError: If a field is not in the template or has the wrong type.
+    """
+    template = templates[collection]
+    for key, value in row.items():
+        if key not in template or key.startswith("_"):
+            raise ValueError(f"Unknown {collection} field '{key}'.")
+
+        expected = template[key]
+        if isinstance(expected, list) and not isinstance(value, list):
+            raise ValueError(f"Field '{key}' must be a list.")
+        if isinstance(expected, str) and not isinstance(value, str):
+            raise ValueError(f"Field '{key}' must be text.")
+    return row
+
+
+# * * * * * Events * * * * * #
+def _event_from_csv(row: Dict[str, str]) -> Dict[str, Any]:
+    """Converts a CSV row with wizard-style date and time columns into event fields."""
+    for column in ("name", "date", "time"):
+        if not row.get(column):
+            raise ValueError(f"Missing required column '{column}'.")
+
+    return {
+        "name": row["name"],
+        "description": row.get("description", ""),
+        "datetime": format_time(f"{row['date']} {row['time']}"),
+        "timezone": get_timezone(row["time"]),
+        "location": row.get("location", ""),
+    }
+
+
+def _event_from_ics(vevent: Dict[str, ics.Property]) -> Dict[str, Any]:
+    """Converts a VEVENT into event fields, checking its RRULE against the rules events support."""
+    fields = ics.event_fields(vevent)
+    if fields.get("recurrence"):
+        fields["recurrence_end"] = series_end(
+            fields["datetime"], fields["timezone"], fields["recurrence"]
+        )
+    else:
+        fields.pop("exceptions", None)
+    return fields
+
+
+def iter_event_rows(
+    data: bytes, filename: str
+) -> Iterator[Tuple[int, Dict[str, Any], str]]:
+    """
+    Streams events out of an uploaded .csv or .ics file, validated against the event template.
+
+    CSV files need name, date (mm/dd/yy) and time (HH:MM AM/PM [TZ]) columns and
+    may have description and location columns. ICS files are read per VEVENT,
+    including its DTEND, RRULE and EXDATE; a VEVENT repeating by a rule that
+    events do not support is reported as an error rather than imported once.
+
+    Args:
+        data (bytes): The raw file contents.
+        filename (str): The name of the file, used to pick the parser.
+
+    Returns:
+        Iterator[Tuple[int, Dict[str, Any], str]]: (line number, event fields, error) triples;
+            the error is empty for valid rows and the fields are empty for invalid ones.
+
+    Raises:
+        ValueError: If the file type is not supported.
+    """
+    lines = iter_lines(data)
+    if filename.lower().endswith(".csv"):
+        rows = ((line, _event_from_csv, row) for line, row in iter_csv(lines))
+    elif filename.lower().endswith(".ics"):
+        rows = (
+            (line, _event_from_ics, event) for line, event in ics.iter_vevents(lines)
+        )
+    else:
+        raise ValueError("Unsupported file type. Expected a .csv or .ics file.")
+
+    for line, convert, row in rows:
+        try:
+            yield line, validate_row("event", convert(row)), ""
+        except (KeyError, ValueError) as e:
+            yield line, {}, str(e).strip("'\"")
@@ -0,0 +1,175 @@
+# modules/interval_tree.py - balanced interval tree for overlap queries
+
+import random
+from typing import Any, Iterator, List, Optional, Tuple
+
+# An interval and the value stored with it, as (start, end, value)
+Interval = Tuple[float, float, Any]
+
+
+class _Node:
+    __slots__ = ("key", "priority", "max_end", "left", "right")
+
+    def __init__(self, key: Interval):
+        self.key = key
+        self.priority = random.random()
+        self.max_end = key[1]
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+    def update(self):
+        """Recomputes the largest end in this subtree from the children."""
+        self.max_end = self.key[1]
+        if self.left and self.left.max_end > self.max_end:
+            self.max_end = self.left.max_end
+        if self.right and self.right.max_end > self.max_end:
+            self.max_end = self.right.max_end
+
+
+class IntervalTree:
+    def __init__(self):
+        """
+        Initializes an empty interval tree.
+
+        Intervals are half-open [start, end) and kept in a treap ordered by
+        (start, end, value), each node also tracking the largest end below it.
+        Inserts and removals take O(log n) expected time and an overlap query
+        takes O(log n + k) for k results. Values must be orderable so that equal
+        intervals with different values can coexist.
+        """
+        self.__root: Optional[_Node] = None
+        self.__size = 0
+
+    # * * * * * Modification * * * * * #
+    @staticmethod
+    def __split(
+        node: Optional[_Node], key: Interval
+    ) -> Tuple[Optional[_Node], Optional[_Node]]:
+        """Splits a subtree into keys below the given key and keys at or above it."""
+        if node is None:
+            return None, None
+        if node.key < key:
+            node.right, right = IntervalTree.__split(node.right, key)
+            node.update()
+            return node, right
+        left, node.left = IntervalTree.__split(node.left, key)
+        node.update()
+        return left, node
+
+    @staticmethod
+    def __merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+        """Joins two subtrees whose keys are all ordered left before right."""
+        if left is None or right is None:
+            return left or right
+        if left.priority > right.priority:
+            left.right = IntervalTree.__merge(left.right, right)
+            left.update()
+            return left
+        right.left = IntervalTree.__merge(left, right.left)
+        right.update()
+        return right
+
+    def insert(self, start: float, end: float, value: Any):
+        """
+        Adds an interval.
+
+        Args:
+            start (float): The inclusive start of the interval.
+            end (float): The exclusive end of the interval.
+            value (Any): The value stored with the interval.
+
+        Raises:
+            ValueError: If the interval ends before it starts.
+        """
+        if end < start:
+            raise ValueError(f"Interval end {end} is before its start {start}.")
+        key = (start, end, value)
+        left, right = self.__split(self.__root, key)
+        self.__root = self.__merge(self.__merge(left, _Node(key)), right)
+        self.__size += 1
+
+    def remove(self, start: float, end: float, value: Any) -> bool:
+        """
+        Removes an interval.
+
+        Args:
+            start (float): The start of the interval.
+            end (float): The end of the interval.
+            value (Any): The value stored with the interval.
+
+        Returns:
+            bool: True if the interval was in the tree.
+        """
+        key = (start, end, value)
+        left, rest = self.__split(self.__root, key)
+        node, right = self.__split_first(rest, key)
+        self.__root = self.__merge(left, right)
+        if node is None:
+            return False
+        self.__size -= 1
+        return True
+
+    @staticmethod
+    def __split_first(
+        node: Optional[_Node], key: Interval
+    ) -> Tuple[Optional[_Node], Optional[_Node]]:
+        """Detaches the smallest node of a subtree if it holds the key."""
+        if node is None:
+            return None, None
+        if node.left is not None:
+            found, node.left = IntervalTree.__split_first(node.left, key)
+            node.update()
+            return found, node
+        if node.key == key:
+            rest, node.right = node.right, None
+            return node, rest
+        return None, node
+
+    # * * * * * Queries * * * * * #
+    def overlapping(self, start: float, end: float) -> List[Interval]:
+        """
+        Finds the intervals overlapping [start, end).
+
+        Args:
+            start (float): The inclusive start of the query range.
+            end (float): The exclusive end of the query range.
+
+        Returns:
+            List[Interval]: The overlapping intervals, ordered by start.
+        """
+        results: List[Interval] = []
+        stack: List[Tuple[_Node, bool]] = [(self.__root, False)] if self.__root else []
+        while stack:
+            node, visited = stack.pop()
+            if visited:
+                node_start, node_end, _ = node.key
+                if node_start < end and node_end > start:
+                    results.append(node.key)
+                # Everything to the right starts at or after this node
+                if node.right and node_start < end and node.right.max_end > start:
+                    stack.append((node.right, False))
+                continue
+
+            # Subtrees whose intervals all end by the query start cannot overlap
+            if node.max_end <= start:
+                continue
+            stack.append((node, True))
+            if node.left:
+                stack.append((node.left, False))
+        return results
+
+    def __iter__(self) -> Iterator[Interval]:
+        """Iterates over all intervals, ordered by start."""
+        stack: List[_Node] = []
+        node = self.__root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.key
+            node = node.right
+
+    def __len__(self) -> int:
+        """Returns the number of intervals in the tree."""
+        return self.__size
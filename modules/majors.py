@@ -0,0 +1,284 @@
+# modules/majors.py - catalog of majors with prefix and fuzzy name matching
+
+import heapq
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set, Tuple
+
+MAJORS_FILE = "resources/majors.txt"
+
+# Common names for majors that their initials do not cover
+ALIASES = {
+    "aero": "Aeronautical Engineering",
+    "bio": "Biology",
+    "biomed": "Biomedical Engineering",
+    "bme": "Biomedical Engineering",
+    "chem": "Chemistry",
+    "chem e": "Chemical Engineering",
+    "civil": "Civil Engineering",
+    "cogsci": "Cognitive Science",
+    "comp sci": "Computer Science",
+    "cs": "Computer Science",
+    "csci": "Computer Science",
+    "econ": "Economics",
+    "gsas": "Games and Simulation Arts and Sciences",
+    "math": "Mathematics",
+    "mech e": "Mechanical Engineering",
+    "nuke": "Nuclear Engineering",
+    "phil": "Philosophy",
+    "psych": "Psychology",
+}
+
+# Words left out when building a major's initials, e.g. ITWS
+STOP_WORDS = {"and", "of", "the"}
+
+# The smallest trigram similarity accepted as a fuzzy match
+FUZZY_THRESHOLD = 0.3
+
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercases text and collapses punctuation and whitespace to single spaces.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    return NON_WORD_PATTERN.sub(" ", text.lower()).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Splits normalized text into its overlapping three-character pieces.
+
+    Args:
+        text (str): Normalized text.
+
+    Returns:
+        Set[str]: The trigrams, with the text padded so short words still have some.
+    """
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class MajorCatalog:
+    def __init__(self, names: List[str], aliases: Dict[str, str] = ALIASES):
+        """
+        Initializes a catalog and builds its indexes.
+
+        Names, aliases and initials map straight to a major. Every word-start
+        suffix of a name ("computer science", "science") is kept sorted so a
+        prefix is one binary search away, and a trigram index scores typos.
+
+        Args:
+            names (List[str]): The majors, in the order they are numbered.
+            aliases (Dict[str, str]): Extra names for majors; those for unknown majors are ignored.
+        """
+        self.names = list(names)
+        normalized = [normalize(name) for name in self.names]
+        indexes = {name: i for i, name in enumerate(self.names)}
+
+        # Initials shared by several majors, like CS, are left to aliases
+        initials: Dict[str, List[int]] = {}
+        for i, name in enumerate(normalized):
+            words = name.split()
+            key = "".join(word[0] for word in words if word not in STOP_WORDS)
+            initials.setdefault(key, []).append(i)
+        self.__exact: Dict[str, int] = {
+            key: majors[0] for key, majors in initials.items() if len(majors) == 1
+        }
+        for alias, name in aliases.items():
+            if name in indexes:
+                self.__exact[normalize(alias)] = indexes[name]
+        for i, name in enumerate(normalized):
+            self.__exact[name] = i
+
+        # (suffix, major index) pairs, sorted for prefix search
+        self.__suffixes = sorted(
+            (" ".join(words[start:]), i)
+            for i, words in enumerate(name.split() for name in normalized)
+            for start in range(len(words))
+        )
+        self.__lengths = [len(name.split()) for name in normalized]
+        self.__trigrams: Dict[str, Set[int]] = {}
+        self.__gram_counts: List[int] = []
+        for i, name in enumerate(normalized):
+            grams = trigrams(name)
+            self.__gram_counts.append(len(grams))
+            for gram in grams:
+                self.__trigrams.setdefault(gram, set()).add(i)
+        self.__listing: Optional[str] = None
+
+    @classmethod
+    def from_file(cls, path: str = MAJORS_FILE) -> "MajorCatalog":
+        """
+        Loads a catalog from a file with one major per line.
+
+        Args:
+            path (str): The file to read.
+
+        Returns:
+            MajorCatalog: The catalog.
+        """
+        with open(path, "r") as f:
+            return cls([line.strip() for line in f if line.strip()])
+
+    # * * * * * Matching * * * * * #
+    def __prefixed(self, text: str) -> Tuple[List[int], List[int]]:
+        """Returns the majors whose name starts with text, then those with a later word that does."""
+        whole: List[int] = []
+        later: List[int] = []
+        index = bisect_left(self.__suffixes, (text, -1))
+        while index < len(self.__suffixes) and self.__suffixes[index][0].startswith(
+            text
+        ):
+            suffix, i = self.__suffixes[index]
+            whole_name = len(suffix.split()) == self.__lengths[i]
+            (whole if whole_name else later).append(i)
+            index += 1
+        return whole, [i for i in dict.fromkeys(later) if i not in whole]
+
+    def __fuzzy(self, text: str, limit: int) -> List[int]:
+        """Returns the majors most similar to text, best first."""
+        grams = trigrams(text)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for i in self.__trigrams.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+
+        scored = []
+        for i, count in shared.items():
+            # Jaccard similarity of the two trigram sets
+            score = count / (len(grams) + self.__gram_counts[i] - count)
+            if score >= FUZZY_THRESHOLD:
+                scored.append((score, -i))
+        return [-i for _, i in heapq.nlargest(limit, scored)]
+
+    def lookup(self, choice: str) -> Optional[str]:
+        """
+        Resolves one typed major to a name from the catalog.
+
+        Accepts, in order of preference, a list number, a name, alias or set
+        of initials, a prefix of a name shared by no other major, or a close
+        misspelling of a name.
+
+        Args:
+            choice (str): What the user typed, e.g. "13", "cs", "comp" or "Compter Science".
+
+        Returns:
+            Optional[str]: The major, or None if nothing matches unambiguously.
+        """
+        choice = choice.strip()
+        if choice.isdigit():
+            index = int(choice) - 1
+            return self.names[index] if 0 <= index < len(self.names) else None
+
+        text = normalize(choice)
+        if not text:
+            return None
+        if text in self.__exact:
+            return self.names[self.__exact[text]]
+
+        # A unique name prefix wins over word prefixes, so "phys" is Physics
+        whole, later = self.__prefixed(text)
+        for candidates in (whole, later):
+            if len(candidates) == 1:
+                return self.names[candidates[0]]
+            if candidates:
+                return None
+
+        fuzzy = self.__fuzzy(text, 1)
+        return self.names[fuzzy[0]] if fuzzy else None
+
+    def parse(self, text: str) -> List[str]:
+        """
+        Resolves a comma-separated list of majors.
+
+        Args:
+            text (str): What the user typed, e.g. "13, math".
+
+        Returns:
+            List[str]: The majors, in the order given.
+
+        Raises:
+            ValueError: If a choice matches no major, or two choices are the same major.
+        """
+        majors = []
+        for choice in text.split(","):
+            major = self.lookup(choice)
+            if major is None:
+                raise ValueError(
+                    f"{choice.strip()} is not a valid major. Please enter a valid major."
+                )
+            if major in majors:
+                raise ValueError(
+                    f"{text} contains duplicate majors. Please enter a valid major."
+                )
+            majors.append(major)
+        return majors
+
+    def complete(self, text: str, limit: int = 25) -> List[str]:
+        """
+        Suggests majors for partially typed text, e.g. for autocomplete.
+
+        Args:
+            text (str): What the user has typed so far.
+            limit (int): The maximum number of suggestions.
+
+        Returns:
+            List[str]: Matching majors, best first.
+        """
+        if text.strip().isdigit():
+            major = self.lookup(text)
+            return [major] if major else []
+        text = normalize(text)
+        if not text:
+            return self.names[:limit]
+
+        ranked: List[int] = []
+        if text in self.__exact:
+            ranked.append(self.__exact[text])
+        whole, later = self.__prefixed(text)
+        ranked += whole + later
+        ranked += self.__fuzzy(text, limit)
+        return [self.names[i] for i in list(dict.fromkeys(ranked))[:limit]]
+
+    # * * * * * Rendering * * * * * #
+    @property
+    def listing(self) -> str:
+        """The numbered list of majors, one per line, rendered once."""
+        if self.__listing is None:
+            self.__listing = "\n".join(
+                f"{i + 1}. {name}" for i, name in enumerate(self.names)
+            )
+        return self.__listing
+
+    def __len__(self) -> int:
+        """Returns the number of majors."""
+        return len(self.names)
+
+
+# Catalogs loaded so far, by file, so every cog shares one
+_catalogs: Dict[str, MajorCatalog] = {}
+
+
+def get_catalog(path: str = MAJORS_FILE) -> MajorCatalog:
+    """
+    Returns the catalog for a majors file, loading it on first use.
+
+    Args:
+        path (str): The file to read.
+
+    Returns:
+        MajorCatalog: The shared catalog.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    if path not in _catalogs:
+        _catalogs[path] = MajorCatalog.from_file(path)
+    return _catalogs[path]
@@ -0,0 +1,153 @@
+# modules/membership.py - buffers guild joins and leaves for batched writes
+
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+# Seconds between batched membership writes
+FLUSH_INTERVAL = 0.5
+
+# Membership changes held at most; the oldest are dropped beyond this
+MAX_PENDING_CHANGES = 10_000
+
+# Longest wait between write attempts while writes keep failing
+MAX_FLUSH_BACKOFF = 60
+
+
+class MembershipBuffer:
+    def __init__(self, max_pending: int = MAX_PENDING_CHANGES):
+        """
+        Initializes an empty membership buffer.
+
+        Joins and leaves accumulate per guild until drained, and only each
+        member's latest change is kept, so a join storm becomes one write per
+        guild and a member who joins and leaves between flushes is written once.
+        The buffer never holds more than max_pending changes: while writes are
+        failing, the oldest changes are dropped, and reconciliation restores
+        them on the next startup.
+
+        Args:
+            max_pending (int): The number of buffered changes at which the buffer is full.
+        """
+        self.max_pending = max_pending
+        # The latest change for each (guild, member), oldest first: True for a join, False for a leave
+        self.__pending: "OrderedDict[Tuple[int, int], bool]" = OrderedDict()
+        self.dropped = 0
+        self.__failures = 0
+        self.retry_at = 0.0
+
+    def join(self, guild_id: int, user_id: int) -> bool:
+        """
+        Records that a member joined a guild.
+
+        Args:
+            guild_id (int): The ID of the guild.
+            user_id (int): The ID of the member.
+
+        Returns:
+            bool: True if the buffer is now full and should be flushed.
+        """
+        return self.__record(guild_id, user_id, True)
+
+    def leave(self, guild_id: int, user_id: int) -> bool:
+        """
+        Records that a member left a guild.
+
+        Args:
+            guild_id (int): The ID of the guild.
+            user_id (int): The ID of the member.
+
+        Returns:
+            bool: True if the buffer is now full and should be flushed.
+        """
+        return self.__record(guild_id, user_id, False)
+
+    def __record(self, guild_id: int, user_id: int, joined: bool) -> bool:
+        """Keeps a member's latest change, dropping the oldest change if over the bound."""
+        key = (guild_id, user_id)
+        self.__pending.pop(key, None)
+        self.__pending[key] = joined
+        if len(self.__pending) > self.max_pending:
+            self.__pending.popitem(last=False)
+            self.dropped += 1
+        return len(self.__pending) >= self.max_pending
+
+    def drain(self) -> Dict[int, Tuple[List[int], List[int]]]:
+        """
+        Removes and returns all changes not yet written.
+
+        Returns:
+            Dict[int, Tuple[List[int], List[int]]]: (members who joined, members who left), by guild ID.
+        """
+        pending, self.__pending = self.__pending, OrderedDict()
+        changes: Dict[int, Tuple[List[int], List[int]]] = {}
+        for (guild_id, user_id), joined in pending.items():
+            changes.setdefault(guild_id, ([], []))[0 if joined else 1].append(user_id)
+        for joined, left in changes.values():
+            joined.sort()
+            left.sort()
+        return changes
+
+    def requeue(self, guild_id: int, joined: Iterable[int], left: Iterable[int]) -> int:
+        """
+        Puts back changes whose write failed so the next drain retries them.
+        Changes recorded since the drain are newer and take precedence, and
+        requeued changes are the oldest, so they are dropped first if the
+        buffer is full.
+
+        Args:
+            guild_id (int): The ID of the guild.
+            joined (Iterable[int]): The members who joined.
+            left (Iterable[int]): The members who left.
+
+        Returns:
+            int: The number of changes dropped because the buffer is full.
+        """
+        dropped = 0
+        changes = [(user_id, True) for user_id in joined]
+        changes += [(user_id, False) for user_id in left]
+        for user_id, change in changes:
+            key = (guild_id, user_id)
+            if key in self.__pending:
+                continue
+            if len(self.__pending) >= self.max_pending:
+                dropped += 1
+                continue
+            self.__pending[key] = change
+            self.__pending.move_to_end(key, last=False)
+        self.dropped += dropped
+        return dropped
+
+    # * * * * * Backoff * * * * * #
+    def can_write(self, now: float) -> bool:
+        """
+        Checks whether a write should be attempted, i.e. changes are waiting
+        and no recent failure asks to wait.
+
+        Args:
+            now (float): The current time in seconds, e.g. time.monotonic().
+        """
+        return bool(self.__pending) and now >= self.retry_at
+
+    def write_failed(self, now: float) -> float:
+        """
+        Records a failed write, doubling the wait before the next attempt.
+
+        Args:
+            now (float): The current time in seconds, e.g. time.monotonic().
+
+        Returns:
+            float: Seconds to wait before writing again.
+        """
+        self.__failures += 1
+        delay = min(FLUSH_INTERVAL * 2**self.__failures, MAX_FLUSH_BACKOFF)
+        self.retry_at = now + delay
+        return delay
+
+    def write_succeeded(self):
+        """Records a successful write, so writes are attempted again immediately."""
+        self.__failures = 0
+        self.retry_at = 0.0
+
+    def __len__(self) -> int:
+        """Returns the number of changes waiting to be written."""
+        return len(self.__pending)
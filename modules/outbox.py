@@ -0,0 +1,306 @@
+# modules/outbox.py - durable queue of outgoing emails with retries
+
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+from modules.data import Data
+from modules.ratelimit import TokenBucket
+
+# Sending rate allowed by the email provider, and the burst it tolerates
+OUTBOX_RATE = 1.0
+OUTBOX_BURST = 20
+
+# Messages claimed and sent per database round trip
+BATCH_SIZE = 50
+
+# Attempts before a message is marked failed, and the backoff between them
+MAX_ATTEMPTS = 6
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 3600
+
+# Seconds between checks for retries that have come due
+POLL_INTERVAL = 10
+
+# A claim older than this is assumed abandoned by a process that died mid-batch
+CLAIM_TIMEOUT = 600
+
+# Identical emails queued within this many seconds of each other are repeats
+DEDUP_WINDOW = 3600
+
+# Seconds sent and failed messages are kept before the database deletes them
+RETENTION = 7 * 86400
+
+# Recent delivery latencies kept for metrics
+LATENCY_SAMPLES = 1000
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+logger = logging.getLogger("discord.outbox")
+
+
+def idempotency_key(recipient: str, subject: str, message: str) -> str:
+    """
+    Derives a key identifying an email by its content.
+
+    Args:
+        recipient (str): The recipient's email address.
+        subject (str): The subject of the email.
+        message (str): The message of the email.
+
+    Returns:
+        str: A hex digest; the same email always gets the same key.
+    """
+    content = "\0".join((recipient.lower(), subject, message))
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Picks how long to wait before retrying a message.
+
+    The delay doubles with each failed attempt up to RETRY_MAX_DELAY, and is
+    jittered so messages that failed together do not all retry together.
+
+    Args:
+        attempts (int): The number of attempts made so far.
+
+    Returns:
+        float: Seconds to wait.
+    """
+    delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _percentile(ordered, fraction: float) -> Optional[float]:
+    """Returns the value at a fraction of the way through sorted samples."""
+    if not ordered:
+        return None
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class Outbox:
+    def __init__(
+        self,
+        db,
+        email,
+        next_id: Callable[[], int],
+        rate: float = OUTBOX_RATE,
+        burst: float = OUTBOX_BURST,
+        batch_size: int = BATCH_SIZE,
+        max_attempts: int = MAX_ATTEMPTS,
+    ):
+        """
+        Initializes an outbox.
+
+        Emails are written to the outbox collection before anything is sent,
+        so a burst or an outage delays them rather than losing them. Batches
+        are claimed atomically, but the rate limit is kept in memory, so only
+        one process should drain an outbox; others may still enqueue to it.
+
+        Args:
+            db (Database): Where the outbox collection lives.
+            email (EmailService): Sends the messages.
+            next_id (Callable[[], int]): Generates message IDs.
+            rate (float): Messages sent per second at most.
+            burst (float): Messages that may be sent at once after a quiet spell.
+            batch_size (int): Messages claimed per batch.
+            max_attempts (int): Attempts before a message is given up on.
+        """
+        self.__db = db
+        self.__email = email
+        self.__next_id = next_id
+        self.__bucket = TokenBucket(rate, burst)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.__latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.__counts = {SENT: 0, FAILED: 0, "retried": 0, "duplicates": 0}
+        self.__wakeup: Optional[asyncio.Event] = None
+        self.__task: Optional[asyncio.Task] = None
+        self.__running = False
+
+    # * * * * * Queueing * * * * * #
+    async def enqueue(
+        self,
+        recipient: str,
+        subject: str,
+        message: str,
+        key: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> bool:
+        """
+        Durably queues an email.
+
+        Args:
+            recipient (str): The recipient's email address.
+            subject (str): The subject of the email.
+            message (str): The message of the email.
+            key (Optional[str]): Identifies the email so repeats are dropped. Defaults to a hash of its content.
+            now (Optional[float]): The current Unix epoch. Defaults to time.time().
+
+        Returns:
+            bool: True if the email was queued, False if an email with the same key
+                was queued less than DEDUP_WINDOW seconds ago.
+        """
+        now = time.time() if now is None else now
+        key = key or idempotency_key(recipient, subject, message)
+        id = self.__next_id()
+        template = Data.from_template("outbox", id)
+        data = Data.from_dict(
+            {
+                **template.to_dict(),
+                "key": key,
+                "recipient": recipient,
+                "subject": subject,
+                "message": message,
+                "queued_at": now,
+                "next_attempt_at": now,
+            }
+        )
+        inserted = await self.__db.insert_if_absent("outbox", {"key": key}, data)
+        # A copy queued before the window gives up its key, e.g. a weekly reminder;
+        # if several processes race for it, the unique key still admits one
+        if not inserted and await self.__db.set_fields_if(
+            "outbox",
+            {"key": key, "queued_at": {"$lte": now - DEDUP_WINDOW}},
+            {"key": f"{key}:{id}"},
+        ):
+            inserted = await self.__db.insert_if_absent("outbox", {"key": key}, data)
+        if not inserted:
+            self.__counts["duplicates"] += 1
+        elif self.__wakeup is not None:
+            self.__wakeup.set()
+        return inserted
+
+    async def drain(self, now: Optional[float] = None) -> int:
+        """
+        Claims and sends one batch of due messages, then records the outcomes.
+
+        Args:
+            now (Optional[float]): The current Unix epoch. Defaults to time.time().
+
+        Returns:
+            int: The number of messages claimed.
+        """
+        clock = time.time if now is None else (lambda: now)
+        now = clock()
+        claimed = await self.__db.claim_many(
+            "outbox",
+            {
+                "is_deleted": False,
+                "$or": [
+                    {"status": PENDING, "next_attempt_at": {"$lte": now}},
+                    {"status": SENDING, "claimed_at": {"$lt": now - CLAIM_TIMEOUT}},
+                ],
+            },
+            {"status": SENDING, "claim": self.__next_id(), "claimed_at": now},
+            self.batch_size,
+            sort_field="next_attempt_at",
+        )
+        if not claimed:
+            return 0
+
+        futures = []
+        for message in claimed:
+            await self.__bucket.acquire()
+            futures.append(
+                self.__email.send(
+                    message.get_value("recipient"),
+                    message.get_value("subject"),
+                    message.get_value("message"),
+                )
+            )
+        results = await asyncio.gather(*futures)
+
+        # Sending may have waited on the rate limit, so measure from when it ended
+        finished = clock()
+        expires_at = datetime.fromtimestamp(finished + RETENTION, timezone.utc)
+        updates: Dict[int, Dict] = {}
+        for message, sent in zip(claimed, results):
+            attempts = message.get_value("attempts") + 1
+            fields = {"attempts": attempts, "claim": None}
+            if sent:
+                fields.update(status=SENT, sent_at=finished, expires_at=expires_at)
+                self.__latencies.append(finished - message.get_value("queued_at"))
+                self.__counts[SENT] += 1
+            elif attempts >= self.max_attempts:
+                fields.update(status=FAILED, expires_at=expires_at)
+                self.__counts[FAILED] += 1
+                logger.error(
+                    f"Giving up on email {message.get_value('id')} after {attempts} attempts"
+                )
+            else:
+                fields.update(
+                    status=PENDING, next_attempt_at=finished + retry_delay(attempts)
+                )
+                self.__counts["retried"] += 1
+            updates[message.get_value("id")] = fields
+        await self.__db.set_fields_bulk("outbox", updates)
+        return len(claimed)
+
+    # * * * * * Lifecycle * * * * * #
+    async def start(self):
+        """
+        Starts draining in the background, promptly after each enqueue and
+        every POLL_INTERVAL seconds for retries.
+        """
+        if self.__task is not None:
+            return
+        self.__wakeup = asyncio.Event()
+        self.__running = True
+        self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self):
+        """
+        Stops draining once the batch in progress is recorded.
+        """
+        if self.__task is None:
+            return
+        self.__running = False
+        self.__wakeup.set()
+        await self.__task
+        self.__task = None
+
+    async def __run(self):
+        """Drains until stopped, sleeping while nothing is due."""
+        while self.__running:
+            self.__wakeup.clear()
+            try:
+                # A full batch suggests more are waiting
+                while self.__running and await self.drain() == self.batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"Error draining outbox: {e}")
+            try:
+                await asyncio.wait_for(self.__wakeup.wait(), POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    # * * * * * Metrics * * * * * #
+    async def metrics(self) -> Dict[str, Optional[float]]:
+        """
+        Reports the outbox's depth and this process's delivery statistics.
+
+        Returns:
+            Dict[str, Optional[float]]: queue_depth (messages not yet sent or failed),
+            sent, failed, retried and duplicates (counts since startup), and
+            latency_p50 and latency_p95 (seconds from enqueue to delivery over recent messages).
+        """
+        depth = await self.__db.count_data(
+            "outbox", {"status": {"$in": [PENDING, SENDING]}}
+        )
+        latencies = sorted(self.__latencies)
+        return {
+            "queue_depth": depth,
+            **self.__counts,
+            "latency_p50": _percentile(latencies, 0.5),
+            "latency_p95": _percentile(latencies, 0.95),
+        }
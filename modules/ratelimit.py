@@ -0,0 +1,93 @@
+# modules/ratelimit.py - token bucket rate limiting
+
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, now: Optional[float] = None):
+        """
+        Initializes a full bucket.
+
+        Tokens refill continuously at rate per second up to capacity, so bursts
+        of up to capacity pass at once and longer runs are held to rate.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): The most tokens the bucket holds.
+            now (Optional[float]): The current time in seconds. Defaults to time.monotonic().
+
+        Raises:
+            ValueError: If the rate or capacity is not positive.
+        """
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("Token bucket rate and capacity must be positive.")
+        self.rate = rate
+        self.capacity = capacity
+        self.__tokens = capacity
+        self.__updated = time.monotonic() if now is None else now
+
+    def __refill(self, now: Optional[float]) -> float:
+        """Adds the tokens earned since the last update and returns the current time."""
+        now = time.monotonic() if now is None else now
+        if now > self.__updated:
+            self.__tokens = min(
+                self.capacity, self.__tokens + (now - self.__updated) * self.rate
+            )
+            self.__updated = now
+        return now
+
+    def try_take(self, tokens: float = 1, now: Optional[float] = None) -> bool:
+        """
+        Takes tokens if they are available right now.
+
+        Args:
+            tokens (float): The number of tokens to take.
+            now (Optional[float]): The current time in seconds. Defaults to time.monotonic().
+
+        Returns:
+            bool: True if the tokens were taken.
+        """
+        self.__refill(now)
+        if self.__tokens < tokens:
+            return False
+        self.__tokens -= tokens
+        return True
+
+    def reserve(self, tokens: float = 1, now: Optional[float] = None) -> float:
+        """
+        Takes tokens now, going into debt if needed, and says how long to wait
+        before using them. Later reservations queue behind earlier ones.
+
+        Args:
+            tokens (float): The number of tokens to take.
+            now (Optional[float]): The current time in seconds. Defaults to time.monotonic().
+
+        Returns:
+            float: Seconds to wait before acting, 0 if the tokens were available.
+        """
+        self.__refill(now)
+        self.__tokens -= tokens
+        return max(0.0, -self.__tokens / self.rate)
+
+    async def acquire(self, tokens: float = 1):
+        """
+        Waits until tokens are available and takes them.
+
+        Args:
+            tokens (float): The number of tokens to take.
+        """
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def available(self, now: Optional[float] = None) -> float:
+        """
+        Returns the tokens that could be taken right now.
+
+        Args:
+            now (Optional[float]): The current time in seconds. Defaults to time.monotonic().
+        """
+        self.__refill(now)
+        return max(0.0, self.__tokens)
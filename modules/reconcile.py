@@ -0,0 +1,229 @@
+# modules/reconcile.py - brings stored guild member lists in line with the real ones
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from modules.importer import chunked
+
+# Members diffed and written per step; the event loop is yielded between steps
+RECONCILE_CHUNK_SIZE = 1000
+
+# Guilds reconciled at once; the rest wait their turn
+MAX_CONCURRENT_GUILDS = 2
+
+logger = logging.getLogger("discord.reconcile")
+
+
+def diff_members(
+    stored: Iterable[int], current: Iterable[int]
+) -> Tuple[List[int], List[int]]:
+    """
+    Works out how a stored member list differs from the real one.
+
+    Args:
+        stored (Iterable[int]): The member IDs in the database.
+        current (Iterable[int]): The member IDs actually in the guild.
+
+    Returns:
+        Tuple[List[int], List[int]]: (members to add, members to remove), sorted.
+    """
+    stored, current = set(stored), set(current)
+    return sorted(current - stored), sorted(stored - current)
+
+
+class ReconcileProgress:
+    __slots__ = (
+        "guild_id",
+        "total",
+        "scanned",
+        "added",
+        "removed",
+        "started_at",
+        "finished_at",
+        "error",
+    )
+
+    def __init__(self, guild_id: int, total: int):
+        """
+        Initializes the progress of one guild's reconciliation.
+
+        Args:
+            guild_id (int): The ID of the guild.
+            total (int): The number of members to scan.
+        """
+        self.guild_id = guild_id
+        self.total = total
+        self.scanned = 0
+        self.added = 0
+        self.removed = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the reconciliation has finished, successfully or not."""
+        return self.finished_at is not None
+
+    def __str__(self) -> str:
+        if self.error:
+            return f"failed: {self.error}"
+        if self.started_at is None:
+            return f"waiting ({self.total} members)"
+        state = "done" if self.done else f"{self.scanned}/{self.total} scanned"
+        elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return f"{state}, +{self.added} -{self.removed} in {elapsed:.1f} s"
+
+
+class Reconciler:
+    def __init__(
+        self,
+        db,
+        chunk_size: int = RECONCILE_CHUNK_SIZE,
+        concurrency: int = MAX_CONCURRENT_GUILDS,
+        lock: Optional[asyncio.Lock] = None,
+    ):
+        """
+        Initializes a reconciler.
+
+        Each guild's real member IDs are read in chunks into a set, diffed
+        against the stored list with set operations, and only the difference
+        is written, in chunked bulk updates. The event loop is yielded between
+        chunks and only a few guilds run at once, so commands keep being handled.
+
+        Membership writes made elsewhere must hold lock and leave guilds being
+        reconciled to later writes, so they cannot land between a guild's
+        snapshot and its diff and be undone by it. The lock is only taken to
+        mark a guild as being reconciled, once any write in progress is done.
+
+        Args:
+            db (Database): Where guild and user documents are stored.
+            chunk_size (int): Members diffed and written per step.
+            concurrency (int): Guilds reconciled at once.
+            lock (Optional[asyncio.Lock]): Guards the guild member lists. Defaults to a lock of its own.
+        """
+        self.__db = db
+        self.chunk_size = chunk_size
+        self.__semaphore = asyncio.Semaphore(concurrency)
+        self.__lock = lock or asyncio.Lock()
+        self.__reconciling: Set[int] = set()
+        self.__tasks: Dict[int, asyncio.Task] = {}
+        self.progress: Dict[int, ReconcileProgress] = {}
+
+    def reconciling(self, guild_id: int) -> bool:
+        """
+        Checks whether a guild's member list is being reconciled. Its
+        membership changes should stay buffered until it is done, since they
+        are newer than the snapshot being applied.
+
+        Args:
+            guild_id (int): The ID of the guild.
+
+        Returns:
+            bool: True if the guild has been snapshotted and is not written yet.
+        """
+        return guild_id in self.__reconciling
+
+    def start(
+        self,
+        guild_id: int,
+        member_ids: Callable[[], Iterable[int]],
+        total: int,
+        on_progress: Optional[Callable[[ReconcileProgress], Awaitable[None]]] = None,
+        prepare: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> asyncio.Task:
+        """
+        Reconciles a guild in the background, unless it is already being reconciled.
+
+        Args:
+            guild_id (int): The ID of the guild.
+            member_ids (Callable[[], Iterable[int]]): Returns the guild's real member IDs, read lazily.
+                Called only once the guild's turn comes, so the snapshot is current.
+            total (int): The number of members, for progress reports.
+            on_progress (Optional[Callable[[ReconcileProgress], Awaitable[None]]]): Called after each chunk.
+            prepare (Optional[Callable[[], Awaitable[None]]]): Called when the guild's turn comes,
+                e.g. to fetch the member list.
+
+        Returns:
+            asyncio.Task: The reconciliation, resolving to its progress.
+        """
+        task = self.__tasks.get(guild_id)
+        if task is None or task.done():
+            progress = self.progress[guild_id] = ReconcileProgress(guild_id, total)
+            task = self.__tasks[guild_id] = asyncio.create_task(
+                self.reconcile(progress, member_ids, on_progress, prepare)
+            )
+        return task
+
+    async def reconcile(
+        self,
+        progress: ReconcileProgress,
+        member_ids: Callable[[], Iterable[int]],
+        on_progress: Optional[Callable[[ReconcileProgress], Awaitable[None]]] = None,
+        prepare: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> ReconcileProgress:
+        """
+        Reconciles one guild, waiting for a free slot first.
+
+        Args:
+            progress (ReconcileProgress): Updated as the reconciliation runs.
+            member_ids (Callable[[], Iterable[int]]): Returns the guild's real member IDs, read lazily.
+            on_progress (Optional[Callable[[ReconcileProgress], Awaitable[None]]]): Called after each chunk.
+            prepare (Optional[Callable[[], Awaitable[None]]]): Called before the members are read.
+
+        Returns:
+            ReconcileProgress: The finished progress.
+        """
+        guild_id = progress.guild_id
+        async with self.__semaphore:
+            progress.started_at = time.monotonic()
+            try:
+                if prepare is not None:
+                    await prepare()
+                # Waits out any membership write in progress; later ones skip the guild
+                async with self.__lock:
+                    self.__reconciling.add(guild_id)
+                await self.__apply(progress, member_ids(), on_progress)
+            except Exception as e:
+                progress.error = str(e)
+                logger.error(f"Failed to reconcile members of guild {guild_id}: {e}")
+            finally:
+                self.__reconciling.discard(guild_id)
+                progress.finished_at = time.monotonic()
+
+        logger.info(f"Reconciled members of guild {guild_id}: {progress}")
+        if on_progress is not None:
+            await on_progress(progress)
+        return progress
+
+    async def __apply(
+        self,
+        progress: ReconcileProgress,
+        member_ids: Iterable[int],
+        on_progress: Optional[Callable[[ReconcileProgress], Awaitable[None]]],
+    ):
+        """Snapshots a guild's members, diffs them against the stored list and writes the difference."""
+        guild_id = progress.guild_id
+        current: Set[int] = set()
+        for chunk in chunked(member_ids, self.chunk_size):
+            current.update(chunk)
+            progress.scanned += len(chunk)
+            if on_progress is not None:
+                await on_progress(progress)
+            await asyncio.sleep(0)
+
+        # Guild documents have no deleted flag, so match them either way
+        guilds = await self.__db.search_data("guild", {"id": guild_id}, deleted=None)
+        stored: Set[int] = set(guilds[0].get_list("user")) if guilds else set()
+
+        added, removed = diff_members(stored, current)
+        for chunk in chunked(added, self.chunk_size):
+            await self.__db.update_sets_bulk("guild", "user", {guild_id: (chunk, [])})
+            await self.__db.add_to_set_many("user", chunk, "guild", guild_id)
+            progress.added += len(chunk)
+        for chunk in chunked(removed, self.chunk_size):
+            await self.__db.update_sets_bulk("guild", "user", {guild_id: ([], chunk)})
+            await self.__db.pull_from_many("user", chunk, "guild", guild_id)
+            progress.removed += len(chunk)
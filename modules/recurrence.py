@@ -0,0 +1,319 @@
+# modules/recurrence.py - expands recurring events lazily from a rule
+
+import calendar
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from modules.data import Data
+from modules.ics import ICS_UTC_FORMAT
+from modules.timestamp import DATETIME_FORMAT, format_epochs, to_epochs
+
+# Days between occurrences for the fixed-period frequencies; MONTHLY steps by calendar month
+FREQUENCY_DAYS = {"DAILY": 1, "WEEKLY": 7, "MONTHLY": None}
+
+# Criteria matching one-off and recurring events; documents from before
+# recurrence existed have no recurrence field and count as one-off
+ONE_OFF = {"$in": ["", None]}
+RECURRING = {"$gt": ""}
+
+# Words accepted by !events repeat, mapped to rules
+RULE_SHORTCUTS = {
+    "daily": "FREQ=DAILY",
+    "weekly": "FREQ=WEEKLY",
+    "biweekly": "FREQ=WEEKLY;INTERVAL=2",
+    "monthly": "FREQ=MONTHLY",
+}
+
+
+# * * * * * Rules * * * * * #
+def parse_rule(rule: str) -> Dict[str, Any]:
+    """
+    Parses the subset of an RFC 5545 RRULE that events support.
+
+    Args:
+        rule (str): A rule such as FREQ=WEEKLY;INTERVAL=2;COUNT=10. UNTIL is a UTC date-time.
+
+    Returns:
+        Dict[str, Any]: The FREQ, INTERVAL, COUNT (int or None) and UNTIL (Unix epoch or None).
+
+    Raises:
+        ValueError: If the rule has an unsupported part or value.
+    """
+    parts = {"FREQ": None, "INTERVAL": 1, "COUNT": None, "UNTIL": None}
+    for part in rule.upper().split(";"):
+        key, _, value = part.partition("=")
+        if key not in parts or not value:
+            raise ValueError(f"Unsupported recurrence rule part '{part}'.")
+        if key == "FREQ":
+            if value not in FREQUENCY_DAYS:
+                raise ValueError(f"Unsupported recurrence frequency '{value}'.")
+            parts[key] = value
+        elif key == "UNTIL":
+            until = datetime.strptime(value, ICS_UTC_FORMAT)
+            parts[key] = calendar.timegm(until.timetuple())
+        else:
+            parts[key] = int(value)
+            if parts[key] < 1:
+                raise ValueError(f"Recurrence {key} must be positive.")
+
+    if parts["FREQ"] is None:
+        raise ValueError("Recurrence rule is missing FREQ.")
+    return parts
+
+
+def describe_rule(rule: str) -> str:
+    """
+    Describes a rule in words, e.g. "Every 2 weeks, 10 times".
+
+    Args:
+        rule (str): A rule accepted by parse_rule.
+
+    Returns:
+        str: A short human-readable description.
+    """
+    parts = parse_rule(rule)
+    unit = {"DAILY": "day", "WEEKLY": "week", "MONTHLY": "month"}[parts["FREQ"]]
+    interval = parts["INTERVAL"]
+    text = f"Every {unit}" if interval == 1 else f"Every {interval} {unit}s"
+    if parts["COUNT"]:
+        text += f", {parts['COUNT']} times"
+    elif parts["UNTIL"] is not None:
+        until = datetime.fromtimestamp(parts["UNTIL"], timezone.utc)
+        text += f", until {until.strftime('%m/%d/%y')}"
+    return text
+
+
+# * * * * * Expansion * * * * * #
+def _local_occurrence(
+    first: datetime, parts: Dict[str, Any], n: int
+) -> Optional[datetime]:
+    """Returns the wall-clock time of the nth step, or None if that month lacks the day."""
+    days = FREQUENCY_DAYS[parts["FREQ"]]
+    if days:
+        return first + timedelta(days=days * parts["INTERVAL"] * n)
+
+    month_index = first.month - 1 + parts["INTERVAL"] * n
+    year, month = first.year + month_index // 12, month_index % 12 + 1
+    if first.day > calendar.monthrange(year, month)[1]:
+        return None
+    return first.replace(year=year, month=month)
+
+
+def _step_epoch(
+    first: datetime, parts: Dict[str, Any], tz_name: str, n: int
+) -> Optional[float]:
+    """Returns the Unix epoch of the nth step, or None if the step is skipped."""
+    local = _local_occurrence(first, parts, n)
+    if local is None:
+        return None
+    return to_epochs([local.strftime(DATETIME_FORMAT)], tz_name)[0]
+
+
+def _period(parts: Dict[str, Any]) -> Optional[int]:
+    """Returns the nominal seconds between steps, or None for monthly rules."""
+    days = FREQUENCY_DAYS[parts["FREQ"]]
+    return days * parts["INTERVAL"] * 86400 if days else None
+
+
+def _ascending(
+    first: datetime,
+    first_epoch: float,
+    parts: Dict[str, Any],
+    tz_name: str,
+    lower: Optional[float],
+) -> Iterator[float]:
+    """Yields occurrences in order, bounded only by the rule's COUNT and UNTIL."""
+    n = 0
+    period = _period(parts)
+    if period and lower is not None:
+        # Daylight saving moves an occurrence by at most an hour, so start a step early
+        n = max(int((lower - first_epoch) // period) - 1, 0)
+
+    # Every fixed-period step is an occurrence, so skipping ahead skips that many
+    produced = n
+    while not parts["COUNT"] or produced < parts["COUNT"]:
+        epoch = _step_epoch(first, parts, tz_name, n)
+        n += 1
+        if epoch is None:
+            continue
+        if parts["UNTIL"] is not None and epoch > parts["UNTIL"]:
+            return
+        produced += 1
+        yield epoch
+
+
+def _descending(
+    first: datetime,
+    first_epoch: float,
+    parts: Dict[str, Any],
+    tz_name: str,
+    upper: Optional[float],
+) -> Iterator[float]:
+    """Yields occurrences before the upper bound, latest first."""
+    period = _period(parts)
+    if not period or upper is None:
+        if upper is None and not parts["COUNT"] and parts["UNTIL"] is None:
+            raise ValueError(
+                "An endless series needs an upper bound to expand backwards."
+            )
+        # Monthly series are short, so walk them forward to the bound and reverse
+        window = []
+        for epoch in _ascending(first, first_epoch, parts, tz_name, None):
+            if upper is not None and epoch >= upper:
+                break
+            window.append(epoch)
+        yield from reversed(window)
+        return
+
+    high = int((upper - first_epoch) // period) + 1
+    if parts["COUNT"]:
+        high = min(high, parts["COUNT"] - 1)
+    if parts["UNTIL"] is not None:
+        high = min(high, int((parts["UNTIL"] - first_epoch) // period) + 1)
+    for n in range(high, -1, -1):
+        epoch = _step_epoch(first, parts, tz_name, n)
+        if epoch >= upper or (parts["UNTIL"] is not None and epoch > parts["UNTIL"]):
+            continue
+        yield epoch
+
+
+def occurrences(
+    datetime_str: str,
+    tz_name: str,
+    rule: str,
+    lower: Optional[float] = None,
+    upper: Optional[float] = None,
+    exceptions: Iterable[float] = (),
+    descending: bool = False,
+) -> Iterator[float]:
+    """
+    Lazily yields the start times of a recurring event that fall within a window.
+
+    Occurrences keep the wall-clock time of the first one, so a 6 PM meeting stays
+    at 6 PM across daylight saving changes. Only the steps inside the window are
+    computed for daily and weekly rules, however long the series has run.
+
+    Args:
+        datetime_str (str): The first occurrence, in the format MM/DD/YY HH:MM {AM/PM}.
+        tz_name (str): The IANA timezone of the event.
+        rule (str): A rule accepted by parse_rule.
+        lower (Optional[float]): Inclusive lower bound as a Unix epoch. If None, starts at the first occurrence.
+        upper (Optional[float]): Exclusive upper bound as a Unix epoch. If None, the window is open above.
+        exceptions (Iterable[float]): Start times of cancelled occurrences.
+        descending (bool): Yield from the upper bound down instead of the lower bound up.
+
+    Returns:
+        Iterator[float]: Occurrence start times as Unix epochs, in the requested order.
+
+    Raises:
+        ValueError: If the rule is invalid, or a descending window has no end for an endless series.
+    """
+    parts = parse_rule(rule)
+    first = datetime.strptime(datetime_str, DATETIME_FORMAT)
+    first_epoch = to_epochs([datetime_str], tz_name)[0]
+    skipped = set(exceptions)
+
+    if descending:
+        for epoch in _descending(first, first_epoch, parts, tz_name, upper):
+            if lower is not None and epoch < lower:
+                return
+            if epoch not in skipped:
+                yield epoch
+        return
+
+    for epoch in _ascending(first, first_epoch, parts, tz_name, lower):
+        if upper is not None and epoch >= upper:
+            return
+        if (lower is None or epoch >= lower) and epoch not in skipped:
+            yield epoch
+
+
+def series_end(datetime_str: str, tz_name: str, rule: str) -> Optional[float]:
+    """
+    Finds the start time of the last occurrence of a series.
+
+    Args:
+        datetime_str (str): The first occurrence, in the format MM/DD/YY HH:MM {AM/PM}.
+        tz_name (str): The IANA timezone of the event.
+        rule (str): A rule accepted by parse_rule.
+
+    Returns:
+        Optional[float]: The Unix epoch of the last occurrence, or None if the series never ends.
+    """
+    parts = parse_rule(rule)
+    if not parts["COUNT"] and parts["UNTIL"] is None:
+        return None
+    last = None
+    for last in occurrences(datetime_str, tz_name, rule):
+        pass
+    return last
+
+
+# * * * * * Events * * * * * #
+def series_criteria(criteria: Dict[str, Any], lower: Optional[float]) -> Dict[str, Any]:
+    """
+    Extends event search criteria to match recurring events still running at a time.
+
+    Args:
+        criteria (Dict[str, Any]): The criteria to extend, e.g. {"guild_id": ...}.
+        lower (Optional[float]): The Unix epoch the series must not have ended before.
+
+    Returns:
+        Dict[str, Any]: New criteria for Database.search_range over start_time.
+    """
+    criteria = {**criteria, "recurrence": RECURRING}
+    if lower is not None:
+        criteria["$or"] = [
+            {"recurrence_end": None},
+            {"recurrence_end": {"$gte": lower}},
+        ]
+    return criteria
+
+
+def expand_event(
+    event: Data,
+    lower: Optional[float] = None,
+    upper: Optional[float] = None,
+    descending: bool = False,
+) -> Iterator[Data]:
+    """
+    Lazily yields an event's occurrences within a window as standalone events.
+
+    One-off events yield themselves if they start within the window. Each
+    occurrence of a recurring event is a copy of the series with its own
+    start_time and datetime; its ID stays the series ID.
+
+    Args:
+        event (Data): The event or series.
+        lower (Optional[float]): Inclusive lower bound as a Unix epoch.
+        upper (Optional[float]): Exclusive upper bound as a Unix epoch.
+        descending (bool): Yield the latest occurrence first.
+
+    Returns:
+        Iterator[Data]: The occurrences, ordered by start time.
+    """
+    rule = event.to_dict().get("recurrence")
+    if not rule:
+        start_time = event.get_value("start_time")
+        if (lower is None or start_time >= lower) and (
+            upper is None or start_time < upper
+        ):
+            yield event
+        return
+
+    tz_name = event.get_value("timezone")
+    for start_time in occurrences(
+        event.get_value("datetime"),
+        tz_name,
+        rule,
+        lower,
+        upper,
+        event.get_list("exceptions"),
+        descending,
+    ):
+        occurrence = Data.from_dict(event.to_dict())
+        occurrence.set_value("start_time", start_time)
+        occurrence.set_value(
+            "datetime", format_epochs([start_time], tz_name, DATETIME_FORMAT)[0]
+        )
+        yield occurrence
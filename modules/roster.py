@@ -0,0 +1,243 @@
+# modules/roster.py - streaming member roster import and export
+
+import io
+import csv
+import gzip
+import json
+from typing import Any, AsyncIterable, BinaryIO, Dict, Iterator, Optional, Tuple
+
+from modules.data import Data
+from modules.importer import iter_csv, validate_row
+from modules.majors import MajorCatalog, get_catalog
+
+# Columns of a roster, in export order
+ROSTER_FIELDS = [
+    "id",
+    "first_name",
+    "last_name",
+    "school_email",
+    "student_id",
+    "major",
+    "graduation_year",
+]
+
+# Columns exported but ignored on import: a school email only changes
+# through its owner's verification
+UNIMPORTED_FIELDS = {"school_email"}
+
+# Separates several majors in one CSV cell
+MAJOR_SEPARATOR = ";"
+
+# Rows read from one roster at most, however well it compresses
+MAX_ROSTER_ROWS = 50_000
+
+# Supported formats by file extension
+ROSTER_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+# * * * * * Files * * * * * #
+def roster_format(filename: str) -> Tuple[str, bool]:
+    """
+    Works out a roster file's format from its name.
+
+    Args:
+        filename (str): The name of the file, e.g. roster.csv or roster.ndjson.gz.
+
+    Returns:
+        Tuple[str, bool]: The format ("csv" or "ndjson") and whether the file is gzipped.
+
+    Raises:
+        ValueError: If the file type is not supported.
+    """
+    name = filename.lower()
+    compressed = name.endswith(".gz")
+    if compressed:
+        name = name[:-3]
+    for extension, format in ROSTER_FORMATS.items():
+        if name.endswith(extension):
+            return format, compressed
+    raise ValueError(
+        "Unsupported file type. Expected a .csv or .ndjson file, optionally gzipped."
+    )
+
+
+def iter_roster_lines(data: bytes, compressed: bool) -> Iterator[str]:
+    """
+    Lazily decodes an uploaded roster into lines, decompressing as it goes.
+
+    Args:
+        data (bytes): The raw file contents.
+        compressed (bool): Whether the contents are gzipped.
+
+    Returns:
+        Iterator[str]: The lines of the file, without line endings.
+    """
+    stream = io.BytesIO(data)
+    if compressed:
+        stream = gzip.GzipFile(fileobj=stream, mode="rb")
+    with io.TextIOWrapper(stream, encoding="utf-8-sig") as text:
+        for line in text:
+            yield line.rstrip("\r\n")
+
+
+def _iter_ndjson(lines: Iterator[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Parses one JSON object per line, skipping blank lines."""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            row = e
+        yield number, row
+
+
+# * * * * * Import * * * * * #
+def user_from_row(
+    row: Dict[str, Any], catalog: Optional[MajorCatalog] = None
+) -> Tuple[int, Dict[str, Any]]:
+    """
+    Converts a roster row into a user ID and the profile fields it sets.
+
+    Empty values are left out, so importing a partial roster does not clear
+    fields members have already filled in, and UNIMPORTED_FIELDS are skipped.
+
+    Args:
+        row (Dict[str, Any]): The row, keyed by column name.
+        catalog (Optional[MajorCatalog]): Resolves major names. Defaults to the shared catalog.
+
+    Returns:
+        Tuple[int, Dict[str, Any]]: The Discord user ID and the fields to set.
+
+    Raises:
+        ValueError: If the row is missing its ID or has an invalid value.
+    """
+    if not isinstance(row, dict):
+        raise ValueError("Expected a JSON object.")
+
+    id = str(row.get("id") or "").strip()
+    if not id.isdigit():
+        raise ValueError("Missing or invalid Discord user 'id'.")
+
+    fields = {}
+    for key, value in row.items():
+        if key not in ROSTER_FIELDS:
+            raise ValueError(f"Unknown roster column '{key}'.")
+        if key == "id" or key in UNIMPORTED_FIELDS or value in ("", None, []):
+            continue
+        if key == "major":
+            majors = value.split(MAJOR_SEPARATOR) if isinstance(value, str) else value
+            if not isinstance(majors, list):
+                raise ValueError("Field 'major' must be a list.")
+            fields[key] = [
+                _resolve_major(str(major), catalog or get_catalog())
+                for major in majors
+                if str(major).strip()
+            ]
+        elif key == "graduation_year":
+            year = str(value).strip()
+            if not (year.isdigit() and len(year) == 4):
+                raise ValueError(f"{year} is not a valid graduation year.")
+            fields[key] = year
+        else:
+            fields[key] = value.strip() if isinstance(value, str) else value
+    return int(id), validate_row("user", fields)
+
+
+def _resolve_major(text: str, catalog: MajorCatalog) -> str:
+    """Resolves a major name or abbreviation, raising ValueError if unknown."""
+    major = catalog.lookup(text)
+    if major is None:
+        raise ValueError(f"{text.strip()} is not a major.")
+    return major
+
+
+def iter_roster_rows(
+    data: bytes, filename: str, catalog: Optional[MajorCatalog] = None
+) -> Iterator[Tuple[int, Tuple[int, Dict[str, Any]], str]]:
+    """
+    Streams users out of an uploaded .csv or .ndjson roster, validated against the user template.
+
+    CSV files need an id column holding Discord user IDs, and may have any of the
+    other ROSTER_FIELDS columns; several majors in one cell are separated by
+    MAJOR_SEPARATOR. NDJSON files have one object per line with the same keys.
+    Either may be gzipped.
+
+    Args:
+        data (bytes): The raw file contents.
+        filename (str): The name of the file, used to pick the parser.
+        catalog (Optional[MajorCatalog]): Resolves major names. Defaults to the shared catalog.
+
+    Returns:
+        Iterator[Tuple[int, Tuple[int, Dict[str, Any]], str]]: (line number, (user ID, fields), error)
+            triples; the error is empty for valid rows and the user is None for invalid ones.
+
+    Raises:
+        ValueError: If the file type is not supported or the roster has more than MAX_ROSTER_ROWS rows.
+    """
+    format, compressed = roster_format(filename)
+    lines = iter_roster_lines(data, compressed)
+    rows = iter_csv(lines) if format == "csv" else _iter_ndjson(lines)
+
+    for count, (line, row) in enumerate(rows, start=1):
+        if count > MAX_ROSTER_ROWS:
+            raise ValueError(f"Rosters are limited to {MAX_ROSTER_ROWS} rows.")
+        try:
+            if isinstance(row, json.JSONDecodeError):
+                raise ValueError(f"Invalid JSON: {row.msg}.")
+            yield line, user_from_row(row, catalog), ""
+        except (KeyError, ValueError) as e:
+            yield line, None, str(e).strip("'\"")
+
+
+# * * * * * Export * * * * * #
+def roster_row(user: Data) -> Dict[str, Any]:
+    """
+    Picks the roster columns out of a user.
+
+    Args:
+        user (Data): The user.
+
+    Returns:
+        Dict[str, Any]: The user's values for ROSTER_FIELDS.
+    """
+    return {
+        field: user.get_list(field) if field == "major" else user.get_value(field)
+        for field in ROSTER_FIELDS
+    }
+
+
+async def write_roster(
+    users: AsyncIterable[Data], format: str, stream: BinaryIO
+) -> int:
+    """
+    Writes users to a gzipped roster as they arrive, so memory use does not grow with the roster.
+
+    Args:
+        users (AsyncIterable[Data]): The users to write, e.g. a database cursor.
+        format (str): "csv" or "ndjson".
+        stream (BinaryIO): Receives the compressed roster. It is left open.
+
+    Returns:
+        int: The number of users written.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if format not in ROSTER_FORMATS.values():
+        raise ValueError(f"Unsupported roster format '{format}'.")
+
+    count = 0
+    compressed = gzip.GzipFile(fileobj=stream, mode="wb", mtime=0)
+    with io.TextIOWrapper(compressed, encoding="utf-8", newline="") as text:
+        writer = csv.DictWriter(text, ROSTER_FIELDS)
+        if format == "csv":
+            writer.writeheader()
+        async for user in users:
+            row = roster_row(user)
+            if format == "csv":
+                writer.writerow({**row, "major": MAJOR_SEPARATOR.join(row["major"])})
+            else:
+                text.write(json.dumps(row) + "\n")
+            count += 1
+    return count
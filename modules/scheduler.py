@@ -0,0 +1,164 @@
+# modules/scheduler.py - min-heap of upcoming reminder times
+
+import heapq
+import itertools
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class ReminderQueue:
+    def __init__(self):
+        """
+        Initializes an empty reminder queue.
+
+        Entries are kept in a min-heap ordered by fire time. Rescheduling or
+        removing an event bumps its version instead of searching the heap, and
+        stale heap entries are discarded lazily when they reach the top.
+        Occurrences of a repeating event are keyed by (event_id, start_time),
+        and each event's keys are indexed so it can be cancelled as a whole.
+        """
+        self.__heap: List[Tuple[float, int, int, int, int]] = []
+        self.__versions: Dict[int, int] = {}
+        # The keys in __versions, by the event they belong to
+        self.__keys: Dict[int, Set] = {}
+        self.__pending: Dict[int, int] = {}
+        self.__counter = itertools.count()
+
+    # * * * * * Scheduling * * * * * #
+    def schedule(
+        self,
+        event_id: int,
+        start_time: float,
+        leads: Iterable[int],
+        now: float,
+        sent: Iterable[int] = (),
+    ) -> Optional[float]:
+        """
+        Schedules reminders for an event, replacing any previously scheduled ones.
+
+        Reminders whose fire time has already passed are collapsed into the most
+        recent one, and nothing is scheduled once the event has started. Once a
+        reminder has been sent, earlier ones are never sent, so reminders do not
+        repeat or go out of order after a restart.
+
+        Args:
+            event_id (int): The ID of the event.
+            start_time (float): The event start as a Unix epoch.
+            leads (Iterable[int]): Seconds before the start at which to remind.
+            now (float): The current Unix epoch.
+            sent (Iterable[int]): The leads of reminders already sent.
+
+        Returns:
+            Optional[float]: The earliest fire time scheduled, or None if nothing was scheduled.
+        """
+        version = self.__versions.get(event_id, 0) + 1
+        if start_time <= now:
+            self.remove(event_id)
+            return None
+
+        last_sent = min(sent, default=None)
+        if last_sent is not None:
+            leads = [lead for lead in leads if lead < last_sent]
+
+        pending = [
+            (start_time - lead, lead) for lead in leads if start_time - lead > now
+        ]
+        overdue = [
+            (start_time - lead, lead) for lead in leads if start_time - lead <= now
+        ]
+        if overdue:
+            # Only the reminder closest to the start is still worth sending
+            pending.append((now, min(lead for _, lead in overdue)))
+
+        if not pending:
+            self.remove(event_id)
+            return None
+
+        self.__versions[event_id] = version
+        self.__keys.setdefault(self.__event_of(event_id), set()).add(event_id)
+        for fire_at, lead in pending:
+            heapq.heappush(
+                self.__heap, (fire_at, next(self.__counter), event_id, lead, version)
+            )
+        self.__pending[event_id] = self.__pending.get(event_id, 0) + len(pending)
+        return min(fire_at for fire_at, _ in pending)
+
+    def remove(self, event_id: int):
+        """
+        Cancels all reminders for an event.
+
+        Args:
+            event_id (int): The ID of the event.
+        """
+        if event_id in self.__versions:
+            self.__versions[event_id] += 1
+
+    def remove_event(self, event_id: int):
+        """
+        Cancels all reminders for an event and for each occurrence of it.
+
+        Args:
+            event_id (int): The ID of the event.
+        """
+        for key in self.__keys.get(event_id, ()):
+            self.remove(key)
+
+    @staticmethod
+    def __event_of(key) -> int:
+        """Returns the event a key belongs to, unwrapping (event_id, start_time) keys."""
+        return key[0] if isinstance(key, tuple) else key
+
+    # * * * * * Retrieval * * * * * #
+    def __pop(self) -> Tuple[float, int, int, int, int]:
+        """Pops the top heap entry, forgetting events that have no entries left."""
+        entry = heapq.heappop(self.__heap)
+        event_id = entry[2]
+        self.__pending[event_id] -= 1
+        if not self.__pending[event_id]:
+            del self.__pending[event_id]
+            del self.__versions[event_id]
+            event = self.__event_of(event_id)
+            self.__keys[event].discard(event_id)
+            if not self.__keys[event]:
+                del self.__keys[event]
+        return entry
+
+    def __is_live(self, entry: Tuple[float, int, int, int, int]) -> bool:
+        """Checks whether a heap entry belongs to the current schedule of its event."""
+        return self.__versions.get(entry[2]) == entry[4]
+
+    def __discard_stale(self):
+        """Pops cancelled or superseded entries off the top of the heap."""
+        while self.__heap and not self.__is_live(self.__heap[0]):
+            self.__pop()
+
+    def next_due(self) -> Optional[float]:
+        """
+        Returns the fire time of the earliest live reminder.
+
+        Returns:
+            Optional[float]: The Unix epoch of the next reminder, or None if the queue is empty.
+        """
+        self.__discard_stale()
+        return self.__heap[0][0] if self.__heap else None
+
+    def pop_due(self, now: float) -> List[Tuple[int, int]]:
+        """
+        Removes and returns every live reminder due at or before the given time.
+
+        Args:
+            now (float): The current Unix epoch.
+
+        Returns:
+            List[Tuple[int, int]]: (event_id, lead) pairs in fire order.
+        """
+        due = []
+        self.__discard_stale()
+        while self.__heap and self.__heap[0][0] <= now:
+            _, _, event_id, lead, _ = self.__pop()
+            due.append((event_id, lead))
+            self.__discard_stale()
+        return due
+
+    def __len__(self) -> int:
+        """Returns the number of heap entries, including stale ones not yet discarded."""
+        return len(self.__heap)
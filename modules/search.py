@@ -0,0 +1,141 @@
+# modules/search.py - in-memory inverted index for keyword search
+
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, List, Tuple
+
+# How much a match in each field counts towards a result's score
+FIELD_WEIGHTS = {"name": 3.0, "location": 2.0, "description": 1.0}
+
+# A term matching only the start of a word counts this fraction of a whole-word match
+PREFIX_WEIGHT = 0.5
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lowercase word tokens.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        List[str]: The tokens, in order of appearance.
+    """
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+class SearchIndex:
+    def __init__(self, weights: Dict[str, float] = FIELD_WEIGHTS):
+        """
+        Initializes an empty index.
+
+        Each token maps to the documents containing it and the weighted number of
+        times it appears in them. Tokens are also kept sorted so that all tokens
+        starting with a prefix are one binary search away.
+
+        Args:
+            weights (Dict[str, float]): The fields to index and their weights.
+        """
+        self.weights = weights
+        self.__postings: Dict[str, Dict[Hashable, float]] = {}
+        self.__documents: Dict[Hashable, Dict[str, float]] = {}
+        self.__tokens: List[str] = []
+
+    # * * * * * Indexing * * * * * #
+    def add(self, doc_id: Hashable, fields: Dict[str, str]):
+        """
+        Indexes a document, replacing any previous version of it.
+
+        Args:
+            doc_id (Hashable): The ID of the document.
+            fields (Dict[str, str]): The document's text by field name; unweighted fields are ignored.
+        """
+        self.remove(doc_id)
+
+        counts: Dict[str, float] = {}
+        for field, weight in self.weights.items():
+            for token in tokenize(fields.get(field, "")):
+                counts[token] = counts.get(token, 0.0) + weight
+        if not counts:
+            return
+
+        self.__documents[doc_id] = counts
+        for token, count in counts.items():
+            postings = self.__postings.get(token)
+            if postings is None:
+                postings = self.__postings[token] = {}
+                insort(self.__tokens, token)
+            postings[doc_id] = count
+
+    def remove(self, doc_id: Hashable):
+        """
+        Removes a document from the index.
+
+        Args:
+            doc_id (Hashable): The ID of the document.
+        """
+        for token in self.__documents.pop(doc_id, {}):
+            postings = self.__postings[token]
+            del postings[doc_id]
+            if not postings:
+                del self.__postings[token]
+                del self.__tokens[bisect_left(self.__tokens, token)]
+
+    # * * * * * Searching * * * * * #
+    def __matches(self, term: str) -> Dict[Hashable, float]:
+        """Scores the documents matching one term, as a whole word or a word prefix."""
+        total = len(self.__documents)
+        scores: Dict[Hashable, float] = {}
+        index = bisect_left(self.__tokens, term)
+        while index < len(self.__tokens) and self.__tokens[index].startswith(term):
+            token = self.__tokens[index]
+            postings = self.__postings[token]
+            # Rarer tokens say more about a document
+            weight = math.log(1 + total / len(postings))
+            if token != term:
+                weight *= PREFIX_WEIGHT
+            for doc_id, count in postings.items():
+                score = count * weight
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+            index += 1
+        return scores
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[Hashable, float]]:
+        """
+        Finds the documents matching every term of a query, best first.
+
+        Each term matches whole words and, at a lower weight, words it is a prefix of.
+
+        Args:
+            query (str): The search terms.
+            limit (int): The maximum number of results.
+
+        Returns:
+            List[Tuple[Hashable, float]]: (document ID, score) pairs ordered by descending score.
+        """
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+
+        # Intersect starting from the term with the fewest matches
+        matches = sorted((self.__matches(term) for term in terms), key=len)
+        scores = dict(matches[0])
+        for term_scores in matches[1:]:
+            scores = {
+                doc_id: score + term_scores[doc_id]
+                for doc_id, score in scores.items()
+                if doc_id in term_scores
+            }
+            if not scores:
+                return []
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def __len__(self) -> int:
+        """Returns the number of indexed documents."""
+        return len(self.__documents)
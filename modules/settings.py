@@ -0,0 +1,208 @@
+# modules/settings.py - in-memory snapshot of each guild's settings
+
+import asyncio
+import re
+from typing import Any, Dict, Optional
+
+from discord.ext import commands
+
+# Settings a guild can change, each holding a channel or role ID
+SETTINGS = {
+    "announcements_channel": "channel",
+    "moderator_channel": "channel",
+    "eboard_role": "role",
+}
+
+# Accepts a raw ID or a channel or role mention
+MENTION_PATTERN = re.compile(r"^(?:<#|<@&)?(\d{15,20})>?$")
+
+# Values that clear a setting
+UNSET_WORDS = {"none", "null", "unset"}
+
+
+def parse_setting(name: str, value: Any) -> Optional[int]:
+    """
+    Converts a setting value into the ID it holds.
+
+    Args:
+        name (str): The name of the setting.
+        value (Any): A raw ID, a channel or role mention, or an unset word.
+
+    Returns:
+        Optional[int]: The ID, or None if the setting is being cleared.
+
+    Raises:
+        KeyError: If the setting does not exist.
+        ValueError: If the value is not an ID or mention.
+    """
+    kind = SETTINGS[name]
+    if value is None or isinstance(value, int):
+        return value
+    text = str(value).strip()
+    if text.lower() in UNSET_WORDS:
+        return None
+    match = MENTION_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"'{text}' is not a {kind} mention or ID.")
+    return int(match.group(1))
+
+
+class GuildSettings:
+    __slots__ = tuple(SETTINGS)
+
+    def __init__(self, **values: Optional[int]):
+        """
+        Initializes a guild's settings; missing ones are unset.
+
+        Args:
+            **values (Optional[int]): The ID each setting holds, by name.
+        """
+        for name in SETTINGS:
+            setattr(self, name, values.get(name))
+
+    @classmethod
+    def from_document(cls, document: Optional[Dict[str, Any]]) -> "GuildSettings":
+        """
+        Reads the settings out of a guild document, ignoring values that are not IDs.
+
+        Args:
+            document (Optional[Dict[str, Any]]): The guild document, or None if there is none.
+
+        Returns:
+            GuildSettings: The guild's settings.
+        """
+        values = {}
+        for name in SETTINGS:
+            try:
+                values[name] = parse_setting(name, (document or {}).get(name))
+            except ValueError:
+                values[name] = None
+        return cls(**values)
+
+    def to_dict(self) -> Dict[str, Optional[int]]:
+        """Returns the settings by name."""
+        return {name: getattr(self, name) for name in SETTINGS}
+
+
+class SettingsService:
+    def __init__(self, db):
+        """
+        Initializes the settings service.
+
+        Each guild's settings are read from the database once, on first use,
+        and then served from memory. Changes made through set are written
+        through to the database and the snapshot together.
+
+        Args:
+            db (Database): Where guild documents are stored.
+        """
+        self.__db = db
+        self.__settings: Dict[int, GuildSettings] = {}
+        self.__loads: Dict[int, asyncio.Task] = {}
+
+    async def get(self, guild_id: int) -> GuildSettings:
+        """
+        Returns a guild's settings, loading them if they are not in memory yet.
+
+        Concurrent first calls for a guild share one database read.
+
+        Args:
+            guild_id (int): The ID of the guild.
+
+        Returns:
+            GuildSettings: The guild's settings.
+        """
+        settings = self.__settings.get(guild_id)
+        if settings is not None:
+            return settings
+
+        load = self.__loads.get(guild_id)
+        if load is None:
+            load = self.__loads[guild_id] = asyncio.create_task(self.__load(guild_id))
+        # A cancelled caller must not cancel the load other callers are waiting on
+        return await asyncio.shield(load)
+
+    async def __load(self, guild_id: int) -> GuildSettings:
+        """Reads a guild's settings from the database into memory."""
+        try:
+            # Guild documents have no deleted flag, so match them either way
+            guilds = await self.__db.search_data(
+                "guild", {"id": guild_id}, deleted=None
+            )
+            settings = GuildSettings.from_document(
+                guilds[0].to_dict() if guilds else None
+            )
+            self.__settings[guild_id] = settings
+            return settings
+        finally:
+            self.__loads.pop(guild_id, None)
+
+    def cached(self, guild_id: int) -> Optional[GuildSettings]:
+        """
+        Returns a guild's settings if they are in memory, without loading them.
+
+        Args:
+            guild_id (int): The ID of the guild.
+
+        Returns:
+            Optional[GuildSettings]: The guild's settings, or None if they have not been loaded.
+        """
+        return self.__settings.get(guild_id)
+
+    async def set(self, guild_id: int, name: str, value: Any) -> Optional[int]:
+        """
+        Changes one of a guild's settings in the database and in memory.
+
+        Args:
+            guild_id (int): The ID of the guild.
+            name (str): The name of the setting.
+            value (Any): A raw ID, a channel or role mention, or an unset word.
+
+        Returns:
+            Optional[int]: The setting's previous value.
+
+        Raises:
+            KeyError: If the setting does not exist.
+            ValueError: If the value is not an ID or mention.
+        """
+        new_value = parse_setting(name, value)
+        previous = getattr(await self.get(guild_id), name)
+        await self.__db.merge_bulk("guild", {guild_id: {name: new_value}})
+
+        # Build on the latest snapshot, which another set may have replaced meanwhile
+        settings = self.__settings.get(guild_id) or GuildSettings()
+        self.__settings[guild_id] = GuildSettings(
+            **{**settings.to_dict(), name: new_value}
+        )
+        return previous
+
+    def forget(self, guild_id: int):
+        """
+        Drops a guild's settings from memory, e.g. when the bot leaves it.
+
+        Args:
+            guild_id (int): The ID of the guild.
+        """
+        self.__settings.pop(guild_id, None)
+
+
+# * * * * * Checks * * * * * #
+def eboard_only():
+    """
+    Command check that passes only for members holding the server's eboard role.
+    The role is read from the bot's in-memory settings snapshot, not the database.
+    """
+
+    async def predicate(ctx):
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage()
+        eboard_role = (await ctx.bot.settings.get(ctx.guild.id)).eboard_role
+        if eboard_role is None:
+            raise commands.CheckFailure(
+                "The eboard role is not configured! Use '!settings set eboard_role' to fix this."
+            )
+        if not any(role.id == eboard_role for role in ctx.author.roles):
+            raise commands.MissingRole(eboard_role)
+        return True
+
+    return commands.check(predicate)
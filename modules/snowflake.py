@@ -0,0 +1,66 @@
+# modules/snowflake.py - generates unique, time-ordered 64-bit IDs
+
+import time
+
+# Custom epoch (01/01/24 00:00 UTC) in milliseconds, leaving room for ~69 years of IDs
+SNOWFLAKE_EPOCH_MS = 1704067200000
+
+SEQUENCE_BITS = 12
+WORKER_BITS = 10
+TIMESTAMP_SHIFT = SEQUENCE_BITS + WORKER_BITS
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+
+
+class Snowflake:
+    def __init__(self, worker_id: int = 0):
+        """
+        Initializes an ID generator for one worker.
+
+        IDs are laid out as 41 bits of milliseconds since SNOWFLAKE_EPOCH_MS,
+        12 bits of per-millisecond sequence and 10 bits of worker ID. The
+        worker ID sits in the low bits so that stepping to the next ID is a
+        single addition: once a millisecond's sequence is exhausted it carries
+        into the timestamp, borrowing the next millisecond instead of waiting.
+
+        Args:
+            worker_id (int): The ID of this process, unique among all running bot processes.
+
+        Raises:
+            ValueError: If the worker ID does not fit in WORKER_BITS.
+        """
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(
+                f"Worker ID {worker_id} out of range. Expected 0 to {MAX_WORKER_ID}."
+            )
+        self.worker_id = worker_id
+        self.__last = worker_id
+
+    def next_id(self) -> int:
+        """
+        Returns the next ID for this worker.
+
+        The generator takes no lock; it never yields, so calls from coroutines on
+        the event loop cannot interleave. Threads should each use their own worker ID.
+
+        Returns:
+            int: An ID greater than every ID this generator returned before.
+        """
+        floor = (
+            (time.time_ns() // 1_000_000 - SNOWFLAKE_EPOCH_MS) << TIMESTAMP_SHIFT
+        ) | self.worker_id
+        step = self.__last + (1 << WORKER_BITS)
+        self.__last = step if step > floor else floor
+        return self.__last
+
+    @staticmethod
+    def timestamp_of(id: int) -> float:
+        """
+        Extracts the creation time embedded in an ID.
+
+        Args:
+            id (int): An ID produced by a Snowflake generator.
+
+        Returns:
+            float: The Unix epoch, in seconds, at which the ID was generated.
+        """
+        return ((id >> TIMESTAMP_SHIFT) + SNOWFLAKE_EPOCH_MS) / 1000
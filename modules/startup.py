@@ -0,0 +1,239 @@
+# modules/startup.py - optional profiling of the bot's cold start
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Set to a report path, or to 1 for DEFAULT_REPORT_PATH, to profile startup
+STARTUP_PROFILE_VARIABLE = "STARTUP_PROFILE"
+DEFAULT_REPORT_PATH = "startup_profile.json"
+
+# Values of STARTUP_PROFILE that leave profiling off
+DISABLED_WORDS = {"", "0", "false", "no", "off"}
+
+
+class ImportTimer:
+    def __init__(self):
+        """
+        Initializes an import timer.
+
+        While started, it sits first on sys.meta_path and times the execution
+        of every module imported for the first time, both including and
+        excluding the modules that one imports in turn.
+        """
+        # Module name -> (seconds including its own imports, seconds excluding them)
+        self.times: Dict[str, Tuple[float, float]] = {}
+        self.running = False
+        # Per thread, the time spent in nested imports of each module being executed
+        self.__local = threading.local()
+
+    def start(self):
+        """Starts timing imports."""
+        if not self.running:
+            self.running = True
+            sys.meta_path.insert(0, self)
+
+    def stop(self):
+        """Stops timing imports. Modules already timed are kept."""
+        self.running = False
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name: str, path=None, target=None):
+        """Finds a module with the remaining finders and times its loader."""
+        for finder in sys.meta_path:
+            find_spec = getattr(finder, "find_spec", None)
+            if finder is self or find_spec is None:
+                continue
+            spec = find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        # Built-in and frozen modules are loaded by the class itself and are near free
+        loader = spec.loader
+        if loader is not None and not isinstance(loader, type):
+            exec_module = getattr(loader, "exec_module", None)
+            if exec_module is not None:
+                loader.exec_module = self.__timed(name, exec_module)
+        return spec
+
+    def __timed(self, name: str, exec_module):
+        """Wraps a loader's exec_module to record how long the module took to run."""
+
+        def timed_exec_module(module):
+            if not self.running:
+                return exec_module(module)
+            stack: List[float] = self.__local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self.times[name] = (elapsed, elapsed - nested)
+
+        return timed_exec_module
+
+
+class StartupProfile:
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initializes a startup profile. Profiling is off unless a report path is given.
+
+        Phases are timed from when the profile is created, and modules
+        imported after that are timed one by one. Nothing is recorded
+        while profiling is off.
+
+        Args:
+            path (Optional[str]): Where the JSON report is written. Defaults to None (profiling off).
+        """
+        self.path = path
+        self.started_at = time.perf_counter()
+        # Phase name -> [start, end] in seconds since started_at; end is None while running
+        self.phases: Dict[str, List[Optional[float]]] = {}
+        self.imports = ImportTimer()
+        if self.enabled:
+            self.imports.start()
+
+    @classmethod
+    def from_env(cls) -> "StartupProfile":
+        """
+        Creates a profile configured by the STARTUP_PROFILE environment variable.
+
+        Returns:
+            StartupProfile: The profile, which is off unless the variable is set.
+        """
+        value = os.getenv(STARTUP_PROFILE_VARIABLE, "").strip()
+        if value.lower() in DISABLED_WORDS:
+            return cls()
+        if value.lower() in ("1", "true", "yes", "on"):
+            return cls(DEFAULT_REPORT_PATH)
+        return cls(value)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether startup is being profiled."""
+        return self.path is not None
+
+    def __now(self) -> float:
+        """Returns the seconds since the profile was created."""
+        return time.perf_counter() - self.started_at
+
+    def begin(self, name: str):
+        """
+        Marks the start of a startup phase.
+
+        Args:
+            name (str): The name of the phase, e.g. imports.
+        """
+        if self.enabled:
+            self.phases[name] = [self.__now(), None]
+
+    def end(self, name: str):
+        """
+        Marks the end of a startup phase. Phases that never began are ignored.
+
+        Args:
+            name (str): The name of the phase.
+        """
+        phase = self.phases.get(name)
+        if phase is not None and phase[1] is None:
+            phase[1] = self.__now()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Times the startup phase run inside the with block.
+
+        Args:
+            name (str): The name of the phase.
+        """
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def report(self, extensions: Iterable[Any] = ()) -> Dict[str, Any]:
+        """
+        Collects the phase timeline and import times.
+
+        Args:
+            extensions (Iterable[ExtensionTiming]): How each cog loaded, if they have been loaded.
+
+        Returns:
+            Dict[str, Any]: The report. Times are in seconds, phases in start order and
+                modules and extensions slowest first.
+        """
+        phases = sorted(self.phases.items(), key=lambda item: item[1][0])
+        modules = sorted(
+            self.imports.times.items(), key=lambda item: item[1][1], reverse=True
+        )
+        extensions = sorted(
+            (extension.to_dict() for extension in extensions),
+            key=lambda extension: -(
+                (extension["import_seconds"] or 0) + (extension["setup_seconds"] or 0)
+            ),
+        )
+        return {
+            "total_seconds": round(self.__now(), 6),
+            "phases": [
+                {
+                    "name": name,
+                    "start": round(start, 6),
+                    "seconds": round(end - start, 6) if end is not None else None,
+                }
+                for name, (start, end) in phases
+            ],
+            "imports": [
+                {
+                    "module": module,
+                    "seconds": round(total, 6),
+                    "self_seconds": round(own, 6),
+                }
+                for module, (total, own) in modules
+            ],
+            "extensions": extensions,
+        }
+
+    def write(self, extensions: Iterable[Any] = ()) -> Optional[str]:
+        """
+        Stops timing imports and writes the report, if profiling is on.
+
+        Args:
+            extensions (Iterable[ExtensionTiming]): How each cog loaded, if they have been loaded.
+
+        Returns:
+            Optional[str]: The path of the report, or None if profiling is off.
+        """
+        if not self.enabled:
+            return None
+        self.imports.stop()
+        with open(self.path, "w") as file:
+            json.dump(self.report(extensions), file, indent=2)
+        return self.path
+
+    def summary(self) -> str:
+        """
+        Summarizes the phase timeline, one line per phase.
+
+        Returns:
+            str: The summary, or an empty string if profiling is off.
+        """
+        lines = []
+        for phase in self.report()["phases"]:
+            seconds = phase["seconds"]
+            duration = f"{seconds * 1000:.0f} ms" if seconds is not None else "running"
+            lines.append(
+                f"{phase['name']}: {duration} (at {phase['start'] * 1000:.0f} ms)"
+            )
+        return "\n".join(lines)
@@ -1,9 +1,39 @@
 import pytz
-from datetime import datetime, timedelta
-from functools import wraps
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from functools import wraps, lru_cache
+from typing import Dict, Iterable, List, Tuple
 
 DATETIME_FORMAT = "%m/%d/%y %I:%M %p"
 DATETIME_TZ_FORMAT = "%m/%d/%y %I:%M %p %Z"  # Format with timezone abbreviation
+DEFAULT_TIMEZONE = "America/New_York"
+
+EPOCH = datetime(1970, 1, 1)
+LOCALIZE_CACHE_SIZE = 4096
+
+# Abbreviations users type, resolved to the IANA zone that observes them so that
+# daylight saving is applied by date rather than by the abbreviation typed
+TIMEZONE_ABBREVIATIONS = {
+    "ET": "America/New_York",
+    "EST": "America/New_York",
+    "EDT": "America/New_York",
+    "CT": "America/Chicago",
+    "CST": "America/Chicago",
+    "CDT": "America/Chicago",
+    "MT": "America/Denver",
+    "MST": "America/Denver",
+    "MDT": "America/Denver",
+    "PT": "America/Los_Angeles",
+    "PST": "America/Los_Angeles",
+    "PDT": "America/Los_Angeles",
+    "AKT": "America/Anchorage",
+    "AKST": "America/Anchorage",
+    "AKDT": "America/Anchorage",
+    "HT": "Pacific/Honolulu",
+    "HST": "Pacific/Honolulu",
+    "UTC": "UTC",
+    "GMT": "UTC",
+}
 
 
 class Timestamp:
@@ -198,3 +228,264 @@ class Timestamp:
         """Returns a human-readable string showing the difference between two Timestamp objects."""
         delta = self.__est_datetime - other.__est_datetime
         return f"{delta.days} days, {delta.seconds // 3600} hours, {delta.seconds // 60 % 60} minutes"
+
+
+# * * * * * Batch Conversion * * * * * #
+@lru_cache(maxsize=None)
+def get_tz(tz_name: str) -> pytz.BaseTzInfo:
+    """
+    Returns the pytz timezone object for the given IANA name, cached per process.
+
+    Args:
+        tz_name (str): The IANA timezone name (e.g., America/New_York).
+
+    Returns:
+        pytz.BaseTzInfo: The timezone object.
+    """
+    return pytz.timezone(tz_name)
+
+
+@lru_cache(maxsize=None)
+def _transitions(tz_name: str) -> Tuple[List[float], List[Tuple[int, int, str]]]:
+    """
+    Builds the UTC offset transition table for a timezone.
+
+    Args:
+        tz_name (str): The IANA timezone name.
+
+    Returns:
+        Tuple[List[float], List[Tuple[int, int, str]]]: Sorted transition epochs and the
+            (utc offset seconds, dst seconds, abbreviation) in effect from each transition.
+    """
+    tz = get_tz(tz_name)
+    times = getattr(tz, "_utc_transition_times", None)
+    if not times:
+        # Static zones (UTC, EST, ...) have a single offset for all time
+        probe = datetime(2000, 1, 1)
+        offset = tz.utcoffset(probe) or timedelta(0)
+        return [float("-inf")], [(int(offset.total_seconds()), 0, tz.tzname(probe))]
+
+    epochs = [(time - EPOCH).total_seconds() for time in times]
+    info = [
+        (int(offset.total_seconds()), int(dst.total_seconds()), name)
+        for offset, dst, name in tz._transition_info
+    ]
+    return epochs, info
+
+
+def _offset_at(epochs: List[float], info: list, epoch: float) -> Tuple[int, int, str]:
+    """Returns the (offset, dst, abbreviation) entry in effect at a UTC epoch."""
+    return info[max(bisect_right(epochs, epoch) - 1, 0)]
+
+
+def _local_seconds(datetime_str: str, fmt: str) -> float:
+    """
+    Parses a wall-clock datetime string into seconds since the naive epoch.
+
+    MM/DD/YY HH:MM {AM/PM} strings are decoded by position, skipping strptime;
+    anything else falls back to strptime with the given format.
+    """
+    if fmt == DATETIME_FORMAT and len(datetime_str) == 17:
+        try:
+            month, day, year = datetime_str[0:2], datetime_str[3:5], datetime_str[6:8]
+            hour, minute, meridiem = (
+                datetime_str[9:11],
+                datetime_str[12:14],
+                datetime_str[15:],
+            )
+            if (
+                datetime_str[2] == datetime_str[5] == "/"
+                and datetime_str[8] == datetime_str[14] == " "
+                and datetime_str[11] == ":"
+                and (month + day + year + hour + minute).isdigit()
+                and meridiem in ("AM", "PM")
+                and 1 <= int(hour) <= 12
+                and 0 <= int(minute) <= 59
+            ):
+                # %y maps 00-68 to 2000-2068 and 69-99 to 1969-1999
+                year = int(year) + (2000 if int(year) < 69 else 1900)
+                days = (date(year, int(month), int(day)) - EPOCH.date()).days
+                hour = int(hour) % 12 + (12 if meridiem == "PM" else 0)
+                return days * 86400 + hour * 3600 + int(minute) * 60
+        except ValueError:
+            pass
+
+    return (datetime.strptime(datetime_str, fmt) - EPOCH).total_seconds()
+
+
+@lru_cache(maxsize=256)
+def _tz_format(fmt: str, abbreviation: str) -> str:
+    """Bakes a timezone abbreviation into a strftime format for naive datetimes."""
+    return fmt.replace("%Z", abbreviation.replace("%", "%%"))
+
+
+def to_epochs(
+    datetime_strs: Iterable[str],
+    tz_name: str = DEFAULT_TIMEZONE,
+    fmt: str = DATETIME_FORMAT,
+) -> List[float]:
+    """
+    Converts wall-clock datetime strings in a timezone to Unix epochs in one pass.
+
+    Ambiguous and non-existent local times resolve to standard time, matching
+    pytz's localize(is_dst=False).
+
+    Args:
+        datetime_strs (Iterable[str]): Datetime strings in the given format.
+        tz_name (str): The IANA timezone the strings are expressed in.
+        fmt (str): The strptime format of the strings. Defaults to MM/DD/YY HH:MM AM/PM.
+
+    Returns:
+        List[float]: The Unix epochs, in input order.
+
+    Raises:
+        ValueError: If a string does not match the format.
+    """
+    epochs, info = _transitions(tz_name)
+    parsed: Dict[str, float] = {}
+    results = []
+
+    for datetime_str in datetime_strs:
+        epoch = parsed.get(datetime_str)
+        if epoch is None:
+            local = _local_seconds(datetime_str, fmt)
+
+            # Offsets only change at transitions, so the candidates are the offsets
+            # in effect a day either side; prefer one that round-trips, then standard time
+            candidates = []
+            for probe in (local - 86400, local + 86400):
+                offset, dst, _ = _offset_at(epochs, info, probe)
+                utc = local - offset
+                invalid = _offset_at(epochs, info, utc)[0] != offset
+                candidates.append((invalid, dst != 0, utc))
+
+            epoch = min(candidates)[2]
+            parsed[datetime_str] = epoch
+        results.append(epoch)
+
+    return results
+
+
+def format_epochs(
+    epochs: Iterable[float],
+    tz_name: str = DEFAULT_TIMEZONE,
+    fmt: str = DATETIME_TZ_FORMAT,
+) -> List[str]:
+    """
+    Formats Unix epochs as wall-clock strings in a timezone in one pass.
+
+    Args:
+        epochs (Iterable[float]): The Unix epochs to format.
+        tz_name (str): The IANA timezone to render in.
+        fmt (str): The strftime format; %Z renders the zone abbreviation.
+
+    Returns:
+        List[str]: The formatted strings, in input order.
+    """
+    transition_epochs, info = _transitions(tz_name)
+    results = []
+    for epoch in epochs:
+        offset, _, abbreviation = _offset_at(transition_epochs, info, epoch)
+        local = EPOCH + timedelta(seconds=epoch + offset)
+        results.append(local.strftime(_tz_format(fmt, abbreviation)))
+
+    return results
+
+
+def convert_datetimes(
+    datetime_strs: Iterable[str],
+    from_tz: str = DEFAULT_TIMEZONE,
+    to_tz: str = DEFAULT_TIMEZONE,
+    fmt: str = DATETIME_TZ_FORMAT,
+) -> List[str]:
+    """
+    Re-renders wall-clock datetime strings from one timezone in another.
+
+    Args:
+        datetime_strs (Iterable[str]): Datetime strings in the format MM/DD/YY HH:MM {AM/PM}.
+        from_tz (str): The IANA timezone the strings are expressed in.
+        to_tz (str): The IANA timezone to render in.
+        fmt (str): The strftime format of the output.
+
+    Returns:
+        List[str]: The formatted strings, in input order.
+    """
+    return format_epochs(to_epochs(datetime_strs, from_tz), to_tz, fmt)
+
+
+# * * * * * Timezone Resolution * * * * * #
+def now() -> Timestamp:
+    """
+    Returns the current time in America/New_York as a Timestamp object.
+
+    Returns:
+        Timestamp: A Timestamp object representing the current time.
+    """
+    return Timestamp.now()
+
+
+def get_timezone(time_str: str) -> str:
+    """
+    Resolves the timezone abbreviation trailing a time string to an IANA zone.
+
+    Args:
+        time_str (str): A time such as "12:00 PM PDT"; the abbreviation is optional.
+
+    Returns:
+        str: The IANA timezone name, or America/New_York if no abbreviation is given.
+
+    Raises:
+        ValueError: If the abbreviation is not a known timezone.
+    """
+    parts = time_str.split()
+    if not parts or not parts[-1].isalpha() or parts[-1].upper() in ("AM", "PM"):
+        return DEFAULT_TIMEZONE
+
+    abbreviation = parts[-1].upper()
+    if abbreviation not in TIMEZONE_ABBREVIATIONS:
+        raise ValueError(f"Unknown timezone abbreviation: {parts[-1]}")
+    return TIMEZONE_ABBREVIATIONS[abbreviation]
+
+
+def format_time(datetime_str: str) -> str:
+    """
+    Normalizes a datetime string by dropping any trailing timezone abbreviation.
+
+    Args:
+        datetime_str (str): A datetime such as "12/31/24 12:00 PM PDT".
+
+    Returns:
+        str: The datetime in the format MM/DD/YY HH:MM {AM/PM}.
+
+    Raises:
+        ValueError: If the remaining string is not a valid datetime.
+    """
+    parts = datetime_str.split()
+    if len(parts) == 4:
+        parts = parts[:3]
+    normalized = " ".join(parts).upper()
+
+    if not Timestamp.is_valid_datetime(normalized):
+        raise ValueError(
+            f"Invalid datetime format: {datetime_str}. Expected format: MM/DD/YY HH:MM AM/PM"
+        )
+    return normalized
+
+
+@lru_cache(maxsize=LOCALIZE_CACHE_SIZE)
+def localize_datetime(datetime_str: str, tz_name: str = DEFAULT_TIMEZONE) -> str:
+    """
+    Renders a stored wall-clock datetime with its timezone abbreviation.
+
+    Results are memoized per (datetime, timezone), so re-rendering the same
+    events does no timezone work.
+
+    Args:
+        datetime_str (str): The datetime in the format MM/DD/YY HH:MM {AM/PM}.
+        tz_name (str): The IANA timezone the datetime is expressed in.
+
+    Returns:
+        str: The datetime in the format MM/DD/YY HH:MM {AM/PM} {TZ}.
+    """
+    tz_name = tz_name or DEFAULT_TIMEZONE
+    return format_epochs(to_epochs([datetime_str], tz_name), tz_name)[0]
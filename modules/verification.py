@@ -0,0 +1,211 @@
+# modules/verification.py - emailed one-time codes proving address ownership
+
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+from modules.data import Data
+from modules.ratelimit import TokenBucket
+
+# Digits in a verification code
+CODE_LENGTH = 6
+
+# Seconds a code stays valid; the TTL index removes it from the database afterwards
+CODE_TTL = 15 * 60
+
+# Wrong guesses allowed in a burst, and how fast more are allowed (one per minute)
+ATTEMPT_BURST = 5
+ATTEMPT_RATE = 1 / 60
+
+# Codes a user may request in a burst, and how fast more are allowed (one per two minutes)
+SEND_BURST = 3
+SEND_RATE = 1 / 120
+
+# Users whose throttles are remembered; the least recently active are forgotten first
+MAX_TRACKED_USERS = 10_000
+
+# Keys the code hashes so a leaked collection cannot be brute-forced offline.
+# Without VERIFICATION_SECRET, codes do not survive a restart.
+SECRET = (os.environ.get("VERIFICATION_SECRET") or secrets.token_hex(32)).encode()
+
+CODE_SUBJECT = "Your verification code"
+CODE_MESSAGE = (
+    "Your verification code is {code}. It expires in {minutes} minutes.\n\n"
+    "If you did not request this code, you can ignore this email."
+)
+
+
+def generate_code() -> str:
+    """
+    Generates a random numeric code.
+
+    Returns:
+        str: CODE_LENGTH digits, possibly with leading zeros.
+    """
+    return str(secrets.randbelow(10**CODE_LENGTH)).zfill(CODE_LENGTH)
+
+
+def hash_code(user_id: int, email: str, code: str) -> str:
+    """
+    Hashes a code together with who it was sent to.
+
+    Args:
+        user_id (int): The user the code was sent for.
+        email (str): The address it was sent to.
+        code (str): The code.
+
+    Returns:
+        str: A hex HMAC-SHA256 digest.
+    """
+    content = f"{user_id}:{email.lower()}:{code.strip()}".encode()
+    return hmac.new(SECRET, content, hashlib.sha256).hexdigest()
+
+
+class _Throttle:
+    def __init__(self, rate: float, burst: float):
+        """Initializes per-user token buckets, bounded to MAX_TRACKED_USERS users."""
+        self.rate = rate
+        self.burst = burst
+        self.__buckets: "OrderedDict[int, TokenBucket]" = OrderedDict()
+
+    def bucket(self, user_id: int) -> TokenBucket:
+        """Returns a user's bucket, creating a full one for a new user."""
+        bucket = self.__buckets.get(user_id)
+        if bucket is None:
+            bucket = self.__buckets[user_id] = TokenBucket(self.rate, self.burst)
+            if len(self.__buckets) > MAX_TRACKED_USERS:
+                self.__buckets.popitem(last=False)
+        self.__buckets.move_to_end(user_id)
+        return bucket
+
+    def retry_after(self, user_id: int) -> float:
+        """Returns the seconds until the user may act again, 0 if they may now."""
+        bucket = self.__buckets.get(user_id)
+        if bucket is None:
+            return 0.0
+        return max(0.0, (1 - bucket.available()) / self.rate)
+
+    def reset(self, user_id: int):
+        """Forgets a user's throttle."""
+        self.__buckets.pop(user_id, None)
+
+
+class VerificationService:
+    def __init__(self, db, outbox):
+        """
+        Initializes the verification service.
+
+        Each user has at most one outstanding code, stored under their user ID
+        as a keyed hash with an expiry date that a TTL index enforces.
+        Checking a code is one indexed find-and-delete. Guesses and resends
+        are throttled in memory, so brute force never reaches the database.
+
+        Args:
+            db (Database): Where codes are stored.
+            outbox (Outbox): Sends the codes.
+        """
+        self.__db = db
+        self.__outbox = outbox
+        self.__attempts = _Throttle(ATTEMPT_RATE, ATTEMPT_BURST)
+        self.__sends = _Throttle(SEND_RATE, SEND_BURST)
+
+    async def send_code(
+        self, user_id: int, email: str, now: Optional[float] = None
+    ) -> bool:
+        """
+        Sends a new code to an address, replacing the user's previous code.
+
+        Args:
+            user_id (int): The user verifying the address.
+            email (str): The address to verify.
+            now (Optional[float]): The current Unix epoch. Defaults to time.time().
+
+        Returns:
+            bool: True if a code was queued, False if the user has requested too many.
+        """
+        if not self.__sends.bucket(user_id).try_take():
+            return False
+
+        now = time.time() if now is None else now
+        code = generate_code()
+        code_hash = hash_code(user_id, email, code)
+        template = Data.from_template("verification", user_id)
+        await self.__db.upsert_data(
+            Data.from_dict(
+                {
+                    **template.to_dict(),
+                    "email": email,
+                    "code_hash": code_hash,
+                    "expires_at": datetime.fromtimestamp(now + CODE_TTL, timezone.utc),
+                }
+            )
+        )
+        await self.__outbox.enqueue(
+            email,
+            CODE_SUBJECT,
+            CODE_MESSAGE.format(code=code, minutes=CODE_TTL // 60),
+            key=f"verification:{code_hash}",
+            now=now,
+        )
+        return True
+
+    async def verify(
+        self, user_id: int, email: str, code: str, now: Optional[float] = None
+    ) -> bool:
+        """
+        Checks a code, consuming it if it is right.
+
+        Args:
+            user_id (int): The user verifying the address.
+            email (str): The address the code was sent to.
+            code (str): The code the user entered.
+            now (Optional[float]): The current Unix epoch. Defaults to time.time().
+
+        Returns:
+            bool: True if the code was right and unexpired; False if it was not or the user is throttled.
+        """
+        if not self.__attempts.bucket(user_id).try_take():
+            return False
+
+        now = time.time() if now is None else now
+        verified = await self.__db.take_data(
+            "verification",
+            {
+                "id": user_id,
+                "code_hash": hash_code(user_id, email, code),
+                "expires_at": {"$gt": datetime.fromtimestamp(now, timezone.utc)},
+            },
+        )
+        if verified is None:
+            return False
+        self.__attempts.reset(user_id)
+        return True
+
+    def retry_after(self, user_id: int) -> float:
+        """
+        Returns how long a user must wait before their next guess is checked.
+
+        Args:
+            user_id (int): The user verifying an address.
+
+        Returns:
+            float: Seconds to wait, 0 if they may guess now.
+        """
+        return self.__attempts.retry_after(user_id)
+
+    def resend_after(self, user_id: int) -> float:
+        """
+        Returns how long a user must wait before they may request another code.
+
+        Args:
+            user_id (int): The user verifying an address.
+
+        Returns:
+            float: Seconds to wait, 0 if they may request one now.
+        """
+        return self.__sends.retry_after(user_id)
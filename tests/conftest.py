@@ -0,0 +1,25 @@
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        help="Also run benchmarks, whose assertions depend on the machine's speed.",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: asserts on wall-clock time; run with --benchmark"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skips benchmarks unless --benchmark is given, so slow CI machines do not flake."""
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmark; run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
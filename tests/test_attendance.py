@@ -0,0 +1,81 @@
+import pytest
+from modules.attendance import AttendanceBuffer
+
+
+@pytest.fixture
+def buffer():
+    """Fixture to provide an empty AttendanceBuffer."""
+    return AttendanceBuffer()
+
+
+def test_check_in_dedupes_clicks(buffer):
+    """Test that repeated clicks by one user are recorded once."""
+    assert buffer.check_in(1, 100) is True
+    assert buffer.check_in(1, 100) is False
+    assert buffer.check_in(1, 200) is True
+    assert buffer.check_in(2, 100) is True
+
+    assert len(buffer) == 3
+    assert buffer.drain() == {1: [100, 200], 2: [100]}
+    assert len(buffer) == 0
+
+
+def test_dedupe_survives_drain(buffer):
+    """Test that users already written are not written again."""
+    buffer.check_in(1, 100)
+    buffer.drain()
+
+    assert buffer.check_in(1, 100) is False
+    assert buffer.drain() == {}
+
+
+def test_open_seeds_existing_attendees(buffer):
+    """Test that users already on the event are treated as checked in."""
+    buffer.open(1, [100])
+
+    assert buffer.check_in(1, 100) is False
+    assert buffer.check_in(1, 200) is True
+    assert buffer.drain() == {1: [200]}
+
+
+def test_requeue_after_failed_write(buffer):
+    """Test that a failed batch is retried on the next drain."""
+    buffer.check_in(1, 100)
+    batch = buffer.drain()
+    buffer.check_in(1, 200)
+
+    buffer.requeue(1, batch[1])
+    assert buffer.drain() == {1: [100, 200]}
+
+
+def test_close_forgets_event(buffer):
+    """Test that closing an event keeps pending check-ins but resets dedupe."""
+    buffer.check_in(1, 100)
+    buffer.close(1)
+
+    assert not buffer.is_open(1)
+    assert buffer.drain() == {1: [100]}
+    assert buffer.check_in(1, 100) is True
+
+
+def test_least_recently_used_events_are_forgotten():
+    """Test that only a bounded number of events are remembered."""
+    buffer = AttendanceBuffer(max_events=2)
+    buffer.open(1, [100])
+    buffer.check_in(2, 200)
+    buffer.check_in(3, 300)
+
+    assert not buffer.is_open(1)
+    assert buffer.is_open(2) and buffer.is_open(3)
+
+
+def test_reopening_keeps_pending_check_ins():
+    """Test that an event forgotten before its check-ins were written still dedupes them."""
+    buffer = AttendanceBuffer(max_events=1)
+    buffer.check_in(1, 100)
+    buffer.check_in(2, 200)
+    buffer.open(1, [101])
+
+    assert buffer.check_in(1, 100) is False
+    assert buffer.check_in(1, 101) is False
+    assert buffer.drain() == {1: [100], 2: [200]}
@@ -0,0 +1,81 @@
+import pytest
+from modules.cache import LRUCache
+
+
+@pytest.fixture
+def cache():
+    """Fixture to provide a cache with a budget of 10."""
+    return LRUCache(10)
+
+
+def test_get_and_set(cache):
+    """Test storing, reading and removing entries."""
+    cache.set("a", {"title": "A"}, size=3)
+
+    assert cache.get("a") == {"title": "A"}
+    assert cache.get("b") is None
+    assert cache.pop("a") == {"title": "A"}
+    assert len(cache) == 0 and cache.size == 0
+
+
+def test_evicts_least_recently_used(cache):
+    """Test that entries are evicted by size, oldest use first."""
+    cache.set("a", 1, size=4)
+    cache.set("b", 2, size=4)
+    cache.get("a")
+    cache.set("c", 3, size=4)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.size == 8
+
+
+def test_on_evict():
+    """Test that evicted entries are reported, but replaced or popped ones are not."""
+    evicted = []
+    cache = LRUCache(10, on_evict=lambda key, value: evicted.append((key, value)))
+    cache.set("a", 1, size=6)
+    cache.set("a", 2, size=6)
+    cache.set("b", 3, size=4)
+    cache.pop("b")
+    cache.set("c", 4, size=6)
+
+    assert evicted == [("a", 2)]
+
+
+def test_replacing_entry_updates_size(cache):
+    """Test that overwriting a key does not leak its old size."""
+    cache.set("a", 1, size=6)
+    cache.set("a", 2, size=2)
+
+    assert cache.size == 2
+    assert cache.get("a") == 2
+
+
+def test_oversized_entry_is_not_cached(cache):
+    """Test that an entry larger than the budget is dropped."""
+    cache.set("a", 1, size=4)
+    cache.set("big", 2, size=11)
+
+    assert "big" not in cache
+    assert cache.get("a") == 1
+
+
+def test_expiry(cache):
+    """Test that expired entries read as misses and are removed."""
+    cache.set("a", 1, expires_at=100)
+
+    assert cache.get("a", now=99) == 1
+    assert cache.get("a", now=100) is None
+    assert "a" not in cache
+
+
+def test_pop_where(cache):
+    """Test invalidating every entry that matches a predicate."""
+    cache.set(("listing", 1), {10, 11})
+    cache.set(("listing", 2), {12})
+    cache.set(("event", 10), {10})
+
+    assert cache.pop_where(lambda key, value: 10 in value) == 2
+    assert ("listing", 2) in cache
+    assert ("listing", 1) not in cache and ("event", 10) not in cache
@@ -0,0 +1,164 @@
+import pytest
+from modules.conversation import Conversation, ConversationRouter, Step
+
+
+def parse_number(text, answers):
+    """Parses a whole number, rejecting anything else."""
+    if not text.strip().isdigit():
+        raise ValueError("Please enter a number.")
+    return int(text)
+
+
+@pytest.fixture
+def sent():
+    """Fixture collecting (user ID, channel ID, message) for every message sent."""
+    return []
+
+
+@pytest.fixture
+def completed():
+    """Fixture collecting the answers of every completed session."""
+    return []
+
+
+@pytest.fixture
+def router(sent, completed):
+    """Fixture to provide a router with a two-step conversation registered."""
+
+    async def send(session, content):
+        sent.append((session.user_id, session.channel_id, content))
+
+    async def on_complete(session):
+        completed.append(session.answers)
+
+    router = ConversationRouter(send)
+    router.register(
+        Conversation(
+            "signup",
+            [
+                Step("name", "Name?"),
+                Step("age", lambda answers: f"Age, {answers['name']}?", parse_number),
+            ],
+            on_complete,
+            timeout=60,
+        )
+    )
+    return router
+
+
+@pytest.mark.asyncio
+async def test_conversation_runs_steps_in_order(router, sent, completed):
+    """Test that answers are collected step by step and completion is reported."""
+    await router.start("signup", 1, 10, now=0)
+    assert sent == [(1, 10, "Name?")]
+
+    assert await router.handle(1, 10, " Ada ", now=1) is True
+    assert sent[-1] == (1, 10, "Age, Ada?")
+    assert await router.handle(1, 10, "36", now=2) is True
+
+    assert completed == [{"name": "Ada", "age": 36}]
+    assert len(router) == 0
+
+
+@pytest.mark.asyncio
+async def test_messages_route_by_user_and_channel(router, completed):
+    """Test that sessions are independent per (user, channel) and others pass through."""
+    await router.start("signup", 1, 10, now=0)
+    await router.start("signup", 1, 20, now=0)
+
+    assert await router.handle(2, 10, "Bob", now=1) is False
+    await router.handle(1, 20, "Cy", now=1)
+    await router.handle(1, 10, "Di", now=1)
+
+    assert router.get(1, 10).answers == {"name": "Di"}
+    assert router.get(1, 20).answers == {"name": "Cy"}
+    assert completed == []
+
+
+@pytest.mark.asyncio
+async def test_invalid_answer_reprompts(router, sent):
+    """Test that a parse error is reported and the same step is asked again."""
+    await router.start("signup", 1, 10, now=0)
+    await router.handle(1, 10, "Ada", now=1)
+    await router.handle(1, 10, "old", now=2)
+
+    assert sent[-2:] == [(1, 10, "Please enter a number."), (1, 10, "Age, Ada?")]
+    assert router.get(1, 10).step == "age"
+
+
+@pytest.mark.asyncio
+async def test_sessions_expire(router, sent):
+    """Test that sessions time out per step and timed-out replies pass through."""
+    await router.start("signup", 1, 10, now=0)
+    await router.start("signup", 2, 10, now=0)
+    await router.handle(2, 10, "Bo", now=50)
+
+    # The second user's answer pushed their deadline back
+    assert await router.expire_due(now=60) == 1
+    assert router.get(1, 10) is None
+    assert router.get(2, 10) is not None
+    assert sent[-1] == (1, 10, "You took too long to respond!")
+
+    assert await router.handle(2, 10, "7", now=200) is False
+    assert router.get(2, 10) is None
+
+
+@pytest.mark.asyncio
+async def test_cancel_word_abandons_session(router, completed):
+    """Test that replying cancel ends the session without completing it."""
+    await router.start("signup", 1, 10, now=0)
+    assert await router.handle(1, 10, "Cancel", now=1) is True
+
+    assert router.get(1, 10) is None
+    assert completed == []
+
+
+@pytest.mark.asyncio
+async def test_branching_and_start_step(sent, completed):
+    """Test that next picks the following step and start can skip ahead."""
+
+    async def send(session, content):
+        sent.append(content)
+
+    async def on_complete(session):
+        completed.append(session.answers)
+
+    router = ConversationRouter(send)
+    router.register(
+        Conversation(
+            "menu",
+            [
+                Step("choice", "Pick", next=lambda choice, answers: choice or None),
+                Step("a", "A?", next=lambda value, answers: "choice"),
+                Step("b", "B?", next=lambda value, answers: "choice"),
+            ],
+            on_complete,
+        )
+    )
+
+    await router.start("menu", 1, 10, step="b")
+    assert sent == ["B?"]
+    await router.handle(1, 10, "x")
+    await router.handle(1, 10, "a")
+    await router.handle(1, 10, "y")
+    await router.handle(1, 10, "")
+
+    assert sent == ["B?", "Pick", "A?", "Pick"]
+    assert completed == [{"b": "x", "choice": "", "a": "y"}]
+
+
+def test_invalid_conversations_rejected():
+    """Test that conversations need steps with unique keys."""
+    with pytest.raises(ValueError):
+        Conversation("empty", [], None)
+    with pytest.raises(ValueError):
+        Conversation("twice", [Step("a", "A"), Step("a", "A")], None)
+
+
+@pytest.mark.asyncio
+async def test_start_unknown_conversation(router):
+    """Test that starting an unregistered conversation or step fails."""
+    with pytest.raises(ValueError):
+        await router.start("missing", 1, 10)
+    with pytest.raises(ValueError):
+        await router.start("signup", 1, 10, step="missing")
@@ -8,8 +8,9 @@ from modules.timestamp import Timestamp
 @pytest.fixture
 def mock_user_template():
     """
-    Mock the user template to simulate a real environment.
+    Mock the user template to simulate a real environment, restoring the real one afterwards.
     """
+    original = templates["user"]
     templates["user"] = {
         "id": None,
         "_collection": "user",
@@ -24,6 +25,8 @@ def mock_user_template():
         "updated_at": "",
         "created_at": "",
     }
+    yield
+    templates["user"] = original
 
 
 @pytest.fixture
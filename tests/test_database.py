@@ -243,3 +243,177 @@ async def test_restore_table(database, tmp_path):
     restored_data = await new_database.get_data("user", 123)
     assert restored_data is not None
     assert restored_data.get_value("id") == 123
+
+
+@pytest.mark.asyncio
+async def test_search_range(database):
+    """
+    Test range queries over an indexed field, sorted and limited on the server.
+    """
+    await database.ensure_indexes()
+    for id, start_time in [(1, 300), (2, 100), (3, 200), (4, 400)]:
+        event = await database.create_data("event", id)
+        event.set_value("start_time", start_time)
+        await database.upsert_data(event)
+
+    results = await database.search_range("event", "start_time", 100, 400)
+    assert [event.get_value("id") for event in results] == [2, 3, 1]
+
+    results = await database.search_range(
+        "event", "start_time", upper=400, descending=True, limit=2
+    )
+    assert [event.get_value("id") for event in results] == [1, 3]
+
+
+@pytest.mark.asyncio
+async def test_claim_value(database):
+    """
+    Test that a value can only be claimed once.
+    """
+    event = await database.create_data("event", 1)
+    await database.upsert_data(event)
+
+    assert await database.claim_value("event", 1, "reminders_sent", 3600) is True
+    assert await database.claim_value("event", 1, "reminders_sent", 3600) is False
+    assert await database.claim_value("event", 1, "reminders_sent", 86400) is True
+
+
+@pytest.mark.asyncio
+async def test_search_range_with_criteria(database):
+    """
+    Test range queries scoped by additional criteria, as used for guild listings.
+    """
+    await database.ensure_indexes()
+    for id, guild_id, start_time in [(1, 10, 100), (2, 20, 150), (3, 10, 200)]:
+        event = await database.create_data("event", id)
+        event.set_value("guild_id", guild_id)
+        event.set_value("start_time", start_time)
+        await database.upsert_data(event)
+
+    results = await database.search_range(
+        "event", "start_time", 100, criteria={"guild_id": 10}, limit=10
+    )
+    assert [event.get_value("id") for event in results] == [1, 3]
+
+
+@pytest.mark.asyncio
+async def test_upsert_bulk_events_and_add_to_set(database):
+    """
+    Test a chunked bulk upsert followed by a single atomic list update.
+    """
+    events = [await database.create_data("event", id) for id in (1, 2, 3)]
+    for event in events:
+        event.set_value("start_time", event.get_value("id"))
+    await database.upsert_bulk_data("event", events)
+
+    results = await database.search_range("event", "start_time")
+    assert [event.get_value("id") for event in results] == [1, 2, 3]
+
+    guild = await database.create_data("guild", 10)
+    await database.upsert_data(guild)
+    await database.add_to_set("guild", 10, "event", [1, 2])
+    await database.add_to_set("guild", 10, "event", [2, 3])
+    guild = (await database.search_data("guild", {"id": 10}, deleted=None))[0]
+    assert guild.get_list("event") == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_add_to_set_many(database):
+    """
+    Test adding one value to the lists of several documents at once.
+    """
+    for id in (1, 2, 3):
+        await database.upsert_data(await database.create_data("event", id))
+
+    await database.add_to_set_many("event", [1, 2], "user", 42)
+    await database.add_to_set_many("event", [2], "user", 42)
+
+    assert (await database.get_data("event", 1)).get_list("user") == [42]
+    assert (await database.get_data("event", 2)).get_list("user") == [42]
+    assert (await database.get_data("event", 3)).get_list("user") == []
+
+
+@pytest.mark.asyncio
+async def test_search_range_after_cursor(database):
+    """
+    Test keyset pagination over (field, id), including ties on the field.
+    """
+    for id, start_time in [(1, 100), (2, 100), (3, 100), (4, 200), (5, 300)]:
+        event = await database.create_data("event", id)
+        event.set_value("start_time", start_time)
+        await database.upsert_data(event)
+
+    page = await database.search_range("event", "start_time", 100, limit=2)
+    assert [event.get_value("id") for event in page] == [1, 2]
+
+    page = await database.search_range(
+        "event", "start_time", 100, limit=2, after=(100, 2)
+    )
+    assert [event.get_value("id") for event in page] == [3, 4]
+
+    page = await database.search_range(
+        "event", "start_time", upper=300, descending=True, after=(200, 4)
+    )
+    assert [event.get_value("id") for event in page] == [3, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_count_by(database):
+    """
+    Test counting matching documents by the values of scalar and list fields.
+    """
+    for id, guild_id, users in [(1, 10, [7, 8]), (2, 10, [8]), (3, 20, [7])]:
+        event = await database.create_data("event", id)
+        event.set_value("guild_id", guild_id)
+        await database.upsert_data(event)
+        await database.add_to_set("event", id, "user", users)
+
+    counts = await database.count_by("event", {"guild_id": 10}, ["user", "guild_id"])
+    assert counts == {"total": 2, "user": {7: 1, 8: 2}, "guild_id": {10: 2}}
+
+    counts = await database.count_by("event", {"guild_id": 30}, ["user"])
+    assert counts == {"total": 0, "user": {}}
+
+
+@pytest.mark.asyncio
+async def test_update_sets_bulk_and_pull_from_many(database):
+    """
+    Test adding and removing list values across documents, creating missing ones.
+    """
+    await database.upsert_data(await database.create_data("guild", 10))
+    await database.add_to_set("guild", 10, "user", [1, 2])
+
+    await database.update_sets_bulk(
+        "guild", "user", {10: ([3], [1]), 20: ([4, 5], []), 30: ([], [6])}
+    )
+
+    guilds = await database.search_data("guild", {}, deleted=None)
+    assert {guild.get_value("id"): guild.get_list("user") for guild in guilds} == {
+        10: [2, 3],
+        20: [4, 5],
+    }
+    assert guilds[1].get_list("event") == []
+
+    for id in (1, 2):
+        await database.upsert_data(await database.create_data("user", id))
+    await database.add_to_set_many("user", [1, 2], "guild", 10)
+    await database.pull_from_many("user", [1], "guild", 10)
+    assert (await database.get_data("user", 1)).get_list("guild") == []
+    assert (await database.get_data("user", 2)).get_list("guild") == [10]
+
+
+@pytest.mark.asyncio
+async def test_backfill_fields(database):
+    """
+    Test that users stored before is_deleted existed are found once backfilled.
+    """
+    user = (await database.create_data("user", 1)).to_dict()
+    del user["is_deleted"], user["deleted_at"]
+    await database.upsert_data(Data.from_dict(user))
+    await database.upsert_data(await database.create_data("user", 2))
+    assert [u.get_value("id") for u in await database.search_data("user", {})] == [2]
+
+    assert await database.backfill_fields() == {"user": 1}
+    assert await database.backfill_fields() == {"user": 0}
+    users = await database.search_data("user", {})
+    assert sorted(u.get_value("id") for u in users) == [1, 2]
@@ -0,0 +1,189 @@
+import asyncio
+import time
+import pytest
+import pytest_asyncio
+from modules.email import EmailService, build_message
+
+
+class StandInSMTP:
+    """A minimal local SMTP server that records what it receives."""
+
+    def __init__(self, messages_per_connection=None):
+        self.messages_per_connection = messages_per_connection
+        self.connections = 0
+        self.messages = []
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        received = 0
+        recipients = []
+        writer.write(b"220 localhost ready\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                writer.write(b"250 localhost\r\n")
+            elif command.startswith("RCPT"):
+                if "REJECT" in command:
+                    writer.write(b"550 No such user\r\n")
+                else:
+                    recipients.append(command)
+                    writer.write(b"250 OK\r\n")
+            elif command.startswith("DATA"):
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                await writer.drain()
+                body = []
+                while (data := await reader.readline()) != b".\r\n":
+                    body.append(data)
+                self.messages.append((recipients, b"".join(body).decode()))
+                recipients = []
+                received += 1
+                writer.write(b"250 OK\r\n")
+            elif command.startswith("QUIT"):
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:
+                # MAIL, RSET and NOOP
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+
+            # Simulate a server that hangs up on idle or busy connections
+            if received == self.messages_per_connection:
+                break
+        writer.close()
+
+
+@pytest_asyncio.fixture
+async def smtp():
+    """Fixture to provide a running stand-in SMTP server."""
+    server = StandInSMTP()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+def make_service(server, pool_size=2):
+    """Creates a service pointed at a stand-in server, without TLS or login."""
+    return EmailService(
+        sender="bot@example.com",
+        password="",
+        host="127.0.0.1",
+        port=server.port,
+        pool_size=pool_size,
+        starttls=False,
+        timeout=5,
+    )
+
+
+def test_build_message():
+    """Test that messages carry their headers and body."""
+    payload = build_message("a@example.com", "b@example.com", "Hi", "Hello there")
+    assert "From: a@example.com" in payload
+    assert "To: b@example.com" in payload
+    assert "Subject: Hi" in payload
+    assert "Hello there" in payload
+
+
+@pytest.mark.asyncio
+async def test_send_requires_start(smtp):
+    """Test that sending before start fails loudly."""
+    service = make_service(smtp)
+    with pytest.raises(RuntimeError):
+        service.send("user@example.com", "Hi", "Hello")
+
+
+@pytest.mark.asyncio
+async def test_send_returns_immediately_and_reuses_connections(smtp):
+    """Test that sends are queued and share the pooled connections."""
+    service = make_service(smtp, pool_size=2)
+    await service.start()
+
+    futures = [
+        service.send(f"user{i}@example.com", "Hi", f"Message {i}") for i in range(10)
+    ]
+    assert not any(future.done() for future in futures)
+
+    assert await asyncio.gather(*futures) == [True] * 10
+    await service.stop()
+
+    assert len(smtp.messages) == 10
+    assert smtp.connections == 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_recipient_fails_alone(smtp):
+    """Test that a refused recipient fails its own message without closing the connection."""
+    service = make_service(smtp, pool_size=1)
+    await service.start()
+
+    results = await asyncio.gather(
+        service.send("reject@example.com", "Hi", "Hello"),
+        service.send("user@example.com", "Hi", "Hello"),
+    )
+    await service.stop()
+
+    assert results == [False, True]
+    assert smtp.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_reconnects_when_server_hangs_up():
+    """Test that a connection closed by the server is reopened and the message retried."""
+    server = StandInSMTP(messages_per_connection=2)
+    await server.start()
+    service = make_service(server, pool_size=1)
+    await service.start()
+
+    results = await asyncio.gather(
+        *(service.send("user@example.com", "Hi", str(i)) for i in range(5))
+    )
+    await service.stop()
+    await server.stop()
+
+    assert results == [True] * 5
+    assert len(server.messages) == 5
+    assert server.connections == 3
+
+
+@pytest.mark.asyncio
+async def test_unreachable_server_fails():
+    """Test that messages resolve to False when the server cannot be reached."""
+    server = StandInSMTP()
+    await server.start()
+    await server.stop()
+    service = make_service(server, pool_size=1)
+    await service.start()
+
+    assert await service.send("user@example.com", "Hi", "Hello") is False
+    await service.stop()
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_throughput(smtp):
+    """Benchmark pooled delivery; typically over a thousand messages per second locally."""
+    count = 300
+    service = make_service(smtp, pool_size=3)
+    await service.start()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(service.send("user@example.com", "Hi", str(i)) for i in range(count))
+    )
+    rate = count / (time.perf_counter() - start)
+    await service.stop()
+
+    assert all(results)
+    assert smtp.connections == 3
+    assert rate > 100
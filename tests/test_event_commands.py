@@ -0,0 +1,257 @@
+import asyncio
+import discord
+import itertools
+import logging
+import pytest
+from types import SimpleNamespace
+from mongomock_motor import AsyncMongoMockClient
+from cogs.event import CHECKIN_PREFIX, EventPaginator, Events
+from modules.conversation import ConversationRouter
+from modules.data import Data
+from modules.database import Database
+from modules.timestamp import to_epochs
+
+GUILD_ID = 1234
+EVENT_ID = 42
+
+
+class FakeBot:
+    """Stands in for the bot, with a mock database and recorded dispatches."""
+
+    def __init__(self):
+        self.db = Database(client=AsyncMongoMockClient())
+        self.logger = logging.getLogger("discord.test")
+        self.conversations = ConversationRouter(self.send_conversation_message)
+        self.id_generator = SimpleNamespace(next_id=itertools.count(100).__next__)
+        self.dispatched = []
+
+    async def send_conversation_message(self, session, content):
+        pass
+
+    def dispatch(self, event, *args):
+        self.dispatched.append((event, *args))
+
+
+class FakeContext:
+    """Stands in for a command context, recording what is sent."""
+
+    def __init__(self, attachments=()):
+        self.guild = SimpleNamespace(id=GUILD_ID)
+        self.author = "tester"
+        self.message = SimpleNamespace(attachments=list(attachments))
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content or kwargs.get("embed"))
+
+
+@pytest.fixture
+def bot():
+    return FakeBot()
+
+
+async def save_legacy_event(bot):
+    """Saves an event as stored before recurrence existed, without its fields."""
+    datetime_str, timezone = "01/06/25 06:00 PM", "US/Eastern"
+    event = {
+        "_id": EVENT_ID,
+        "_collection": "event",
+        "guild_id": GUILD_ID,
+        "name": "Meeting",
+        "description": "Weekly meeting",
+        "datetime": datetime_str,
+        "timezone": timezone,
+        "start_time": to_epochs([datetime_str], timezone)[0],
+        "location": "DCC 308",
+        "user": [],
+        "reminders_sent": [],
+        "is_deleted": False,
+        "deleted_at": None,
+        "updated_at": "",
+        "created_at": "",
+    }
+    await bot.db.upsert_data(Data.from_dict(event))
+
+
+@pytest.mark.asyncio
+async def test_repeat_and_skip_commands(bot):
+    """Test that !events repeat and !events skip save the series and its exceptions."""
+    await save_legacy_event(bot)
+    cog = Events(bot)
+
+    ctx = FakeContext()
+    await Events.repeat_event.callback(cog, ctx, EVENT_ID, "weekly", 3)
+    event = await bot.db.get_data("event", EVENT_ID)
+    assert event.get_value("recurrence") == "FREQ=WEEKLY;COUNT=3"
+    assert event.get_list("exceptions") == []
+    assert ctx.sent[-1].title == "Event Repeats"
+
+    ctx = FakeContext()
+    await Events.skip_occurrence.callback(cog, ctx, EVENT_ID, "01/13/25")
+    event = await bot.db.get_data("event", EVENT_ID)
+    skipped = to_epochs(["01/13/25 06:00 PM"], "US/Eastern")[0]
+    assert event.get_list("exceptions") == [skipped]
+    assert ctx.sent[-1].title == "Occurrence Skipped"
+    assert bot.dispatched[-1][1].get_list("exceptions") == [skipped]
+
+
+@pytest.mark.asyncio
+async def test_skip_requires_a_repeating_event(bot):
+    """Test that skipping an occurrence of a one-off event is refused."""
+    await save_legacy_event(bot)
+    ctx = FakeContext()
+    await Events.skip_occurrence.callback(Events(bot), ctx, EVENT_ID, "01/13/25")
+    assert ctx.sent == [f"Event {EVENT_ID} does not repeat."]
+
+
+class FakeAttachment:
+    """Stands in for an uploaded file."""
+
+    def __init__(self, filename, data):
+        self.filename = filename
+        self.data = data
+        self.size = len(data)
+
+    async def read(self):
+        return self.data
+
+
+@pytest.mark.asyncio
+async def test_import_keeps_ics_end_time_and_recurrence(bot):
+    """Test that !events import stores a recurring ICS event as a series."""
+    calendar = (
+        b"BEGIN:VEVENT\r\nSUMMARY:Meeting\r\n"
+        b"DTSTART;TZID=America/New_York:20241001T180000\r\n"
+        b"DTEND;TZID=America/New_York:20241001T193000\r\n"
+        b"RRULE:FREQ=WEEKLY;COUNT=3\r\nEND:VEVENT\r\n"
+    )
+    ctx = FakeContext([FakeAttachment("calendar.ics", calendar)])
+    await Events.import_events.callback(Events(bot), ctx)
+
+    event = await bot.db.get_data("event", 100)
+    assert event.get_value("start_time") == 1727820000
+    assert event.get_value("end_time") == 1727820000 + 5400
+    assert event.get_value("recurrence") == "FREQ=WEEKLY;COUNT=3"
+    assert event.get_value("recurrence_end") == 1727820000 + 2 * 7 * 86400
+    assert ctx.sent[-1].description.startswith("1 events")
+
+
+class FakeInteraction:
+    """Stands in for a button click, recording how it was answered."""
+
+    def __init__(self):
+        self.user = SimpleNamespace(id=1)
+        self.deferred = False
+        self.shown = []
+        self.followups = []
+        self.response = SimpleNamespace(defer=self.defer)
+        self.followup = SimpleNamespace(send=self.send_followup)
+
+    async def defer(self):
+        self.deferred = True
+
+    async def edit_original_response(self, embed=None, view=None):
+        self.shown.append(embed.title)
+
+    async def send_followup(self, content, ephemeral=False):
+        self.followups.append(content)
+
+
+def make_paginator(fetch_page):
+    """Builds a paginator whose pages are titled by their events."""
+    return EventPaginator(
+        1,
+        discord.Embed(title="0"),
+        0,
+        fetch_page,
+        lambda events: discord.Embed(title=",".join(map(str, events))),
+    )
+
+
+@pytest.mark.asyncio
+async def test_quick_next_clicks_load_each_page_once():
+    """Test that clicks during a slow fetch are answered and turn one page each."""
+    fetched = []
+
+    async def fetch_page(cursor):
+        fetched.append(cursor)
+        await asyncio.sleep(0.01)
+        return [cursor + 1], cursor + 1
+
+    paginator = make_paginator(fetch_page)
+    clicks = [FakeInteraction(), FakeInteraction()]
+    await asyncio.gather(*(paginator.next_page.callback(click) for click in clicks))
+
+    assert all(click.deferred for click in clicks)
+    assert [click.shown for click in clicks] == [["1"], ["2"]]
+    assert [page.title for page in paginator.pages] == ["0", "1", "2"]
+    assert fetched[:2] == [0, 1]
+    paginator.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_is_reported():
+    """Test that a failing next-page fetch gets a followup instead of no answer."""
+
+    async def fetch_page(cursor):
+        raise RuntimeError("database unavailable")
+
+    paginator = make_paginator(fetch_page)
+    click = FakeInteraction()
+    await paginator.next_page.callback(click)
+
+    assert click.deferred and click.shown == []
+    assert click.followups == ["Could not load the next page. Please try again."]
+    assert paginator.index == 0
+    paginator.stop()
+
+
+class FakeCheckIn:
+    """Stands in for a check-in button click, recording the order it is answered in."""
+
+    def __init__(self, user_id, log):
+        self.type = discord.InteractionType.component
+        self.data = {"custom_id": f"{CHECKIN_PREFIX}{EVENT_ID}"}
+        self.user = SimpleNamespace(id=user_id)
+        self.log = log
+        self.response = SimpleNamespace(
+            defer=self.defer, send_message=self.send_message
+        )
+        self.followup = SimpleNamespace(send=self.send_message)
+        self.answers = []
+
+    async def defer(self, ephemeral=False):
+        self.log.append("defer")
+
+    async def send_message(self, content, ephemeral=False):
+        self.answers.append(content)
+
+
+@pytest.mark.asyncio
+async def test_first_check_ins_defer_and_share_one_read(bot):
+    """Test that clicks after a restart are deferred before one shared read reopens the event."""
+    await save_legacy_event(bot)
+    cog = Events(bot)
+    log = []
+    get_data = bot.db.get_data
+
+    async def logged_get_data(*args, **kwargs):
+        log.append("read")
+        await asyncio.sleep(0.01)
+        return await get_data(*args, **kwargs)
+
+    bot.db.get_data = logged_get_data
+    clicks = [FakeCheckIn(1, log), FakeCheckIn(2, log), FakeCheckIn(1, log)]
+    await asyncio.gather(*(cog.on_interaction(click) for click in clicks))
+
+    assert log == ["defer", "defer", "defer", "read"]
+    assert [click.answers for click in clicks] == [
+        ["You're checked in!"],
+        ["You're checked in!"],
+        ["You're already checked in."],
+    ]
+
+    # Once reopened, clicks are answered directly
+    click = FakeCheckIn(3, log)
+    await cog.on_interaction(click)
+    assert log[-1] == "read" and click.answers == ["You're checked in!"]
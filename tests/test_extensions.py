@@ -0,0 +1,107 @@
+import asyncio
+import pytest
+import sys
+from modules.extensions import ExtensionLoader, extension_dependencies
+
+
+class RecordingLoader:
+    """Stands in for Bot.load_extension, recording loads and overlapping their setup."""
+
+    def __init__(self, fail=(), together=1):
+        self.fail = set(fail)
+        self.together = together
+        self.all_started = asyncio.Event()
+        self.loaded = []
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(self, name):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        if self.running >= self.together:
+            self.all_started.set()
+        # Wait for the other loads, so overlap does not depend on import speed
+        try:
+            await asyncio.wait_for(self.all_started.wait(), 1)
+        except asyncio.TimeoutError:
+            pass
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if name in self.fail:
+            raise RuntimeError("setup failed")
+        self.loaded.append(name)
+
+
+@pytest.mark.asyncio
+async def test_load_all_concurrently_and_records_failures():
+    """Test that extensions set up side by side and a failure does not stop the rest."""
+    load = RecordingLoader(fail={"json"}, together=3)
+    loader = ExtensionLoader(load)
+    timings = await loader.load_all(["asyncio", "json", "logging"])
+
+    assert sorted(load.loaded) == ["asyncio", "logging"]
+    assert load.peak == 3
+    assert [timing.loaded for timing in timings] == [True, False, True]
+    assert timings[1].error == "setup failed"
+    assert timings[0].import_seconds >= 0 and timings[0].setup_seconds >= 0.01
+
+
+@pytest.mark.asyncio
+async def test_missing_extension_fails_on_import():
+    """Test that an extension that cannot be imported is never set up."""
+    load = RecordingLoader()
+    loader = ExtensionLoader(load)
+    (timing,) = await loader.load_all(["modules.does_not_exist"])
+
+    assert load.loaded == []
+    assert "does_not_exist" in timing.error
+
+
+@pytest.mark.asyncio
+async def test_only_dependencies_are_imported_before_loading(tmp_path, monkeypatch):
+    """Test that the extension module is left for the loader to execute once."""
+    (tmp_path / "sample_cog.py").write_text(
+        "import json\n"
+        "from email import message\n"
+        "try:\n"
+        "    import not_installed\n"
+        "except ImportError:\n"
+        "    pass\n"
+        "from . import sibling\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    assert extension_dependencies("sample_cog") == ["json", "email"]
+
+    load = RecordingLoader()
+    (timing,) = await ExtensionLoader(load).load_all(["sample_cog"])
+    assert timing.loaded and load.loaded == ["sample_cog"]
+    assert "sample_cog" not in sys.modules
+
+
+@pytest.mark.asyncio
+async def test_deferred_extension_loads_once_on_first_command():
+    """Test that deferred extensions wait for their first command and load once."""
+    load = RecordingLoader()
+    loader = ExtensionLoader(load, deferred={"json": ["dump", "load"]})
+    await loader.load_all(["asyncio", "json"])
+
+    assert load.loaded == ["asyncio"]
+    assert "json: deferred" in loader.report()
+    assert loader.deferred_extension("ping") is None
+    assert loader.deferred_extension("dump") == "json"
+
+    await asyncio.gather(loader.load("json"), loader.load("json"))
+    assert load.loaded == ["asyncio", "json"]
+    assert loader.deferred_extension("load") is None
+
+
+@pytest.mark.asyncio
+async def test_report():
+    """Test that the report leads with the total and lists every extension."""
+    loader = ExtensionLoader(RecordingLoader())
+    assert loader.report().startswith("0 extensions, not loaded")
+
+    await loader.load_all(["asyncio", "json"])
+    lines = loader.report().splitlines()
+    assert lines[0].startswith("2 extensions, ")
+    assert sorted(line.split(":")[0] for line in lines[1:]) == ["asyncio", "json"]
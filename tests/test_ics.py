@@ -0,0 +1,175 @@
+import pytest
+from modules.ics import (
+    CalendarCache,
+    event_fields,
+    iter_vevents,
+    parse_line,
+    render_vevent,
+    to_local,
+    unescape,
+)
+
+
+ICS_FILE = """BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+UID:1@example.com
+SUMMARY:General Body Meeting
+DESCRIPTION:Agenda:\\n- elections\\, snacks
+DTSTART;TZID=America/Chicago:20240910T180000
+LOCATION:DCC 308
+BEGIN:VALARM
+DESCRIPTION:Alarm text
+END:VALARM
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:Hackathon kickoff with a very long name that is folded across two
+  content lines
+DTSTART:20241001T220000Z
+END:VEVENT
+END:VCALENDAR""".splitlines()
+
+
+def test_parse_line_with_quoted_parameter():
+    """Test that colons inside quoted parameters do not split the value."""
+    name, (parameters, value) = parse_line('LOCATION;ALTREP="http://x":Room 1')
+    assert name == "LOCATION"
+    assert parameters == {"ALTREP": "http://x"}
+    assert value == "Room 1"
+
+
+def test_unescape():
+    """Test reversing TEXT escaping."""
+    assert unescape(r"a\, b\; c\nd\\") == "a, b; c\nd\\"
+
+
+def test_iter_vevents_and_event_fields():
+    """Test streaming events out of an ICS file, ignoring nested alarms."""
+    events = list(iter_vevents(ICS_FILE))
+    assert [line for line, _ in events] == [3, 13]
+
+    first = event_fields(events[0][1])
+    assert first == {
+        "name": "General Body Meeting",
+        "description": "Agenda:\n- elections, snacks",
+        "datetime": "09/10/24 06:00 PM",
+        "timezone": "America/Chicago",
+        "location": "DCC 308",
+    }
+
+    second = event_fields(events[1][1])
+    assert second["name"].endswith("across two content lines")
+    assert second["datetime"] == "10/01/24 06:00 PM"
+    assert second["timezone"] == "America/New_York"
+
+
+def test_to_local_all_day():
+    """Test that all-day events start at midnight."""
+    assert to_local(({"VALUE": "DATE"}, "20240910")) == (
+        "09/10/24 12:00 AM",
+        "America/New_York",
+    )
+
+
+def test_event_fields_requires_start():
+    """Test that events without a start time are rejected."""
+    with pytest.raises(ValueError):
+        event_fields({"SUMMARY": ({}, "No start")})
+
+
+def test_event_fields_rejects_end_before_start():
+    """Test that events ending before they start are rejected."""
+    with pytest.raises(ValueError):
+        event_fields(
+            {
+                "SUMMARY": ({}, "Backwards"),
+                "DTSTART": ({}, "20240910T220000Z"),
+                "DTEND": ({}, "20240910T210000Z"),
+            }
+        )
+
+
+def test_render_vevent_round_trip():
+    """Test that rendered events escape, fold and parse back unchanged."""
+    vevent = render_vevent(
+        "1@capy", "Meet, greet", "Line 1\nLine 2; ok", "DCC " + "x" * 100, 1725991200
+    )
+    lines = vevent.decode("utf-8").split("\r\n")
+    assert all(len(line.encode("utf-8")) <= 75 for line in lines)
+
+    fields = event_fields(next(iter_vevents(lines))[1])
+    assert fields["name"] == "Meet, greet"
+    assert fields["description"] == "Line 1\nLine 2; ok"
+    assert fields["location"] == "DCC " + "x" * 100
+    assert fields["datetime"] == "09/10/24 02:00 PM"
+
+
+def test_render_recurring_vevent():
+    """Test that series are rendered with local times, an RRULE and EXDATEs."""
+    vevent = render_vevent(
+        "2@capy",
+        "Weekly Meeting",
+        "",
+        "",
+        1727820000,
+        tz_name="America/New_York",
+        recurrence="FREQ=WEEKLY;COUNT=8",
+        exceptions=[1728424800],
+    ).decode("utf-8")
+
+    assert "DTSTART;TZID=America/New_York:20241001T180000\r\n" in vevent
+    assert "DTEND;TZID=America/New_York:20241001T190000\r\n" in vevent
+    assert "RRULE:FREQ=WEEKLY;COUNT=8\r\n" in vevent
+    assert "EXDATE;TZID=America/New_York:20241008T180000\r\n" in vevent
+
+    fields = event_fields(next(iter_vevents(vevent.split("\r\n")))[1])
+    assert fields["datetime"] == "10/01/24 06:00 PM"
+    assert fields["end_time"] == 1727820000 + 3600
+    assert fields["recurrence"] == "FREQ=WEEKLY;COUNT=8"
+    assert fields["exceptions"] == [1728424800]
+
+
+def test_calendar_cache_invalidation():
+    """Test that documents are rebuilt only after the guild's events change."""
+    cache = CalendarCache()
+    assert cache.get(10) is None
+
+    cache.load(10, {1: b"BEGIN:VEVENT\r\nUID:1\r\nEND:VEVENT\r\n"})
+    document, etag = cache.get(10)
+    assert cache.get(10)[0] is document
+
+    cache.upsert(10, 2, b"BEGIN:VEVENT\r\nUID:2\r\nEND:VEVENT\r\n")
+    document, new_etag = cache.get(10)
+    assert new_etag != etag
+    assert document.count(b"BEGIN:VEVENT") == 2
+
+    cache.remove(2)
+    assert cache.get(10)[1] == etag
+
+    # Guilds that were never loaded are left for the next full load
+    cache.upsert(20, 3, b"")
+    assert cache.get(20) is None
+
+
+def test_calendar_cache_eviction():
+    """Test that calendars beyond the byte budget or of departed guilds are dropped."""
+    vevent = b"BEGIN:VEVENT\r\nUID:1\r\nEND:VEVENT\r\n"
+    document, _ = CalendarCache(1024).load(10, {1: vevent})
+    # Room for one guild's events and document, but not two
+    cache = CalendarCache(len(document) + len(vevent) + 1)
+
+    cache.load(10, {1: vevent})
+    cache.load(20, {2: vevent})
+    assert not cache.is_loaded(10) and cache.is_loaded(20)
+    # The evicted guild's events no longer resolve to it
+    cache.remove(1)
+    assert cache.is_loaded(20)
+
+    cache.forget(20)
+    assert cache.get(20) is None
+    cache.upsert(20, 3, vevent)
+    assert not cache.is_loaded(20)
+
+    # A calendar too large to keep is still returned to the caller
+    assert cache.load(30, {3: vevent, 4: vevent})[0].count(b"BEGIN:VEVENT") == 2
+    assert not cache.is_loaded(30)
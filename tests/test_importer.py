@@ -0,0 +1,75 @@
+import pytest
+from modules.importer import iter_event_rows, chunked, validate_row
+
+
+CSV_FILE = b"""\xef\xbb\xbfName,Description,Date,Time,Location
+General Body Meeting,Weekly,09/10/24,06:00 PM,DCC 308
+Bad Date,,31/12/24,06:00 PM,
+Social,,09/12/24,07:30 PM PT,Union
+"""
+
+
+def test_iter_event_rows_csv():
+    """Test streaming events from a CSV file, reporting invalid rows by line."""
+    rows = list(iter_event_rows(CSV_FILE, "calendar.csv"))
+    assert [line for line, _, _ in rows] == [2, 3, 4]
+
+    assert rows[0][1] == {
+        "name": "General Body Meeting",
+        "description": "Weekly",
+        "datetime": "09/10/24 06:00 PM",
+        "timezone": "America/New_York",
+        "location": "DCC 308",
+    }
+    assert rows[1][1] == {} and "Invalid datetime format" in rows[1][2]
+    assert rows[2][1]["timezone"] == "America/Los_Angeles"
+
+
+def test_iter_event_rows_ics():
+    """Test that .ics files are routed to the ICS parser."""
+    data = (
+        b"BEGIN:VEVENT\r\nSUMMARY:Meeting\r\nDTSTART:20240910T220000Z\r\nEND:VEVENT\r\n"
+    )
+    rows = list(iter_event_rows(data, "calendar.ICS"))
+    assert rows[0][1]["datetime"] == "09/10/24 06:00 PM"
+
+
+def test_iter_event_rows_ics_recurrence():
+    """Test that ICS series keep their end time and rule, and unsupported rules are reported."""
+    data = (
+        b"BEGIN:VEVENT\r\nSUMMARY:Meeting\r\n"
+        b"DTSTART;TZID=America/New_York:20241001T180000\r\n"
+        b"DTEND;TZID=America/New_York:20241001T193000\r\n"
+        b"RRULE:FREQ=WEEKLY;COUNT=3\r\n"
+        b"EXDATE;TZID=America/New_York:20241008T180000\r\nEND:VEVENT\r\n"
+        b"BEGIN:VEVENT\r\nSUMMARY:Anniversary\r\nDTSTART:20241001T220000Z\r\n"
+        b"RRULE:FREQ=YEARLY\r\nEND:VEVENT\r\n"
+    )
+    (line, fields, error), unsupported = iter_event_rows(data, "calendar.ics")
+
+    assert error == ""
+    assert fields["end_time"] == 1727820000 + 5400
+    assert fields["recurrence"] == "FREQ=WEEKLY;COUNT=3"
+    assert fields["recurrence_end"] == 1727820000 + 2 * 7 * 86400
+    assert fields["exceptions"] == [1728424800]
+    assert unsupported[1] == {} and "YEARLY" in unsupported[2]
+
+
+def test_iter_event_rows_unsupported():
+    """Test that other file types are rejected."""
+    with pytest.raises(ValueError):
+        list(iter_event_rows(b"", "calendar.txt"))
+
+
+def test_chunked():
+    """Test grouping items into bounded chunks."""
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_validate_row():
+    """Test validating rows against a template."""
+    assert validate_row("event", {"name": "Meeting"}) == {"name": "Meeting"}
+    with pytest.raises(ValueError):
+        validate_row("event", {"unknown": "x"})
+    with pytest.raises(ValueError):
+        validate_row("event", {"user": "not a list"})
@@ -0,0 +1,60 @@
+import random
+import pytest
+from modules.interval_tree import IntervalTree
+
+
+@pytest.fixture
+def tree():
+    """Fixture to provide a tree with a few meetings in one room."""
+    tree = IntervalTree()
+    for start, end, event_id in [(0, 60, 1), (30, 90, 2), (120, 180, 3), (0, 60, 4)]:
+        tree.insert(start, end, event_id)
+    return tree
+
+
+def test_overlapping(tree):
+    """Test overlap queries with half-open intervals."""
+    assert tree.overlapping(45, 50) == [(0, 60, 1), (0, 60, 4), (30, 90, 2)]
+    assert tree.overlapping(60, 120) == [(30, 90, 2)]
+    assert tree.overlapping(90, 120) == []
+    assert tree.overlapping(0, 1000) == sorted(tree)
+
+
+def test_remove(tree):
+    """Test that removal only takes out the exact interval and value."""
+    assert tree.remove(0, 60, 1) is True
+    assert tree.remove(0, 60, 1) is False
+    assert tree.remove(0, 61, 4) is False
+
+    assert len(tree) == 3
+    assert tree.overlapping(0, 10) == [(0, 60, 4)]
+
+
+def test_invalid_interval(tree):
+    """Test that intervals ending before they start are rejected."""
+    with pytest.raises(ValueError):
+        tree.insert(10, 5, 5)
+
+
+def test_matches_brute_force():
+    """Test random inserts, removals and queries against a linear scan."""
+    rng = random.Random(0)
+    tree, intervals = IntervalTree(), []
+    for event_id in range(2000):
+        start = rng.randint(0, 10_000)
+        interval = (start, start + rng.randint(0, 300), event_id)
+        tree.insert(*interval)
+        intervals.append(interval)
+
+    for interval in rng.sample(intervals, 700):
+        assert tree.remove(*interval)
+        intervals.remove(interval)
+
+    for _ in range(300):
+        start = rng.randint(-100, 10_100)
+        end = start + rng.randint(1, 500)
+        expected = sorted(i for i in intervals if i[0] < end and i[1] > start)
+        assert tree.overlapping(start, end) == expected
+
+    assert list(tree) == sorted(intervals)
+    assert len(tree) == len(intervals)
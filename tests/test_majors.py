@@ -0,0 +1,82 @@
+import pytest
+from modules.majors import MajorCatalog, get_catalog
+
+NAMES = [
+    "Applied Physics",
+    "Cognitive Science",
+    "Computer Science",
+    "Computer and Systems Engineering",
+    "Information Technology and Web Science",
+    "Mathematics",
+    "Physics",
+]
+
+
+@pytest.fixture
+def catalog():
+    """Fixture to provide a small catalog."""
+    return MajorCatalog(NAMES, aliases={"cs": "Computer Science", "x": "Unknown"})
+
+
+def test_lookup_by_number_and_name(catalog):
+    """Test that list numbers and case-insensitive names resolve."""
+    assert catalog.lookup("3") == "Computer Science"
+    assert catalog.lookup("0") is None
+    assert catalog.lookup("8") is None
+    assert catalog.lookup(" mathematics ") == "Mathematics"
+
+
+def test_lookup_by_alias_and_initials(catalog):
+    """Test that aliases and unambiguous initials resolve."""
+    assert catalog.lookup("CS") == "Computer Science"
+    assert catalog.lookup("itws") == "Information Technology and Web Science"
+    assert catalog.lookup("cse") == "Computer and Systems Engineering"
+    assert catalog.lookup("x") is None
+
+
+def test_lookup_by_prefix(catalog):
+    """Test that unique prefixes resolve and ambiguous ones do not."""
+    assert catalog.lookup("math") == "Mathematics"
+    assert catalog.lookup("computer s") == "Computer Science"
+    assert catalog.lookup("phys") == "Physics"
+    assert catalog.lookup("comp") is None
+
+
+def test_lookup_by_misspelling(catalog):
+    """Test that close misspellings resolve and unrelated text does not."""
+    assert catalog.lookup("Compter Science") == "Computer Science"
+    assert catalog.lookup("Mathmatics") == "Mathematics"
+    assert catalog.lookup("xyzzy") is None
+
+
+def test_parse_list(catalog):
+    """Test parsing a comma-separated list of majors."""
+    assert catalog.parse("3, math") == ["Computer Science", "Mathematics"]
+    with pytest.raises(ValueError):
+        catalog.parse("3, cs")
+    with pytest.raises(ValueError):
+        catalog.parse("3, nonsense")
+
+
+def test_complete(catalog):
+    """Test that suggestions rank name prefixes before word prefixes."""
+    assert catalog.complete("phys") == ["Physics", "Applied Physics"]
+    assert catalog.complete("science")[:3] == [
+        "Cognitive Science",
+        "Computer Science",
+        "Information Technology and Web Science",
+    ]
+    assert catalog.complete("", limit=2) == NAMES[:2]
+    assert catalog.complete("6") == ["Mathematics"]
+
+
+def test_listing(catalog):
+    """Test that the numbered listing matches the catalog order."""
+    assert catalog.listing.splitlines()[2] == "3. Computer Science"
+    assert len(catalog) == len(NAMES)
+
+
+def test_get_catalog_is_shared():
+    """Test that the majors file is loaded once and shared."""
+    assert get_catalog() is get_catalog()
+    assert "Computer Science" in get_catalog().names
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import pytest
+from types import SimpleNamespace
+from mongomock_motor import AsyncMongoMockClient
+from cogs.members import Members
+from modules.database import Database
+
+GUILD_ID = 1234
+MEMBERS = {1, 2}
+
+
+class FakeBot:
+    """Stands in for the bot, with a mock database."""
+
+    def __init__(self):
+        self.db = Database(client=AsyncMongoMockClient())
+        self.logger = logging.getLogger("discord.test")
+        self.members_lock = asyncio.Lock()
+
+
+class FakeAttachment:
+    """Stands in for an uploaded file."""
+
+    def __init__(self, filename, data):
+        self.filename = filename
+        self.data = data
+        self.size = len(data)
+
+    async def read(self):
+        return self.data
+
+
+class FakeContext:
+    """Stands in for a command context in a server with MEMBERS, recording what is sent."""
+
+    def __init__(self, attachment):
+        self.guild = SimpleNamespace(
+            id=GUILD_ID,
+            get_member=lambda id: SimpleNamespace(id=id) if id in MEMBERS else None,
+        )
+        self.author = "admin"
+        self.message = SimpleNamespace(attachments=[attachment])
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append(content or kwargs.get("embed"))
+
+
+@pytest.mark.asyncio
+async def test_import_only_fills_members_profiles():
+    """Test that an import skips non-members, keeps filled fields and links both sides."""
+    bot = FakeBot()
+    user = await bot.db.create_data("user", 1)
+    user.set_value("first_name", "Ada")
+    user.set_value("school_email", "ada@rpi.edu")
+    await bot.db.upsert_data(user)
+
+    roster = (
+        b"id,first_name,last_name,school_email\n"
+        b"1,Mallory,Lovelace,mallory@rpi.edu\n"
+        b"2,Grace,Hopper,grace@rpi.edu\n"
+        b"3,Not,Member,\n"
+    )
+    ctx = FakeContext(FakeAttachment("roster.csv", roster))
+    await Members.import_roster.callback(Members(bot), ctx)
+
+    first = await bot.db.get_data("user", 1)
+    assert first.get_value("first_name") == "Ada"
+    assert first.get_value("last_name") == "Lovelace"
+    assert first.get_value("school_email") == "ada@rpi.edu"
+    second = await bot.db.get_data("user", 2)
+    assert second.get_value("school_email") == ""
+    assert second.get_list("guild") == [GUILD_ID]
+    assert await bot.db.get_data("user", 3) is None
+
+    (guild,) = await bot.db.search_data("guild", {"id": GUILD_ID}, deleted=None)
+    assert sorted(guild.get_list("user")) == [1, 2]
+    summary = ctx.sent[-1]
+    assert summary.description.startswith("2 member profiles")
+    assert "3 is not a member" in summary.fields[0].value
@@ -0,0 +1,83 @@
+import pytest
+from modules.membership import MembershipBuffer
+
+
+@pytest.fixture
+def buffer():
+    """Fixture to provide an empty MembershipBuffer."""
+    return MembershipBuffer(max_pending=3)
+
+
+def test_latest_change_wins(buffer):
+    """Test that only each member's latest change per guild is kept."""
+    buffer.join(1, 100)
+    buffer.join(1, 200)
+    buffer.leave(1, 100)
+    buffer.join(2, 100)
+
+    assert len(buffer) == 3
+    assert buffer.drain() == {1: ([200], [100]), 2: ([100], [])}
+    assert len(buffer) == 0
+    assert buffer.drain() == {}
+
+
+def test_full(buffer):
+    """Test that the buffer reports when it reaches its bound."""
+    assert buffer.join(1, 100) is False
+    assert buffer.join(1, 200) is False
+    assert buffer.leave(1, 200) is False
+    assert buffer.join(1, 300) is True
+
+
+def test_requeue_keeps_newer_changes(buffer):
+    """Test that failed writes are retried without undoing later changes."""
+    buffer.join(1, 100)
+    buffer.join(1, 200)
+    joined, left = buffer.drain()[1]
+
+    buffer.leave(1, 100)
+    buffer.requeue(1, joined, left)
+
+    assert len(buffer) == 2
+    assert buffer.drain() == {1: ([200], [100])}
+
+
+def test_buffer_never_exceeds_its_bound(buffer):
+    """Test that the oldest changes are dropped once the buffer is full."""
+    for user_id in range(5):
+        buffer.join(1, user_id)
+
+    assert len(buffer) == 3
+    assert buffer.dropped == 2
+    assert buffer.drain() == {1: ([2, 3, 4], [])}
+
+
+def test_requeue_drops_oldest_when_full(buffer):
+    """Test that a failed batch is only put back while there is room."""
+    buffer.join(1, 100)
+    buffer.join(1, 200)
+    joined, left = buffer.drain()[1]
+    buffer.join(2, 300)
+    buffer.join(2, 400)
+
+    assert buffer.requeue(1, joined, left) == 1
+    assert len(buffer) == 3
+    assert buffer.dropped == 1
+
+
+def test_backoff_after_failed_writes(buffer):
+    """Test that failed writes back off exponentially until one succeeds."""
+    assert not buffer.can_write(0)
+    buffer.join(1, 100)
+    assert buffer.can_write(0)
+
+    assert buffer.write_failed(0) == 1
+    assert not buffer.can_write(0.5)
+    assert buffer.can_write(1)
+    assert buffer.write_failed(1) == 2
+    for _ in range(10):
+        delay = buffer.write_failed(1)
+    assert delay == 60
+
+    buffer.write_succeeded()
+    assert buffer.can_write(1)
@@ -0,0 +1,153 @@
+import asyncio
+import itertools
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from modules.database import Database
+from modules.outbox import (
+    DEDUP_WINDOW,
+    FAILED,
+    PENDING,
+    SENT,
+    Outbox,
+    idempotency_key,
+    retry_delay,
+)
+
+
+class RecordingEmail:
+    """Stands in for EmailService, failing sends to listed recipients."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    def send(self, recipient, subject, message):
+        future = asyncio.get_running_loop().create_future()
+        ok = recipient not in self.failing
+        if ok:
+            self.sent.append((recipient, subject, message))
+        future.set_result(ok)
+        return future
+
+
+@pytest.fixture
+def database():
+    """Fixture to provide a Database backed by a mock client."""
+    return Database(client=AsyncMongoMockClient())
+
+
+def make_outbox(database, email, **kwargs):
+    """Creates an outbox with sequential IDs and no practical rate limit."""
+    ids = itertools.count(1)
+    return Outbox(database, email, lambda: next(ids), rate=1000, burst=1000, **kwargs)
+
+
+async def statuses(database):
+    """Returns the status of every outbox message by recipient."""
+    messages = await database.search_data("outbox", {})
+    return {m.get_value("recipient"): m.get_value("status") for m in messages}
+
+
+def test_idempotency_key():
+    """Test that keys depend on content, ignoring recipient case."""
+    assert idempotency_key("A@rpi.edu", "S", "M") == idempotency_key(
+        "a@rpi.edu", "S", "M"
+    )
+    assert idempotency_key("a@rpi.edu", "S", "M") != idempotency_key(
+        "a@rpi.edu", "S", "N"
+    )
+
+
+def test_retry_delay_backs_off():
+    """Test that retry delays double with jitter and are capped."""
+    assert 15 <= retry_delay(1) <= 30
+    assert 60 <= retry_delay(3) <= 120
+    assert retry_delay(30) <= 3600
+
+
+@pytest.mark.asyncio
+async def test_enqueue_dedupes_by_key(database):
+    """Test that an email with a key already queued is dropped."""
+    outbox = make_outbox(database, RecordingEmail())
+
+    assert await outbox.enqueue("a@rpi.edu", "Hi", "Hello", now=0) is True
+    assert await outbox.enqueue("a@rpi.edu", "Hi", "Hello", now=1) is False
+    assert await outbox.enqueue("a@rpi.edu", "Hi", "Bye", key="k1", now=1) is True
+    assert await outbox.enqueue("b@rpi.edu", "Other", "Other", key="k1", now=1) is False
+    # The same email is sent again once the dedup window has passed
+    assert await outbox.enqueue("a@rpi.edu", "Hi", "Hello", now=DEDUP_WINDOW) is True
+
+    metrics = await outbox.metrics()
+    assert metrics["queue_depth"] == 3
+    assert metrics["duplicates"] == 2
+
+
+@pytest.mark.asyncio
+async def test_dedup_window_slides(database):
+    """Test that repeats are measured from the last copy queued, not a fixed window."""
+    outbox = make_outbox(database, RecordingEmail())
+
+    assert await outbox.enqueue("a@rpi.edu", "Hi", "Hello", now=DEDUP_WINDOW - 1)
+    assert not await outbox.enqueue("a@rpi.edu", "Hi", "Hello", now=DEDUP_WINDOW + 1)
+    assert await outbox.enqueue("a@rpi.edu", "Hi", "Hello", now=2 * DEDUP_WINDOW - 1)
+    assert not await outbox.enqueue("a@rpi.edu", "Hi", "Hello", now=2 * DEDUP_WINDOW)
+    assert (await outbox.metrics())["queue_depth"] == 2
+
+
+@pytest.mark.asyncio
+async def test_drain_sends_in_batches(database):
+    """Test that drain sends at most one batch of due messages."""
+    email = RecordingEmail()
+    outbox = make_outbox(database, email, batch_size=2)
+    for i in range(3):
+        await outbox.enqueue(f"user{i}@rpi.edu", "Hi", "Hello", now=i)
+
+    assert await outbox.drain(now=10) == 2
+    assert await outbox.drain(now=10) == 1
+    assert await outbox.drain(now=10) == 0
+
+    assert len(email.sent) == 3
+    assert set((await statuses(database)).values()) == {SENT}
+    # Sent messages are left for the TTL index to delete
+    messages = await database.search_data("outbox", {})
+    assert all(message.get_value("expires_at") for message in messages)
+    metrics = await outbox.metrics()
+    assert metrics["queue_depth"] == 0
+    assert metrics["sent"] == 3
+    assert metrics["latency_p50"] is not None
+
+
+@pytest.mark.asyncio
+async def test_failures_retry_with_backoff_then_fail(database):
+    """Test that failed sends are rescheduled until they run out of attempts."""
+    email = RecordingEmail(failing={"bad@rpi.edu"})
+    outbox = make_outbox(database, email, max_attempts=2)
+    await outbox.enqueue("bad@rpi.edu", "Hi", "Hello", now=0)
+
+    assert await outbox.drain(now=0) == 1
+    assert await statuses(database) == {"bad@rpi.edu": PENDING}
+    # Not due again until the backoff has passed
+    assert await outbox.drain(now=1) == 0
+
+    assert await outbox.drain(now=10_000) == 1
+    assert await statuses(database) == {"bad@rpi.edu": FAILED}
+    metrics = await outbox.metrics()
+    assert metrics["retried"] == 1
+    assert metrics["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_background_drain(database):
+    """Test that a started outbox sends newly queued messages promptly."""
+    email = RecordingEmail()
+    outbox = make_outbox(database, email)
+    await outbox.start()
+    await outbox.enqueue("a@rpi.edu", "Hi", "Hello")
+
+    for _ in range(50):
+        if email.sent:
+            break
+        await asyncio.sleep(0.01)
+    await outbox.stop()
+
+    assert email.sent == [("a@rpi.edu", "Hi", "Hello")]
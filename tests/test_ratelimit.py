@@ -0,0 +1,46 @@
+import pytest
+from modules.ratelimit import TokenBucket
+
+
+def test_burst_then_rate():
+    """Test that a full bucket allows a burst, then refills at its rate."""
+    bucket = TokenBucket(rate=2, capacity=3, now=0)
+
+    assert [bucket.try_take(now=0) for _ in range(4)] == [True, True, True, False]
+    assert bucket.try_take(now=0.4) is False
+    assert bucket.try_take(now=0.5) is True
+
+
+def test_refill_caps_at_capacity():
+    """Test that a long idle spell does not bank more than the capacity."""
+    bucket = TokenBucket(rate=1, capacity=2, now=0)
+    bucket.try_take(2, now=0)
+
+    assert bucket.available(now=100) == 2
+
+
+def test_reserve_queues_waits():
+    """Test that reservations beyond the tokens wait in order."""
+    bucket = TokenBucket(rate=10, capacity=1, now=0)
+
+    assert bucket.reserve(now=0) == 0
+    assert bucket.reserve(now=0) == pytest.approx(0.1)
+    assert bucket.reserve(now=0) == pytest.approx(0.2)
+    assert bucket.available(now=0.2) == 0
+
+
+def test_invalid_bucket():
+    """Test that a bucket needs a positive rate and capacity."""
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0, capacity=1)
+    with pytest.raises(ValueError):
+        TokenBucket(rate=1, capacity=0)
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_tokens():
+    """Test that acquire sleeps until a token is available."""
+    bucket = TokenBucket(rate=100, capacity=1)
+    await bucket.acquire()
+    assert bucket.try_take() is False
+    await bucket.acquire()
@@ -0,0 +1,180 @@
+import asyncio
+import time
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from modules.data import Data
+from modules.database import Database
+from modules.reconcile import Reconciler, diff_members
+
+
+@pytest.fixture
+def database():
+    """Fixture to provide a Database with a mock client."""
+    return Database(client=AsyncMongoMockClient())
+
+
+async def stored_members(database, guild_id):
+    """Returns the member list stored for a guild."""
+    guilds = await database.search_data("guild", {"id": guild_id}, deleted=None)
+    return guilds[0].get_list("user") if guilds else None
+
+
+def test_diff_members():
+    """Test that only the difference is returned, sorted."""
+    assert diff_members([1, 2, 3], [3, 4, 2, 5]) == ([4, 5], [1])
+    assert diff_members([], []) == ([], [])
+
+
+@pytest.mark.asyncio
+async def test_reconcile_applies_delta(database):
+    """Test that joins and leaves missed while offline are applied to guilds and profiles."""
+    await database.update_sets_bulk("guild", "user", {10: ([1, 2, 3], [])})
+    for id in (1, 4):
+        await database.upsert_data(await database.create_data("user", id))
+    await database.add_to_set_many("user", [1], "guild", 10)
+
+    reports = []
+
+    async def on_progress(progress):
+        reports.append((progress.scanned, progress.done))
+
+    reconciler = Reconciler(database, chunk_size=2)
+    progress = await reconciler.start(10, lambda: iter([2, 3, 4]), 3, on_progress)
+
+    assert (progress.added, progress.removed, progress.error) == (1, 1, None)
+    assert reports == [(2, False), (3, False), (3, True)]
+    assert await stored_members(database, 10) == [2, 3, 4]
+    assert (await database.get_data("user", 1)).get_list("guild") == []
+    assert (await database.get_data("user", 4)).get_list("guild") == [10]
+    assert str(progress).startswith("done, +1 -1")
+
+
+@pytest.mark.asyncio
+async def test_start_dedupes_and_bounds_concurrency(database):
+    """
+    Test that a guild is reconciled once at a time and that guilds share
+    the slots for both fetching and diffing members.
+    """
+    fetching, fetch_peak, diffing, diff_peak = 0, 0, 0, 0
+
+    async def fetch():
+        nonlocal fetching, fetch_peak
+        fetching += 1
+        fetch_peak = max(fetch_peak, fetching)
+        await asyncio.sleep(0.01)
+        fetching -= 1
+
+    def members(ids):
+        nonlocal diffing, diff_peak
+        diffing += 1
+        diff_peak = max(diff_peak, diffing)
+        yield from ids
+        diffing -= 1
+
+    reconciler = Reconciler(database, chunk_size=1, concurrency=2)
+    first = reconciler.start(10, lambda: members([1, 2]), 2, prepare=fetch)
+    assert reconciler.start(10, lambda: members([3]), 1, prepare=fetch) is first
+
+    tasks = [first] + [
+        reconciler.start(id, lambda: members([1, 2]), 2, prepare=fetch)
+        for id in (20, 30)
+    ]
+    await asyncio.gather(*tasks)
+
+    assert (fetch_peak, diff_peak) == (2, 2)
+    assert await stored_members(database, 10) == [1, 2]
+    assert all(reconciler.progress[id].done for id in (10, 20, 30))
+
+
+@pytest.mark.asyncio
+async def test_reconcile_reports_failure(database):
+    """Test that a failed reconciliation is recorded rather than raised."""
+
+    def members():
+        yield 1
+        raise RuntimeError("gateway closed")
+
+    progress = await Reconciler(database).start(10, members, 1)
+    assert progress.done and progress.error == "gateway closed"
+
+
+@pytest.mark.asyncio
+async def test_changes_made_while_waiting_are_kept(database):
+    """
+    Test that members are read when the guild's turn comes, and that changes
+    written under the lock before then are not undone.
+    """
+    await database.update_sets_bulk("guild", "user", {10: ([1, 2], [])})
+    lock = asyncio.Lock()
+    release = asyncio.Event()
+    reconciler = Reconciler(database, concurrency=1, lock=lock)
+    blocker = reconciler.start(20, lambda: iter([]), 0, prepare=release.wait)
+    members = [1, 2]
+    waiting = reconciler.start(10, lambda: iter(members), 2)
+    await asyncio.sleep(0)
+
+    # Member 2 leaves and the batched write lands while guild 10 waits its turn
+    members.remove(2)
+    async with lock:
+        await database.update_sets_bulk("guild", "user", {10: ([], [2])})
+    release.set()
+    await asyncio.gather(blocker, waiting)
+
+    assert await stored_members(database, 10) == [1]
+
+
+@pytest.mark.asyncio
+async def test_lock_is_released_while_reconciling(database):
+    """Test that the lock is only held to mark the guild, which stays marked until written."""
+    lock = asyncio.Lock()
+    reconciler = Reconciler(database, chunk_size=1, lock=lock)
+    scanning, resume = asyncio.Event(), asyncio.Event()
+
+    async def on_progress(progress):
+        if not progress.done:
+            scanning.set()
+            await resume.wait()
+
+    task = reconciler.start(10, lambda: iter([1, 2]), 2, on_progress)
+    await scanning.wait()
+    assert not lock.locked()
+    assert reconciler.reconciling(10) and not reconciler.reconciling(20)
+
+    resume.set()
+    await task
+    assert not reconciler.reconciling(10)
+    assert await stored_members(database, 10) == [1, 2]
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_reconcile_throughput(database):
+    """
+    Benchmark reconciling a 50,000 member guild that drifted by 1,500 members
+    while offline; a few seconds against the mock, nearly all of it in
+    the mock's list updates.
+    """
+    count = 50_000
+    guild = await database.create_data("guild", 10)
+    stored = list(range(1000, count + 500))
+    await database.upsert_data(Data.from_dict({**guild.to_dict(), "user": stored}))
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    other = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    progress = await Reconciler(database).start(10, lambda: iter(range(count)), count)
+    elapsed = time.perf_counter() - start
+    other.cancel()
+
+    assert (progress.added, progress.removed) == (1000, 500)
+    assert sorted(await stored_members(database, 10)) == list(range(count))
+    # Other tasks keep running while the guild is reconciled
+    assert ticks >= count // 1000
+    assert elapsed < 30
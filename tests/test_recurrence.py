@@ -0,0 +1,147 @@
+import pytest
+from modules.data import Data
+from modules.recurrence import (
+    describe_rule,
+    expand_event,
+    occurrences,
+    parse_rule,
+    series_end,
+)
+from modules.timestamp import format_epochs, to_epochs
+
+TZ = "America/New_York"
+FIRST = "10/01/24 06:00 PM"
+
+
+def local(epochs):
+    """Renders epochs as New York wall-clock times."""
+    return format_epochs(epochs, TZ)
+
+
+def test_parse_rule():
+    """Test parsing supported rules and rejecting unsupported ones."""
+    assert parse_rule("FREQ=WEEKLY;INTERVAL=2;COUNT=10") == {
+        "FREQ": "WEEKLY",
+        "INTERVAL": 2,
+        "COUNT": 10,
+        "UNTIL": None,
+    }
+    assert parse_rule("freq=daily;until=20241003T230000Z")["UNTIL"] == 1727996400
+
+    for rule in (
+        "",
+        "INTERVAL=2",
+        "FREQ=YEARLY",
+        "FREQ=WEEKLY;BYDAY=MO",
+        "FREQ=DAILY;COUNT=0",
+    ):
+        with pytest.raises(ValueError):
+            parse_rule(rule)
+
+
+def test_describe_rule():
+    """Test human-readable rule descriptions."""
+    assert describe_rule("FREQ=WEEKLY") == "Every week"
+    assert describe_rule("FREQ=WEEKLY;INTERVAL=2;COUNT=3") == "Every 2 weeks, 3 times"
+    assert (
+        describe_rule("FREQ=DAILY;UNTIL=20241003T230000Z")
+        == "Every day, until 10/03/24"
+    )
+
+
+def test_weekly_keeps_wall_clock_across_dst():
+    """Test that a weekly 6 PM meeting stays at 6 PM after clocks change."""
+    starts = list(occurrences(FIRST, TZ, "FREQ=WEEKLY;COUNT=6"))
+
+    assert local(starts) == [
+        "10/01/24 06:00 PM EDT",
+        "10/08/24 06:00 PM EDT",
+        "10/15/24 06:00 PM EDT",
+        "10/22/24 06:00 PM EDT",
+        "10/29/24 06:00 PM EDT",
+        "11/05/24 06:00 PM EST",
+    ]
+
+
+def test_window_and_exceptions():
+    """Test that only occurrences in the window are produced, minus exceptions."""
+    lower, upper = to_epochs(["11/01/26 12:00 AM", "11/20/26 12:00 AM"], TZ)
+    skipped = to_epochs(["11/10/26 06:00 PM"], TZ)
+
+    starts = occurrences(FIRST, TZ, "FREQ=WEEKLY", lower, upper, skipped)
+    assert local(starts) == ["11/03/26 06:00 PM EST", "11/17/26 06:00 PM EST"]
+
+    starts = occurrences(FIRST, TZ, "FREQ=WEEKLY", lower, upper, descending=True)
+    assert local(starts) == [
+        "11/17/26 06:00 PM EST",
+        "11/10/26 06:00 PM EST",
+        "11/03/26 06:00 PM EST",
+    ]
+
+
+def test_endless_series_is_lazy():
+    """Test that an endless series can be consumed a few occurrences at a time."""
+    starts = occurrences(FIRST, TZ, "FREQ=DAILY")
+    assert local([next(starts), next(starts)]) == [
+        "10/01/24 06:00 PM EDT",
+        "10/02/24 06:00 PM EDT",
+    ]
+
+    with pytest.raises(ValueError):
+        next(occurrences(FIRST, TZ, "FREQ=DAILY", descending=True))
+
+
+def test_monthly_skips_short_months():
+    """Test that monthly series on the 31st skip months without one."""
+    starts = list(occurrences("01/31/24 06:00 PM", TZ, "FREQ=MONTHLY;COUNT=3"))
+    assert local(starts) == [
+        "01/31/24 06:00 PM EST",
+        "03/31/24 06:00 PM EDT",
+        "05/31/24 06:00 PM EDT",
+    ]
+
+    backwards = occurrences(
+        "01/31/24 06:00 PM", TZ, "FREQ=MONTHLY", upper=starts[2], descending=True
+    )
+    assert list(backwards) == starts[1::-1]
+
+
+def test_until_and_series_end():
+    """Test that UNTIL is inclusive and series_end finds the last occurrence."""
+    rule = "FREQ=DAILY;UNTIL=20241003T220000Z"
+    starts = list(occurrences(FIRST, TZ, rule))
+
+    assert local(starts) == [
+        "10/01/24 06:00 PM EDT",
+        "10/02/24 06:00 PM EDT",
+        "10/03/24 06:00 PM EDT",
+    ]
+    assert series_end(FIRST, TZ, rule) == starts[-1]
+    assert (
+        series_end(FIRST, TZ, "FREQ=WEEKLY;COUNT=3")
+        == to_epochs(["10/15/24 06:00 PM"], TZ)[0]
+    )
+    assert series_end(FIRST, TZ, "FREQ=WEEKLY") is None
+
+
+def test_expand_event():
+    """Test expanding events into occurrences with their own times."""
+    one_off = Data.from_template("event", 1)
+    one_off.set_value("start_time", 100)
+    assert list(expand_event(one_off, 0, 200)) == [one_off]
+    assert list(expand_event(one_off, 200)) == []
+
+    series = Data.from_template("event", 2)
+    series.set_value("datetime", FIRST)
+    series.set_value("timezone", TZ)
+    series.set_value("start_time", to_epochs([FIRST], TZ)[0])
+    series.set_value("recurrence", "FREQ=WEEKLY;COUNT=3")
+
+    expanded = list(expand_event(series))
+    assert [event.get_value("id") for event in expanded] == [2, 2, 2]
+    assert [event.get_value("datetime") for event in expanded] == [
+        "10/01/24 06:00 PM",
+        "10/08/24 06:00 PM",
+        "10/15/24 06:00 PM",
+    ]
+    assert series.get_value("datetime") == FIRST
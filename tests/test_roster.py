@@ -0,0 +1,198 @@
+import io
+import gzip
+import json
+import time
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from modules.data import Data, templates
+from modules.database import Database
+from modules.importer import chunked
+from modules.majors import MajorCatalog
+from modules.roster import (
+    iter_roster_rows,
+    roster_format,
+    user_from_row,
+    write_roster,
+)
+
+CATALOG = MajorCatalog(
+    ["Computer Science", "Mathematics", "Physics"],
+    aliases={"cs": "Computer Science"},
+)
+
+TEMPLATE = templates["user"]
+
+CSV_FILE = b"""\xef\xbb\xbfID,First_Name,Last_Name,Major,Graduation_Year
+1,Ada,Lovelace,cs;Mathematics,2026
+,No,Id,,
+3,Bad,Year,,26
+4,Grace,,,
+"""
+
+
+@pytest.fixture
+def database():
+    """Fixture to provide a Database with a mock client."""
+    return Database(client=AsyncMongoMockClient())
+
+
+def test_roster_format():
+    """Test picking the format and compression from the file name."""
+    assert roster_format("Roster.CSV") == ("csv", False)
+    assert roster_format("roster.ndjson.gz") == ("ndjson", True)
+    assert roster_format("roster.jsonl") == ("ndjson", False)
+    with pytest.raises(ValueError):
+        roster_format("roster.xlsx")
+
+
+def test_user_from_row():
+    """Test converting rows, leaving out empty values and resolving majors."""
+    assert user_from_row(
+        {"id": 5, "first_name": " Ada ", "major": ["cs"], "student_id": ""},
+        CATALOG,
+    ) == (5, {"first_name": "Ada", "major": ["Computer Science"]})
+    with pytest.raises(ValueError):
+        user_from_row({"id": 5, "major": "Basket Weaving"}, CATALOG)
+    with pytest.raises(ValueError):
+        user_from_row({"id": 5, "guild": [1]}, CATALOG)
+    assert user_from_row({"id": 5, "school_email": "ada@rpi.edu"}, CATALOG) == (5, {})
+
+
+def test_iter_roster_rows_csv():
+    """Test streaming a CSV roster, reporting invalid rows by line."""
+    rows = list(iter_roster_rows(CSV_FILE, "roster.csv", CATALOG))
+    assert [line for line, _, _ in rows] == [2, 3, 4, 5]
+    assert rows[0][1] == (
+        1,
+        {
+            "first_name": "Ada",
+            "last_name": "Lovelace",
+            "major": ["Computer Science", "Mathematics"],
+            "graduation_year": "2026",
+        },
+    )
+    assert rows[1][1] is None and "id" in rows[1][2]
+    assert rows[2][1] is None and "graduation year" in rows[2][2]
+    assert rows[3][1] == (4, {"first_name": "Grace"})
+
+
+def test_iter_roster_rows_gzipped_ndjson():
+    """Test streaming a gzipped NDJSON roster, including malformed lines."""
+    data = gzip.compress(b'{"id": 1, "first_name": "Ada"}\n\nnot json\n[1]\n')
+    rows = list(iter_roster_rows(data, "roster.ndjson.gz", CATALOG))
+    assert rows[0] == (1, (1, {"first_name": "Ada"}), "")
+    assert rows[1][0] == 3 and "Invalid JSON" in rows[1][2]
+    assert rows[2][0] == 4 and rows[2][1] is None
+
+
+@pytest.mark.asyncio
+async def test_import_keeps_existing_fields(database):
+    """Test that importing sets only the roster's fields and links the guild."""
+    user = await database.create_data("user", 1)
+    user.set_value("student_id", "661234567")
+    await database.upsert_data(user)
+    await database.add_to_set("user", 1, "guild", [20])
+
+    await database.merge_bulk(
+        "user",
+        {1: {"first_name": "Ada"}, 2: {"first_name": "Grace"}},
+        add_to_set={"guild": 10},
+    )
+
+    first, second = [user async for user in database.iter_data("user", {})]
+    assert first.get_value("first_name") == "Ada"
+    assert first.get_value("student_id") == "661234567"
+    assert first.get_list("guild") == [20, 10]
+    assert second.get_value("id") == 2
+    assert second.get_value("first_name") == "Grace"
+    assert second.get_list("guild") == [10]
+    assert second.get_list("event") == []
+
+
+@pytest.mark.asyncio
+async def test_import_fills_only_empty_fields(database):
+    """Test that merging without overwriting keeps the values members chose."""
+    user = await database.create_data("user", 1)
+    user.set_value("first_name", "Ada")
+    await database.upsert_data(user)
+
+    await database.merge_bulk(
+        "user",
+        {
+            1: {"first_name": "Imported", "major": ["Physics"]},
+            2: {"first_name": "Grace", "graduation_year": "2027"},
+        },
+        add_to_set={"guild": 10},
+        overwrite=False,
+    )
+
+    first, second = [user async for user in database.iter_data("user", {})]
+    assert first.get_value("first_name") == "Ada"
+    assert first.get_list("major") == ["Physics"]
+    assert first.get_list("guild") == [10]
+    assert second.get_value("first_name") == "Grace"
+    assert second.get_value("graduation_year") == "2027"
+    assert second.get_list("guild") == [10]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("format", ["csv", "ndjson"])
+async def test_export_round_trip(database, format):
+    """Test that an exported roster imports back to the same profiles."""
+    await database.merge_bulk(
+        "user",
+        {
+            1: {"first_name": "Ada", "major": ["Computer Science", "Physics"]},
+            2: {"first_name": "Grace", "graduation_year": "2027"},
+        },
+        add_to_set={"guild": 10},
+    )
+    await database.merge_bulk("user", {3: {"first_name": "Other"}}, {"guild": 20})
+
+    stream = io.BytesIO()
+    count = await write_roster(
+        database.iter_data("user", {"guild": 10}), format, stream
+    )
+    assert count == 2
+
+    rows = list(iter_roster_rows(stream.getvalue(), f"roster.{format}.gz", CATALOG))
+    assert [user for _, user, _ in rows] == [
+        (1, {"first_name": "Ada", "major": ["Computer Science", "Physics"]}),
+        (2, {"first_name": "Grace", "graduation_year": "2027"}),
+    ]
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_roster_throughput():
+    """
+    Benchmark parsing and writing a 5,000 member roster; typically well under a second.
+    The database writes are left out because the mock scans every document per upsert.
+    """
+    count = 5000
+    lines = ["id,first_name,last_name,school_email,major,graduation_year"]
+    lines += [
+        f"{id},First{id},Last{id},user{id}@rpi.edu,cs;Physics,2027"
+        for id in range(1, count + 1)
+    ]
+    data = gzip.compress("\n".join(lines).encode())
+
+    start = time.perf_counter()
+    users = []
+    for chunk in chunked(iter_roster_rows(data, "roster.csv.gz", CATALOG), 500):
+        users += [
+            Data.from_dict({**TEMPLATE, "_id": id, **fields})
+            for _, (id, fields), _ in chunk
+        ]
+
+    async def cursor():
+        for user in users:
+            yield user
+
+    stream = io.BytesIO()
+    exported = await write_roster(cursor(), "csv", stream)
+    elapsed = time.perf_counter() - start
+
+    assert exported == count
+    assert gzip.decompress(stream.getvalue()).count(b"\n") == count + 1
+    assert elapsed < 5
@@ -0,0 +1,90 @@
+import pytest
+from modules.scheduler import ReminderQueue
+
+
+@pytest.fixture
+def queue():
+    """Fixture to provide an empty ReminderQueue."""
+    return ReminderQueue()
+
+
+def test_schedule_orders_by_fire_time(queue):
+    """Test that reminders come out in fire-time order across events."""
+    queue.schedule(1, 10_000, [3600, 60], now=0)
+    queue.schedule(2, 5_000, [60], now=0)
+
+    assert queue.next_due() == 4_940
+    assert queue.pop_due(6_400) == [(2, 60), (1, 3600)]
+    assert queue.next_due() == 9_940
+
+
+def test_pop_due_leaves_future_reminders(queue):
+    """Test that only reminders due by the given time are returned."""
+    queue.schedule(1, 10_000, [60], now=0)
+    assert queue.pop_due(9_000) == []
+    assert queue.pop_due(9_940) == [(1, 60)]
+    assert queue.next_due() is None
+
+
+def test_remove_cancels_reminders(queue):
+    """Test that removed events never fire."""
+    queue.schedule(1, 10_000, [60], now=0)
+    queue.schedule(2, 20_000, [60], now=0)
+    queue.remove(1)
+
+    assert queue.next_due() == 19_940
+    assert queue.pop_due(30_000) == [(2, 60)]
+
+
+def test_reschedule_replaces_previous_reminders(queue):
+    """Test that rescheduling an event drops its old reminder times."""
+    queue.schedule(1, 10_000, [60], now=0)
+    queue.schedule(1, 20_000, [60], now=0)
+
+    assert queue.pop_due(30_000) == [(1, 60)]
+    assert len(queue) == 0
+
+
+def test_overdue_reminders_collapse(queue):
+    """Test that missed reminders collapse into the one closest to the start."""
+    assert queue.schedule(1, 10_000, [86400, 3600, 60], now=9_000) == 9_000
+    assert queue.pop_due(9_000) == [(1, 3600)]
+    assert queue.pop_due(10_000) == [(1, 60)]
+
+
+def test_started_events_are_not_scheduled(queue):
+    """Test that events that already started schedule nothing."""
+    assert queue.schedule(1, 10_000, [60], now=10_000) is None
+    assert queue.next_due() is None
+
+
+def test_sent_reminders_suppress_earlier_leads(queue):
+    """Test that reminders earlier than one already sent are never scheduled."""
+    assert queue.schedule(1, 1_800, [86400, 3600], now=0, sent=[3600]) is None
+    assert queue.pop_due(1_800) == []
+
+    queue.schedule(2, 100_000, [86400, 3600, 60], now=0, sent=[3600])
+    assert queue.pop_due(100_000) == [(2, 60)]
+
+
+def test_remove_event_cancels_every_occurrence(queue):
+    """Test that removing an event also cancels its occurrences' reminders."""
+    queue.schedule(1, 10_000, [60], now=0)
+    queue.schedule((1, 20_000), 20_000, [60], now=0)
+    queue.schedule((1, 30_000), 30_000, [60], now=0)
+    queue.schedule((2, 40_000), 40_000, [60], now=0)
+    queue.remove_event(1)
+
+    assert queue.pop_due(50_000) == [((2, 40_000), 60)]
+
+
+def test_remove_event_after_reminders_fired(queue):
+    """Test that fired occurrences are forgotten and later ones can still be removed."""
+    queue.schedule((1, 10_000), 10_000, [60], now=0)
+    assert queue.pop_due(10_000) == [((1, 10_000), 60)]
+    queue.remove_event(1)
+
+    queue.schedule((1, 20_000), 20_000, [60], now=0)
+    queue.remove_event(1)
+    assert queue.pop_due(20_000) == []
+    assert len(queue) == 0
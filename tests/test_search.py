@@ -0,0 +1,89 @@
+import time
+import pytest
+from modules.search import SearchIndex, tokenize
+
+
+@pytest.fixture
+def index():
+    """Fixture to provide an index of a few events."""
+    index = SearchIndex()
+    index.add(
+        1,
+        {
+            "name": "General Body Meeting",
+            "description": "Elections",
+            "location": "DCC 308",
+        },
+    )
+    index.add(
+        2,
+        {
+            "name": "Hackathon Kickoff",
+            "description": "Pizza, then a meeting",
+            "location": "Union",
+        },
+    )
+    index.add(3, {"name": "Board Meeting", "description": "", "location": "DCC 330"})
+    return index
+
+
+def test_tokenize():
+    """Test that text is split into lowercase words."""
+    assert tokenize("Pizza, then a MEETING!") == ["pizza", "then", "a", "meeting"]
+    assert tokenize(None) == []
+
+
+def test_ranks_by_field_weight(index):
+    """Test that name matches outrank description matches."""
+    ranked = [doc_id for doc_id, _ in index.search("meeting")]
+    assert ranked[-1] == 2
+    assert set(ranked) == {1, 2, 3}
+
+
+def test_all_terms_must_match(index):
+    """Test that results match every term, in any field."""
+    assert [doc_id for doc_id, _ in index.search("meeting dcc")] in ([1, 3], [3, 1])
+    assert index.search("meeting pizza")[0][0] == 2
+    assert index.search("meeting zebra") == []
+    assert index.search("   ") == []
+
+
+def test_prefix_matching(index):
+    """Test that terms match word prefixes, below whole words."""
+    assert [doc_id for doc_id, _ in index.search("hack")] == [2]
+    assert {doc_id for doc_id, _ in index.search("elect")} == {1}
+
+    index.add(4, {"name": "Meet and Greet"})
+    scores = dict(index.search("meet"))
+    assert scores[4] > scores[3]
+
+
+def test_update_and_remove(index):
+    """Test that re-adding replaces a document and removing forgets it."""
+    index.add(2, {"name": "Hackathon Closing"})
+    assert index.search("kickoff") == []
+    assert [doc_id for doc_id, _ in index.search("closing")] == [2]
+
+    index.remove(2)
+    index.remove(2)
+    assert index.search("hackathon") == []
+    assert len(index) == 2
+
+
+@pytest.mark.benchmark
+def test_lookup_speed():
+    """Test that lookups in a guild-sized index take well under a millisecond."""
+    index = SearchIndex()
+    for doc_id in range(1000):
+        index.add(
+            doc_id,
+            {
+                "name": f"Event {doc_id} {('workshop', 'meeting', 'social')[doc_id % 3]}",
+                "location": f"Room {doc_id % 40}",
+            },
+        )
+
+    start = time.perf_counter()
+    for _ in range(100):
+        index.search("work room")
+    assert (time.perf_counter() - start) / 100 < 0.001
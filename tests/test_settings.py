@@ -0,0 +1,125 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from discord.ext import commands
+from mongomock_motor import AsyncMongoMockClient
+from modules.database import Database
+from modules.settings import (
+    GuildSettings,
+    SettingsService,
+    eboard_only,
+    parse_setting,
+)
+
+
+class CountingDatabase(Database):
+    """A mock database that counts guild reads."""
+
+    reads = 0
+
+    async def search_data(self, collection_name, criteria, *args, **kwargs):
+        self.reads += 1
+        # Let concurrent callers pile up behind the first read
+        await asyncio.sleep(0)
+        return await super().search_data(collection_name, criteria, *args, **kwargs)
+
+
+@pytest.fixture
+def database():
+    """Fixture to provide a counting Database with a mock client."""
+    return CountingDatabase(client=AsyncMongoMockClient())
+
+
+def test_parse_setting():
+    """Test that IDs, mentions and unset words are accepted."""
+    assert parse_setting("eboard_role", "<@&123456789012345678>") == 123456789012345678
+    assert (
+        parse_setting("moderator_channel", "<#123456789012345678>")
+        == 123456789012345678
+    )
+    assert (
+        parse_setting("moderator_channel", " 123456789012345678 ") == 123456789012345678
+    )
+    assert parse_setting("eboard_role", "None") is None
+    with pytest.raises(ValueError):
+        parse_setting("eboard_role", "eboard")
+    with pytest.raises(KeyError):
+        parse_setting("unknown", "123456789012345678")
+
+
+def test_from_document_ignores_invalid_values():
+    """Test that stored values that are not IDs read as unset."""
+    settings = GuildSettings.from_document(
+        {"eboard_role": "123456789012345678", "moderator_channel": "general"}
+    )
+    assert settings.to_dict() == {
+        "announcements_channel": None,
+        "moderator_channel": None,
+        "eboard_role": 123456789012345678,
+    }
+    assert GuildSettings.from_document(None).eboard_role is None
+
+
+@pytest.mark.asyncio
+async def test_get_loads_once(database):
+    """Test that concurrent first reads share one query and later reads hit memory."""
+    service = SettingsService(database)
+    assert service.cached(10) is None
+
+    results = await asyncio.gather(*(service.get(10) for _ in range(5)))
+    assert all(settings is results[0] for settings in results)
+    assert await service.get(10) is results[0]
+    assert database.reads == 1
+
+
+@pytest.mark.asyncio
+async def test_set_writes_through(database):
+    """Test that a change updates memory and survives a reload."""
+    service = SettingsService(database)
+    assert await service.set(10, "eboard_role", "<@&123456789012345678>") is None
+    assert await service.set(10, "moderator_channel", "223456789012345678") is None
+    assert (
+        await service.set(10, "eboard_role", "323456789012345678") == 123456789012345678
+    )
+    reads = database.reads
+    assert service.cached(10).eboard_role == 323456789012345678
+    assert database.reads == reads
+
+    reloaded = await SettingsService(database).get(10)
+    assert reloaded.to_dict() == {
+        "announcements_channel": None,
+        "moderator_channel": 223456789012345678,
+        "eboard_role": 323456789012345678,
+    }
+
+
+@pytest.mark.asyncio
+async def test_forget(database):
+    """Test that a forgotten guild is read again on next use."""
+    service = SettingsService(database)
+    await service.get(10)
+    service.forget(10)
+    assert service.cached(10) is None
+    await service.get(10)
+    assert database.reads == 2
+
+
+@pytest.mark.asyncio
+async def test_eboard_only(database):
+    """Test that the eboard check follows the configured role."""
+    settings = SettingsService(database)
+    check = eboard_only().predicate
+    role = SimpleNamespace(id=123456789012345678)
+    ctx = SimpleNamespace(
+        bot=SimpleNamespace(settings=settings),
+        guild=SimpleNamespace(id=1),
+        author=SimpleNamespace(roles=[]),
+    )
+
+    with pytest.raises(commands.CheckFailure, match="not configured"):
+        await check(ctx)
+    await settings.set(1, "eboard_role", str(role.id))
+    with pytest.raises(commands.MissingRole):
+        await check(ctx)
+    ctx.author.roles.append(role)
+    assert await check(ctx)
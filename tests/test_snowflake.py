@@ -0,0 +1,51 @@
+import time
+import pytest
+from modules.snowflake import Snowflake, MAX_WORKER_ID
+
+
+@pytest.fixture
+def generator():
+    """Fixture to provide a Snowflake generator for worker 3."""
+    return Snowflake(worker_id=3)
+
+
+def test_ids_are_unique_and_increasing(generator):
+    """Test that a burst of IDs within the same milliseconds never repeats."""
+    ids = [generator.next_id() for _ in range(100_000)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+
+
+def test_workers_never_collide():
+    """Test that two workers generating at the same time produce disjoint IDs."""
+    first, second = Snowflake(worker_id=1), Snowflake(worker_id=2)
+    ids = set()
+    for _ in range(10_000):
+        ids.add(first.next_id())
+        ids.add(second.next_id())
+    assert len(ids) == 20_000
+
+
+def test_timestamp_of(generator):
+    """Test that the creation time can be read back from an ID."""
+    before = time.time()
+    id = generator.next_id()
+    assert abs(Snowflake.timestamp_of(id) - before) < 1
+
+
+def test_invalid_worker_id():
+    """Test that worker IDs outside the worker bits are rejected."""
+    with pytest.raises(ValueError):
+        Snowflake(worker_id=MAX_WORKER_ID + 1)
+
+
+@pytest.mark.benchmark
+def test_throughput(generator):
+    """Benchmark generation speed; typically well over a million IDs per second."""
+    count = 1_000_000
+    start = time.perf_counter()
+    for _ in range(count):
+        generator.next_id()
+    rate = count / (time.perf_counter() - start)
+
+    assert rate > 500_000
@@ -0,0 +1,130 @@
+import json
+import os
+import pytest
+import subprocess
+import sys
+import time
+from pathlib import Path
+from modules.extensions import ExtensionTiming
+from modules.startup import DEFAULT_REPORT_PATH, StartupProfile
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_profile_is_off_without_a_path():
+    """Test that a disabled profile records nothing and writes no report."""
+    profile = StartupProfile()
+    with profile.phase("imports"):
+        pass
+
+    assert not profile.enabled
+    assert profile.phases == {}
+    assert profile.write() is None
+    assert profile.summary() == ""
+
+
+def test_from_env(monkeypatch, tmp_path):
+    """Test that STARTUP_PROFILE turns profiling on and picks the report path."""
+    monkeypatch.delenv("STARTUP_PROFILE", raising=False)
+    assert not StartupProfile.from_env().enabled
+
+    monkeypatch.setenv("STARTUP_PROFILE", "0")
+    assert not StartupProfile.from_env().enabled
+
+    monkeypatch.setenv("STARTUP_PROFILE", "1")
+    profile = StartupProfile.from_env()
+    profile.imports.stop()
+    assert profile.path == DEFAULT_REPORT_PATH
+
+    monkeypatch.setenv("STARTUP_PROFILE", str(tmp_path / "profile.json"))
+    profile = StartupProfile.from_env()
+    profile.imports.stop()
+    assert profile.path == str(tmp_path / "profile.json")
+
+
+def test_phase_timeline_and_report(tmp_path):
+    """Test that phases are reported in start order with their durations."""
+    profile = StartupProfile(str(tmp_path / "profile.json"))
+    with profile.phase("imports"):
+        time.sleep(0.01)
+    profile.begin("gateway ready")
+    with profile.phase("cog setup"):
+        pass
+    profile.end("never began")
+
+    timing = ExtensionTiming("cogs.ping")
+    timing.import_seconds, timing.setup_seconds = 0.002, 0.001
+    path = profile.write([ExtensionTiming("cogs.templates", deferred=True), timing])
+    with open(path) as file:
+        report = json.load(file)
+
+    assert [phase["name"] for phase in report["phases"]] == [
+        "imports",
+        "gateway ready",
+        "cog setup",
+    ]
+    assert report["phases"][0]["seconds"] >= 0.01
+    assert report["phases"][1]["seconds"] is None
+    assert [extension["name"] for extension in report["extensions"]] == [
+        "cogs.ping",
+        "cogs.templates",
+    ]
+    assert "imports: " in profile.summary()
+    assert "gateway ready: running" in profile.summary()
+
+
+def test_import_times_exclude_nested_imports(tmp_path, monkeypatch):
+    """Test that each newly imported module is timed with and without its own imports."""
+    (tmp_path / "slow_child.py").write_text("import time\ntime.sleep(0.05)\n")
+    (tmp_path / "slow_parent.py").write_text("import slow_child\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    profile = StartupProfile(str(tmp_path / "profile.json"))
+    try:
+        import slow_parent  # noqa: F401
+    finally:
+        profile.imports.stop()
+        sys.modules.pop("slow_parent", None)
+        sys.modules.pop("slow_child", None)
+
+    assert profile.imports not in sys.meta_path
+    parent, parent_self = profile.imports.times["slow_parent"]
+    child, child_self = profile.imports.times["slow_child"]
+    assert child >= 0.05 and child_self >= 0.05
+    assert parent >= child
+    assert parent_self < 0.05
+    assert profile.report()["imports"][0]["module"] == "slow_child"
+
+
+def profile_main_import(tmp_path):
+    """Imports the bot in a fresh interpreter and returns its startup report."""
+    path = tmp_path / "profile.json"
+    env = {**os.environ, "STARTUP_PROFILE": str(path)}
+    subprocess.run(
+        [sys.executable, "-c", "import main; main.startup_profile.write()"],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        timeout=60,
+    )
+    with open(path) as file:
+        return json.load(file)
+
+
+def test_main_import_report(tmp_path):
+    """Test that the report for importing the bot times the phase and names its imports."""
+    report = profile_main_import(tmp_path)
+
+    imports = {phase["name"]: phase for phase in report["phases"]}["imports"]
+    modules = {module["module"] for module in report["imports"]}
+    assert {"discord", "motor", "modules.data", "modules.database"} <= modules
+    assert imports["seconds"] is not None
+
+
+@pytest.mark.benchmark
+def test_main_import_budget(tmp_path):
+    """Test that importing the bot stays within budget."""
+    report = profile_main_import(tmp_path)
+
+    imports = {phase["name"]: phase for phase in report["phases"]}["imports"]
+    assert imports["seconds"] < 10
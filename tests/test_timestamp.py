@@ -1,5 +1,13 @@
 import pytest
-from modules.timestamp import Timestamp
+from modules.timestamp import (
+    Timestamp,
+    to_epochs,
+    format_epochs,
+    convert_datetimes,
+    get_timezone,
+    format_time,
+    localize_datetime,
+)
 
 
 @pytest.fixture
@@ -119,3 +127,74 @@ def test_time_difference(timestamp):
     """Test the difference in days and hours between two timestamps."""
     other = Timestamp("12/30/23 11:00 PM")
     assert timestamp.time_difference(other) == "1 days, 0 hours, 0 minutes"
+
+
+# Test Batch Conversion
+def test_to_epochs_matches_timestamp():
+    """Test that batch conversion agrees with single Timestamp conversion."""
+    datetime_strs = ["12/31/23 11:00 PM", "07/04/24 09:30 AM", "12/31/23 11:00 PM"]
+    epochs = to_epochs(datetime_strs)
+    assert epochs == [Timestamp(value).to_epoch() for value in datetime_strs]
+
+
+def test_to_epochs_dst_edges():
+    """Test that ambiguous and skipped local times resolve to standard time like pytz."""
+    # 01:30 AM happens twice on 11/03/24; 02:30 AM never happens on 03/10/24
+    assert to_epochs(["11/03/24 01:30 AM", "03/10/24 02:30 AM"]) == [
+        1730615400.0,
+        1710055800.0,
+    ]
+
+
+def test_to_epochs_invalid_format():
+    """Test that batch conversion rejects malformed datetime strings."""
+    with pytest.raises(ValueError):
+        to_epochs(["02/30/24 01:00 PM"])
+
+
+def test_format_epochs():
+    """Test formatting epochs across a DST transition and in another timezone."""
+    epochs = [1704067200, 1720099800]
+    assert format_epochs(epochs) == ["12/31/23 07:00 PM EST", "07/04/24 09:30 AM EDT"]
+    assert format_epochs(epochs, "UTC") == [
+        "01/01/24 12:00 AM UTC",
+        "07/04/24 01:30 PM UTC",
+    ]
+
+
+def test_convert_datetimes():
+    """Test re-rendering wall-clock strings from one timezone in another."""
+    assert convert_datetimes(
+        ["12/31/23 11:00 PM"], "America/New_York", "America/Los_Angeles"
+    ) == ["12/31/23 08:00 PM PST"]
+
+
+# Test Timezone Resolution
+def test_get_timezone():
+    """Test resolving timezone abbreviations to IANA zones."""
+    assert get_timezone("12:00 PM") == "America/New_York"
+    assert get_timezone("12:00 PM PDT") == "America/Los_Angeles"
+    assert get_timezone("12:00 PM ct") == "America/Chicago"
+    with pytest.raises(ValueError):
+        get_timezone("12:00 PM XYZ")
+
+
+def test_format_time():
+    """Test that format_time drops the timezone abbreviation."""
+    assert format_time("12/31/24 12:00 PM PDT") == "12/31/24 12:00 PM"
+    assert format_time("12/31/24 12:00 PM") == "12/31/24 12:00 PM"
+    with pytest.raises(ValueError):
+        format_time("31/12/24 12:00 PM")
+
+
+def test_localize_datetime():
+    """Test rendering stored datetimes with the abbreviation in effect on that date."""
+    assert localize_datetime("07/04/24 12:00 PM", "America/Los_Angeles") == (
+        "07/04/24 12:00 PM PDT"
+    )
+    assert localize_datetime("12/31/24 12:00 PM", "") == "12/31/24 12:00 PM EST"
+
+    # Repeated renders are served from the memo cache
+    hits = localize_datetime.cache_info().hits
+    localize_datetime("07/04/24 12:00 PM", "America/Los_Angeles")
+    assert localize_datetime.cache_info().hits == hits + 1
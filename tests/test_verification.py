@@ -0,0 +1,109 @@
+import re
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from modules.database import Database
+from modules.verification import (
+    ATTEMPT_BURST,
+    CODE_LENGTH,
+    CODE_TTL,
+    SEND_BURST,
+    VerificationService,
+    generate_code,
+    hash_code,
+)
+
+
+class RecordingOutbox:
+    """Stands in for Outbox, keeping what would have been sent."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def enqueue(self, recipient, subject, message, key=None, now=None):
+        self.messages.append((recipient, message))
+        return True
+
+    def last_code(self):
+        return re.search(r"\d{%d}" % CODE_LENGTH, self.messages[-1][1]).group()
+
+
+@pytest.fixture
+def outbox():
+    """Fixture to provide a recording outbox."""
+    return RecordingOutbox()
+
+
+@pytest.fixture
+def service(outbox):
+    """Fixture to provide a verification service backed by a mock database."""
+    return VerificationService(Database(client=AsyncMongoMockClient()), outbox)
+
+
+def test_codes_and_hashes():
+    """Test that codes are fixed-length digits and hashes bind user and address."""
+    code = generate_code()
+    assert len(code) == CODE_LENGTH and code.isdigit()
+    assert hash_code(1, "A@rpi.edu", code) == hash_code(1, "a@rpi.edu", code)
+    assert hash_code(1, "a@rpi.edu", code) != hash_code(2, "a@rpi.edu", code)
+    assert code not in hash_code(1, "a@rpi.edu", code)
+
+
+@pytest.mark.asyncio
+async def test_verify_consumes_code(service, outbox):
+    """Test that the emailed code verifies once."""
+    assert await service.send_code(1, "a@rpi.edu", now=0) is True
+    assert outbox.messages[0][0] == "a@rpi.edu"
+    code = outbox.last_code()
+
+    assert await service.verify(1, "a@rpi.edu", code, now=1) is True
+    assert await service.verify(1, "a@rpi.edu", code, now=2) is False
+
+
+@pytest.mark.asyncio
+async def test_verify_rejects_wrong_code_user_address_and_expiry(service, outbox):
+    """Test that a code only works for its user and address before it expires."""
+    await service.send_code(1, "a@rpi.edu", now=0)
+    code = outbox.last_code()
+    wrong = str((int(code) + 1) % 10**CODE_LENGTH).zfill(CODE_LENGTH)
+
+    assert await service.verify(1, "a@rpi.edu", wrong, now=1) is False
+    assert await service.verify(2, "a@rpi.edu", code, now=1) is False
+    assert await service.verify(1, "b@rpi.edu", code, now=1) is False
+    assert await service.verify(1, "a@rpi.edu", code, now=CODE_TTL + 1) is False
+
+
+@pytest.mark.asyncio
+async def test_new_code_replaces_old(service, outbox):
+    """Test that requesting a new code invalidates the previous one."""
+    await service.send_code(1, "a@rpi.edu", now=0)
+    old = outbox.last_code()
+    await service.send_code(1, "a@rpi.edu", now=1)
+    new = outbox.last_code()
+
+    if old != new:
+        assert await service.verify(1, "a@rpi.edu", old, now=2) is False
+    assert await service.verify(1, "a@rpi.edu", new, now=2) is True
+
+
+@pytest.mark.asyncio
+async def test_guesses_are_throttled(service, outbox):
+    """Test that once the burst of guesses is used up even the right code is refused."""
+    await service.send_code(1, "a@rpi.edu", now=0)
+    code = outbox.last_code()
+    wrong = str((int(code) + 1) % 10**CODE_LENGTH).zfill(CODE_LENGTH)
+
+    for _ in range(ATTEMPT_BURST):
+        assert await service.verify(1, "a@rpi.edu", wrong, now=1) is False
+    assert service.retry_after(1) > 0
+    assert await service.verify(1, "a@rpi.edu", code, now=1) is False
+    assert service.retry_after(2) == 0
+
+
+@pytest.mark.asyncio
+async def test_sends_are_throttled(service, outbox):
+    """Test that a user cannot request unlimited codes."""
+    for _ in range(SEND_BURST):
+        assert await service.send_code(1, "a@rpi.edu", now=0) is True
+    assert await service.send_code(1, "a@rpi.edu", now=0) is False
+    assert service.resend_after(1) > 0
+    assert len(outbox.messages) == SEND_BURST